@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Ingestion benchmark for the Ericsson feature processor
+Generates a synthetic corpus of Ericsson-style feature documents (identity
+table, dependencies, parameter table, pm counters, activation and
+deactivation steps), then runs ericsson_feature_processor.py on it three
+times: cold (empty output), warm (unchanged sources, everything cached) and
+incremental (a fraction of the sources edited). Each run is a separate
+process, so wall time, files/s and peak RSS (from wait4) are per run; the
+per-stage times come from the processor's --profile report. Results are
+written as JSON and can be compared against an earlier report.
+"""
+
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROCESSOR_SCRIPT = Path(__file__).parent / "ericsson_feature_processor.py"
+REPORT_VERSION = 1
+
+RUNS = ('cold', 'warm', 'incremental')
+FILES_PER_DIRECTORY = 1000
+NON_FEATURE_RATIO = 0.1  # Share of documents without a feature identity, like the real batches
+
+WORDS = (
+    'cell', 'carrier', 'aggregation', 'uplink', 'downlink', 'throughput', 'scheduler', 'handover',
+    'mobility', 'interference', 'power', 'energy', 'sleep', 'mimo', 'antenna', 'beamforming',
+    'admission', 'control', 'bearer', 'latency', 'capacity', 'coverage', 'traffic', 'load',
+    'balancing', 'measurement', 'report', 'neighbor', 'relation', 'frequency', 'band', 'bandwidth',
+    'spectrum', 'sharing', 'priority', 'profile', 'threshold', 'timer', 'radio', 'resource',
+)
+MO_CLASSES = (
+    'EUtranCellFDD', 'EUtranCellTDD', 'NRCellDU', 'NRCellCU', 'AdmissionControl', 'CarrierAggregationFunction',
+    'MimoSleepFunction', 'LoadBalancingFunction', 'ReportConfigEUtraIntraFreqPm', 'QciProfilePredefined',
+)
+VALUE_PACKAGES = ('Differentiated Mobile Broadband', 'LTE Base Package', 'NR Base Package', 'Energy Efficiency')
+
+
+def _camel(words: List[str]) -> str:
+    return words[0] + ''.join(word.title() for word in words[1:])
+
+
+def _sentence(rng: random.Random, length: int = 14) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(length)).capitalize() + '.'
+
+
+def feature_document(number: int, rng: random.Random) -> str:
+    """Markdown for one synthetic feature, laid out like the converted Ericsson documents"""
+    name = ' '.join(word.title() for word in rng.sample(WORDS, 3))
+    faj = f"{121 + number // 10000} {number % 10000:04d}"  # Unique up to a million documents
+    cxc = f"CXC40{number % 100000:05d}"
+    parameters = [f"{rng.choice(MO_CLASSES)}.{_camel(rng.sample(WORDS, rng.randint(2, 3)))}"
+                  for _ in range(rng.randint(3, 25))]
+    counters = [f"pm{_camel(rng.sample(WORDS, rng.randint(2, 4))).title()}" for _ in range(rng.randint(2, 20))]
+    related = [f"121 {rng.randrange(10000):04d}" for _ in range(rng.randint(0, 4))]
+
+    lines = [
+        "---", f"source_file: synthetic_{number}.html", "---", "", "# ", "", name, "",
+        f"# 1 {name} Overview", "", _sentence(rng), "",
+        "| Feature Name | " + name + " |", "|---|---|",
+        f"| Feature Identity | FAJ {faj} |",
+        f"| Value Package Name | {rng.choice(VALUE_PACKAGES)} |",
+        f"| Value Package Identity | FAJ 801 {rng.randrange(10000):04d} |",
+        "| Node Type | Baseband Radio Node |",
+        f"| Access Type | {rng.choice(('LTE', 'NR'))} |",
+        "| Licensing | License-controlled feature. |", "",
+        "Summary", "", *(_sentence(rng) for _ in range(rng.randint(2, 8))), "",
+        f"# 2 Dependencies of {name}", "", "| Feature | Relationship | Description |", "|---|---|---|",
+        *(f"| Feature {faj_id} (FAJ {faj_id}) | {rng.choice(('Prerequisite', 'Related', 'Conflicting'))} "
+          f"| {_sentence(rng, 8)} |" for faj_id in related), "",
+        f"# 3 Feature Operation of {name}", "", *(_sentence(rng, 20) for _ in range(rng.randint(5, 40))), "",
+        f"# 4 Parameters for {name}", "", "| Parameter | Type | Description |", "|---|---|---|",
+        *(f"| {parameter} | {rng.choice(('Introduced', 'Affecting'))} | See MOM description. |"
+          for parameter in parameters), "",
+        f"# 5 Performance of {name}", "", "| Counter | Description |", "|---|---|",
+        *(f"| {counter} | {_sentence(rng, 6)} |" for counter in counters), "",
+        f"# 6 Activate {name}", "", "Steps", "",
+        f"1. Set the FeatureState.featureState attribute to ACTIVATED in the FeatureState={cxc} MO instance.", "",
+        f"# 7 Deactivate {name}", "", "Steps", "",
+        f"1. Set the FeatureState.featureState attribute to DEACTIVATED in the FeatureState={cxc} MO instance.", "",
+        f"# 8 Engineering Guidelines for {name}", "", *(_sentence(rng, 18) for _ in range(rng.randint(1, 10))), "",
+    ]
+    return "\n".join(lines)
+
+
+def other_document(number: int, rng: random.Random) -> str:
+    """A document without a feature identity (description, guide), which the processor rejects"""
+    return "\n".join([f"# Guide {number}", "", *(_sentence(rng, 20) for _ in range(rng.randint(5, 30))), ""])
+
+
+def generate_corpus(target_dir: Path, files: int, seed: int = 0) -> Dict:
+    """Write `files` synthetic documents into batch directories; returns corpus stats"""
+    target_dir = Path(target_dir)
+    rng = random.Random(seed)
+    total_bytes = 0
+    for number in range(files):
+        batch_dir = target_dir / f"batch{number // FILES_PER_DIRECTORY}"
+        if number % FILES_PER_DIRECTORY == 0:
+            batch_dir.mkdir(parents=True, exist_ok=True)
+        if rng.random() < NON_FEATURE_RATIO:
+            content = other_document(number, rng)
+        else:
+            content = feature_document(number, rng)
+        data = content.encode('utf-8')
+        (batch_dir / f"{number}_synthetic.md").write_bytes(data)
+        total_bytes += len(data)
+    return {'files': files, 'seed': seed, 'bytes': total_bytes}
+
+
+def edit_corpus(corpus_dir: Path, fraction: float, seed: int = 0) -> int:
+    """Append a parameter row to a fraction of the documents (the incremental run's changes)"""
+    paths = sorted(Path(corpus_dir).rglob("*.md"))
+    edited = random.Random(seed).sample(paths, max(1, round(len(paths) * fraction)) if paths else 0)
+    for number, path in enumerate(edited):
+        with open(path, 'a') as f:
+            f.write(f"\n| EUtranCellFDD.benchmarkEdit{number} | Introduced | See MOM description. |\n")
+    return len(edited)
+
+
+def run_processor(source: Path, output: Path, parser: str = 'markdown', workers: int = 1,
+                  extra_args: Optional[List[str]] = None, log_file: Optional[Path] = None) -> Dict:
+    """One profiled process_all() run in a child process: wall time, peak RSS and summary.json"""
+    command = [sys.executable, str(PROCESSOR_SCRIPT), '--source', str(source), '--output', str(output),
+               '--parser', parser, '--workers', str(workers), '--profile'] + (extra_args or [])
+    with open(log_file or os.devnull, 'w') as log:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(process.pid, 0)
+        seconds = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise RuntimeError(f"Processor exited with {process.returncode}: {' '.join(command)}")
+    summary = json.loads((Path(output) / "ericsson_data" / "summary.json").read_text())
+    return {'seconds': seconds, 'peak_rss_kb': usage.ru_maxrss, 'summary': summary}
+
+
+def _run_metrics(result: Dict, files: int) -> Dict:
+    summary = result['summary']
+    stages = summary.get('profile', {}).get('stages', {})
+    batches = summary['processing_stats']['batches']
+    return {
+        'seconds': round(result['seconds'], 3),
+        'files_per_second': round(files / result['seconds'], 1),
+        'peak_rss_mb': round(result['peak_rss_kb'] / 1024, 1),
+        'features': summary['total_features'],
+        'extracted_files': stages.get('read', {}).get('count', 0),  # Cache misses
+        'batch_seconds': round(sum(batch['duration'] for batch in batches), 3),
+        'stage_seconds': {name: stats['total_seconds'] for name, stats in stages.items()},
+        'stages': stages,
+    }
+
+
+def run_benchmark(work_dir: Path, files: int, seed: int = 0, parser: str = 'markdown', workers: int = 1,
+                  edit_fraction: float = 0.05, corpus_dir: Optional[Path] = None, keep: bool = False) -> Dict:
+    """Cold, warm and incremental runs over a (generated) corpus; returns the report"""
+    work_dir = Path(work_dir)
+    output_dir = work_dir / "output"
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    if corpus_dir is None:
+        corpus_dir = work_dir / "corpus"
+        if corpus_dir.exists():
+            shutil.rmtree(corpus_dir)
+        print(f"🧪 Generating {files} synthetic documents in {corpus_dir}")
+        start = time.perf_counter()
+        corpus = generate_corpus(corpus_dir, files, seed)
+        corpus['generation_seconds'] = round(time.perf_counter() - start, 3)
+    else:
+        files = sum(1 for _ in Path(corpus_dir).rglob("*.md"))
+        corpus = {'files': files, 'source': str(corpus_dir),
+                  'bytes': sum(path.stat().st_size for path in Path(corpus_dir).rglob("*.md"))}
+
+    runs = {}
+    for run in RUNS:
+        if run == 'incremental':
+            corpus['edited_files'] = edit_corpus(corpus_dir, edit_fraction, seed)
+        print(f"⏱️  {run} run...")
+        extra_args = ['--incremental'] if run == 'incremental' else None
+        result = run_processor(corpus_dir, output_dir, parser, workers, extra_args=extra_args,
+                               log_file=work_dir / f"{run}.log")
+        runs[run] = _run_metrics(result, files)
+        print(f"   {runs[run]['seconds']:.2f} s, {runs[run]['files_per_second']} files/s, "
+              f"{runs[run]['peak_rss_mb']} MB peak RSS, {runs[run]['extracted_files']} files extracted")
+
+    if not keep:
+        shutil.rmtree(output_dir)
+        if corpus_dir == work_dir / "corpus":
+            shutil.rmtree(corpus_dir)
+
+    return {
+        'version': REPORT_VERSION,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'cpu_count': os.cpu_count()},
+        'config': {'parser': parser, 'workers': workers, 'edit_fraction': edit_fraction},
+        'corpus': corpus,
+        'runs': runs,
+    }
+
+
+def compare_reports(baseline: Dict, current: Dict, tolerance: float = 0.10) -> List[str]:
+    """Regressions of current against baseline: files/s lower or peak RSS higher by more than tolerance"""
+    regressions = []
+    for run in RUNS:
+        if run not in baseline.get('runs', {}) or run not in current.get('runs', {}):
+            continue
+        old, new = baseline['runs'][run], current['runs'][run]
+        if new['files_per_second'] < old['files_per_second'] * (1 - tolerance):
+            regressions.append(f"{run}: {new['files_per_second']} files/s, baseline {old['files_per_second']}")
+        if new['peak_rss_mb'] > old['peak_rss_mb'] * (1 + tolerance):
+            regressions.append(f"{run}: {new['peak_rss_mb']} MB peak RSS, baseline {old['peak_rss_mb']}")
+    return regressions
+
+
+# Main execution
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the Ericsson feature ingestion pipeline')
+    parser.add_argument('--files', type=int, default=1000, help='Synthetic documents to generate (100 to 50000)')
+    parser.add_argument('--corpus', type=Path, help='Benchmark an existing corpus instead of generating one '
+                                                    '(edited in place by the incremental run)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic corpus')
+    parser.add_argument('--parser', default='markdown', help='Processor parse backend')
+    parser.add_argument('--workers', type=int, default=1, help='Processor worker processes')
+    parser.add_argument('--edit-fraction', type=float, default=0.05,
+                        help='Share of documents edited before the incremental run')
+    parser.add_argument('--work-dir', type=Path, default=Path('benchmark_work'),
+                        help='Directory for the corpus and processor output')
+    parser.add_argument('--keep', action='store_true', help='Keep the generated corpus and output')
+    parser.add_argument('--report', type=Path, default=Path('ingestion-benchmark-report.json'),
+                        help='Where to write the JSON report')
+    parser.add_argument('--compare', type=Path, metavar='BASELINE',
+                        help='Compare against an earlier report; exit 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='Allowed files/s drop or peak RSS growth before --compare fails')
+
+    args = parser.parse_args()
+
+    args.work_dir.mkdir(parents=True, exist_ok=True)
+    report = run_benchmark(args.work_dir, args.files, args.seed, args.parser, args.workers,
+                           args.edit_fraction, args.corpus, args.keep)
+    args.report.write_text(json.dumps(report, indent=2))
+    print(f"📄 Report written to {args.report}")
+
+    if args.compare:
+        regressions = compare_reports(json.loads(args.compare.read_text()), report, args.tolerance)
+        for regression in regressions:
+            print(f"❌ Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+        print("✅ No regressions against baseline")
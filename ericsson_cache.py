@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Feature extraction cache for the Ericsson feature processor
+Stores (inode, mtime, size, hash, feature) per source file so unchanged files
+are neither re-parsed nor re-hashed. Two backends: a single SQLite database
+keyed by absolute source path (default) and the original flat directory of
+per-stem JSON files.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+
+@dataclass
+class CacheEntry:
+    """Cached extraction result for one source file"""
+    mtime_ns: int
+    size: int
+    file_hash: str
+    feature: Optional[Dict]  # None when the file has no valid FAJ ID
+    inode: int = 0
+    hash_algorithm: str = 'md5'
+
+    def matches_stat(self, stat: os.stat_result) -> bool:
+        """True if the file looks untouched since it was cached"""
+        return (self.inode, self.size, self.mtime_ns) == (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def _xxhash_digest(data: bytes) -> str:
+    try:
+        import xxhash
+    except ImportError as e:
+        raise ValueError("xxhash digest requested but the xxhash package is not installed") from e
+    return xxhash.xxh3_128_hexdigest(data)
+
+
+# Digest functions for source file hashes
+HASH_ALGORITHMS = {
+    'md5': lambda data: hashlib.md5(data).hexdigest(),
+    'blake2b': lambda data: hashlib.blake2b(data, digest_size=16).hexdigest(),
+    'xxhash': _xxhash_digest,
+}
+
+
+def file_digest(data: bytes, algorithm: str = 'md5') -> str:
+    """Hex digest of file content with the given algorithm"""
+    return HASH_ALGORITHMS[algorithm](data)
+
+
+class DirectoryFeatureCache:
+    """One JSON file per source stem in a flat directory (original layout)
+
+    Stems can collide across batch directories; the stored source path is
+    checked so a colliding entry is treated as a miss and overwritten.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _entry_file(self, source_path: str) -> Path:
+        return self.cache_dir / f"{Path(source_path).stem}.json"
+
+    def get(self, source_path: str) -> Optional[CacheEntry]:
+        entry_file = self._entry_file(source_path)
+        if not entry_file.exists():
+            return None
+        data = json.loads(entry_file.read_text())
+        if data.get('source_path', source_path) != source_path:
+            return None
+        return CacheEntry(
+            mtime_ns=data.get('mtime_ns', 0),
+            size=data.get('size', 0),
+            file_hash=data.get('file_hash', ''),
+            feature=data.get('feature'),
+            inode=data.get('inode', 0),
+            hash_algorithm=data.get('hash_algorithm', 'md5')
+        )
+
+    def stat_matches(self, source_path: str, stat: os.stat_result, hash_algorithm: str) -> bool:
+        """True if the file has a cache entry made with hash_algorithm and looks untouched since"""
+        entry = self.get(source_path)
+        return entry is not None and entry.hash_algorithm == hash_algorithm and entry.matches_stat(stat)
+
+    def put(self, source_path: str, entry: CacheEntry):
+        data = {
+            'source_path': source_path,
+            'inode': entry.inode,
+            'mtime_ns': entry.mtime_ns,
+            'size': entry.size,
+            'hash_algorithm': entry.hash_algorithm,
+            'file_hash': entry.file_hash,
+            'feature': entry.feature
+        }
+        self._entry_file(source_path).write_text(json.dumps(data, indent=2))
+
+    def flush(self):
+        """Entries are written immediately"""
+
+    def compact(self, live_paths: Iterable[str]) -> int:
+        """Delete entries whose source file is no longer in live_paths"""
+        live_stems = {Path(path).stem for path in live_paths}
+        removed = 0
+        for entry_file in self.cache_dir.glob("*.json"):
+            if entry_file.stem not in live_stems:
+                entry_file.unlink()
+                removed += 1
+        return removed
+
+    def close(self):
+        pass
+
+
+class SQLiteFeatureCache:
+    """All entries in one SQLite database keyed by absolute source path
+
+    The whole table is read with a single query on first lookup; new entries
+    are buffered and written in one transaction per flush().
+    """
+
+    SCHEMA_VERSION = 2
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._entries: Optional[Dict[str, tuple]] = None  # path -> row, feature JSON undecoded
+        self._pending: Dict[str, CacheEntry] = {}
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path))
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != self.SCHEMA_VERSION:
+                # It is only a cache: rebuild instead of migrating
+                self._conn.execute("DROP TABLE IF EXISTS features")
+                self._conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS features (
+                    path TEXT PRIMARY KEY,
+                    inode INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    hash_algorithm TEXT NOT NULL,
+                    file_hash TEXT NOT NULL,
+                    feature TEXT
+                )
+            """)
+        return self._conn
+
+    def load_all(self) -> Dict[str, tuple]:
+        """Bulk-load every entry of the corpus with one query"""
+        if self._entries is None:
+            rows = self.conn.execute(
+                "SELECT path, inode, mtime_ns, size, hash_algorithm, file_hash, feature FROM features"
+            )
+            self._entries = {row[0]: row[1:] for row in rows}
+        return self._entries
+
+    def get(self, source_path: str) -> Optional[CacheEntry]:
+        if source_path in self._pending:
+            return self._pending[source_path]
+        row = self.load_all().get(source_path)
+        if row is None:
+            return None
+        inode, mtime_ns, size, hash_algorithm, file_hash, feature = row
+        return CacheEntry(mtime_ns, size, file_hash, json.loads(feature) if feature else None,
+                          inode, hash_algorithm)
+
+    def stat_matches(self, source_path: str, stat: os.stat_result, hash_algorithm: str) -> bool:
+        """True if the file has a cache entry made with hash_algorithm and looks untouched since
+
+        Unlike get(), the cached feature is not decoded.
+        """
+        if source_path in self._pending:
+            entry = self._pending[source_path]
+            return entry.hash_algorithm == hash_algorithm and entry.matches_stat(stat)
+        row = self.load_all().get(source_path)
+        if row is None:
+            return False
+        inode, mtime_ns, size, row_algorithm = row[:4]
+        return (row_algorithm == hash_algorithm
+                and (inode, size, mtime_ns) == (stat.st_ino, stat.st_size, stat.st_mtime_ns))
+
+    def put(self, source_path: str, entry: CacheEntry):
+        self._pending[source_path] = entry
+
+    def flush(self):
+        """Write buffered entries in a single transaction"""
+        if not self._pending:
+            return
+        rows = [
+            (path, entry.inode, entry.mtime_ns, entry.size, entry.hash_algorithm, entry.file_hash,
+             json.dumps(entry.feature) if entry.feature is not None else None)
+            for path, entry in self._pending.items()
+        ]
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO features VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        if self._entries is not None:
+            self._entries.update((row[0], row[1:]) for row in rows)
+        self._pending.clear()
+
+    def compact(self, live_paths: Iterable[str]) -> int:
+        """Delete entries whose source file is no longer in live_paths and VACUUM"""
+        self.flush()
+        live = set(live_paths)
+        stale = [path for path in self.load_all() if path not in live]
+        with self.conn:
+            self.conn.executemany("DELETE FROM features WHERE path = ?", [(path,) for path in stale])
+        for path in stale:
+            del self._entries[path]
+        self.conn.execute("VACUUM")
+        return len(stale)
+
+    def close(self):
+        self.flush()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+CACHE_BACKENDS = ('sqlite', 'directory')
+
+
+def open_feature_cache(backend: str, cache_dir: Path):
+    """Create the cache backend; nothing is opened until first use"""
+    if backend == 'sqlite':
+        return SQLiteFeatureCache(Path(cache_dir) / "features.sqlite")
+    if backend == 'directory':
+        return DirectoryFeatureCache(cache_dir)
+    raise ValueError(f"Unknown cache backend: {backend}")
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Compact binary feature corpus
+All features in one file: a fixed header, length-prefixed records and an
+offset table keyed by FAJ id, so a reader can mmap the file and decode single
+features on demand. Records are msgpack-encoded when the msgpack package is
+installed, compact JSON otherwise; the codec is recorded in the header.
+"""
+
+import importlib.util
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+CORPUS_FILENAME = "features.corpus"
+
+MAGIC = b'EFCORPUS'
+VERSION = 1
+# magic, version, codec id, record count, offset table position, offset table length
+HEADER = struct.Struct('<8sHHIQQ')
+RECORD_LENGTH = struct.Struct('<I')
+
+CODECS = {1: 'json', 2: 'msgpack'}
+
+
+def _codec_functions(codec: str):
+    """(encode, decode) for a codec name"""
+    if codec == 'msgpack':
+        import msgpack
+        return msgpack.packb, lambda data: msgpack.unpackb(data, raw=False)
+    if codec == 'json':
+        return (lambda obj: json.dumps(obj, separators=(',', ':')).encode('utf-8'),
+                lambda data: json.loads(data))
+    raise ValueError(f"Unknown corpus codec: {codec}")
+
+
+def default_codec() -> str:
+    """msgpack if installed, stdlib JSON otherwise"""
+    return 'msgpack' if importlib.util.find_spec('msgpack') is not None else 'json'
+
+
+class CorpusWriter:
+    """Append feature dicts and write the offset table on close
+
+    The file is built under a temporary name and renamed into place, so
+    readers never see a half-written corpus. Adding an id again makes the
+    table point at the newer record.
+
+    With append=True an existing corpus is patched in place instead: new
+    records and a new offset table go after the old data and the header is
+    rewritten last, so until close() readers still see the previous corpus.
+    Replaced and removed records stay in the file as dead bytes; once they
+    outweigh the live records, close() writes a compacted copy instead.
+    """
+
+    def __init__(self, path: Path, codec: Optional[str] = None, append: bool = False):
+        self.path = Path(path)
+        self._append_from: Optional[int] = None  # Original file size when patching in place
+        if append and self.path.exists():
+            with CorpusReader(self.path) as reader:
+                self.codec = reader.codec
+                offsets = dict(reader.offsets)
+                sizes = reader.record_sizes()
+            self._encode, _ = _codec_functions(self.codec)
+            self._offsets: Dict[str, int] = offsets
+            self._sizes: Dict[str, int] = sizes
+            self._temp_path = None
+            self._file = open(self.path, 'r+b')
+            self._append_from = self._file.seek(0, os.SEEK_END)
+            return
+        self.codec = codec or default_codec()
+        self._encode, _ = _codec_functions(self.codec)
+        self._offsets = {}
+        self._sizes = {}
+        self._temp_path = self.path.with_name(f".{self.path.name}.tmp")
+        self._file = open(self._temp_path, 'wb')
+        self._file.write(b'\0' * HEADER.size)
+
+    def add(self, feature: Dict):
+        record = self._encode(feature)
+        self._offsets[feature['id']] = self._file.tell()
+        self._sizes[feature['id']] = RECORD_LENGTH.size + len(record)
+        self._file.write(RECORD_LENGTH.pack(len(record)))
+        self._file.write(record)
+
+    def remove(self, feature_id: str):
+        """Drop an id from the offset table"""
+        self._offsets.pop(feature_id, None)
+        self._sizes.pop(feature_id, None)
+
+    @property
+    def live_bytes(self) -> int:
+        """Size of the records the offset table points at"""
+        return sum(self._sizes.values())
+
+    @property
+    def dead_bytes(self) -> int:
+        """Size of replaced and removed records and of superseded offset tables"""
+        return self._file.tell() - HEADER.size - self.live_bytes
+
+    def _compact(self):
+        """Turn a patch in place into a full write of the live records only"""
+        source = self._file
+        source.flush()
+        self._temp_path = self.path.with_name(f".{self.path.name}.tmp")
+        self._file = open(self._temp_path, 'wb')
+        try:
+            self._file.write(b'\0' * HEADER.size)
+            for feature_id, offset in self._offsets.items():
+                source.seek(offset)
+                self._offsets[feature_id] = self._file.tell()
+                self._file.write(source.read(self._sizes[feature_id]))
+        except BaseException:
+            self._file.close()
+            os.unlink(self._temp_path)
+            self._file, self._temp_path = source, None
+            self.abort()
+            raise
+        source.close()
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self._temp_path is None and self.dead_bytes > self.live_bytes:
+            self._compact()
+        table = self._encode(self._offsets)
+        table_offset = self._file.tell()
+        self._file.write(table)
+        codec_id = next(key for key, name in CODECS.items() if name == self.codec)
+        if self._temp_path is None:
+            # Everything the new header points at must be on disk before the header
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, codec_id, len(self._offsets), table_offset, len(table)))
+        self._file.close()
+        if self._temp_path is not None:
+            os.replace(self._temp_path, self.path)
+
+    def abort(self):
+        """Discard the partially written corpus (or the appended records)"""
+        if self._file.closed:
+            return
+        if self._temp_path is None:
+            self._file.truncate(self._append_from)
+            self._file.close()
+        else:
+            self._file.close()
+            os.unlink(self._temp_path)
+
+    def __enter__(self) -> 'CorpusWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class CorpusReader:
+    """Memory-mapped corpus; features are decoded only when asked for"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, codec_id, count, table_offset, table_length = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"Not a version {VERSION} feature corpus: {self.path}")
+        self.codec = CODECS[codec_id]
+        _, self._decode = _codec_functions(self.codec)
+        self.offsets: Dict[str, int] = self._decode(self._mmap[table_offset:table_offset + table_length])
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __contains__(self, feature_id: str) -> bool:
+        return feature_id in self.offsets
+
+    def ids(self) -> List[str]:
+        return list(self.offsets)
+
+    def record_sizes(self) -> Dict[str, int]:
+        """Bytes each feature's record takes up in the file, length prefix included"""
+        return {feature_id: RECORD_LENGTH.size + RECORD_LENGTH.unpack_from(self._mmap, offset)[0]
+                for feature_id, offset in self.offsets.items()}
+
+    def get(self, feature_id: str) -> Optional[Dict]:
+        """Decode a single feature, or None if the id is not in the corpus"""
+        offset = self.offsets.get(feature_id)
+        if offset is None:
+            return None
+        (length,) = RECORD_LENGTH.unpack_from(self._mmap, offset)
+        start = offset + RECORD_LENGTH.size
+        return self._decode(self._mmap[start:start + length])
+
+    def items(self) -> Iterator[Tuple[str, Dict]]:
+        """(id, feature) in the order the features were written"""
+        for feature_id in self.offsets:
+            yield feature_id, self.get(feature_id)
+
+    def close(self):
+        self._mmap.close()
+
+    def __enter__(self) -> 'CorpusReader':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class LazyFeatureMap(Mapping):
+    """Feature id -> feature dict over a corpus, decoded on first access and kept
+
+    Only the offset table is read up front, so building the map does not
+    scale with the size of the feature bodies.
+    """
+
+    def __init__(self, corpus: CorpusReader):
+        self.corpus = corpus
+        self._decoded: Dict[str, Dict] = {}
+
+    def __getitem__(self, feature_id: str) -> Dict:
+        feature = self._decoded.get(feature_id)
+        if feature is None:
+            feature = self.corpus.get(feature_id)
+            if feature is None:
+                raise KeyError(feature_id)
+            self._decoded[feature_id] = feature
+        return feature
+
+    def __contains__(self, feature_id) -> bool:
+        return feature_id in self.corpus
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.corpus.offsets)
+
+    def __len__(self) -> int:
+        return len(self.corpus)
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Feature dependency graph for activation planning
+Built from the prerequisites/conflicts/related FAJ lists extracted per
+feature. Features are dense ordinals (see ericsson_postings.FeatureIdTable);
+the transitive prerequisites of every feature and the conflicts are stored
+as integer bitsets, so "what must be active before X" and "do these
+conflict" are a bit test or an AND instead of a graph walk.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from ericsson_postings import FeatureIdTable
+
+DEPENDENCY_GRAPH_FILENAME = "dependency_graph.json"
+DEPENDENCY_GRAPH_VERSION = 1
+
+
+def _bits(bitset: int) -> Iterator[int]:
+    """Positions of the set bits, lowest first"""
+    while bitset:
+        low = bitset & -bitset
+        yield low.bit_length() - 1
+        bitset ^= low
+
+
+class FeatureDependencyGraph:
+    """Prerequisite, conflict and related edges between features
+
+    Referenced FAJ ids without a processed feature are nodes too (listed by
+    missing_features()): they still have to be activated first. Call
+    build() after adding features to find cycles and compute the closures.
+    """
+
+    def __init__(self):
+        self.ids = FeatureIdTable()
+        self.documented: List[bool] = []
+        self.prerequisites: List[List[int]] = []  # Direct prerequisites per ordinal
+        self.related: List[List[int]] = []
+        self.conflicts: List[int] = []  # Symmetric conflict bitset per ordinal
+        self.closure: List[int] = []  # Transitive prerequisites bitset per ordinal
+        self.cycles: List[List[str]] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _node(self, feature_id: str) -> int:
+        ordinal = self.ids.ordinal(feature_id)
+        if ordinal == len(self.prerequisites):
+            self.documented.append(False)
+            self.prerequisites.append([])
+            self.related.append([])
+            self.conflicts.append(0)
+        return ordinal
+
+    def add_feature(self, feature_id: str, prerequisites: Iterable[str] = (),
+                    conflicts: Iterable[str] = (), related: Iterable[str] = ()):
+        ordinal = self._node(feature_id)
+        self.documented[ordinal] = True
+        for prerequisite in dict.fromkeys(prerequisites):
+            other = self._node(prerequisite)
+            if other != ordinal and other not in self.prerequisites[ordinal]:
+                self.prerequisites[ordinal].append(other)
+        for conflict in conflicts:
+            other = self._node(conflict)
+            if other != ordinal:
+                self.conflicts[ordinal] |= 1 << other
+                self.conflicts[other] |= 1 << ordinal
+        for feature in dict.fromkeys(related):
+            other = self._node(feature)
+            if other != ordinal and other not in self.related[ordinal]:
+                self.related[ordinal].append(other)
+
+    @classmethod
+    def from_features(cls, features: Dict) -> 'FeatureDependencyGraph':
+        """Graph over processed features (EricssonFeature objects or their dicts)"""
+        graph = cls()
+        for feature_id, feature in features.items():
+            dependencies = feature['dependencies'] if isinstance(feature, dict) else feature.dependencies
+            graph.add_feature(feature_id, dependencies.get('prerequisites', ()),
+                              dependencies.get('conflicts', ()), dependencies.get('related', ()))
+        graph.build()
+        return graph
+
+    def _strongly_connected_components(self) -> List[List[int]]:
+        """Tarjan's algorithm without recursion; components come out prerequisites first"""
+        index: Dict[int, int] = {}
+        lowlink: Dict[int, int] = {}
+        stack: List[int] = []
+        on_stack = set()
+        components = []
+        for root in range(len(self.prerequisites)):
+            if root in index:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, child = work.pop()
+                if child == 0:
+                    index[node] = lowlink[node] = len(index)
+                    stack.append(node)
+                    on_stack.add(node)
+                edges = self.prerequisites[node]
+                if child < len(edges):
+                    work.append((node, child + 1))
+                    target = edges[child]
+                    if target not in index:
+                        work.append((target, 0))
+                    elif target in on_stack:
+                        lowlink[node] = min(lowlink[node], index[target])
+                    continue
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+        return components
+
+    def build(self):
+        """Find prerequisite cycles and compute every feature's transitive prerequisites"""
+        self.closure = [0] * len(self.prerequisites)
+        self.cycles = []
+        for component in self._strongly_connected_components():
+            # Prerequisites of a component were finished before it
+            bitset = 0
+            for node in component:
+                for prerequisite in self.prerequisites[node]:
+                    bitset |= (1 << prerequisite) | self.closure[prerequisite]
+            if len(component) > 1:
+                self.cycles.append(self.ids.resolve(sorted(component)))
+            else:
+                bitset &= ~(1 << component[0])
+            for node in component:
+                self.closure[node] = bitset
+
+    def missing_features(self) -> List[str]:
+        """Referenced FAJ ids that have no processed feature"""
+        return [feature_id for feature_id, documented in zip(self.ids.ids, self.documented) if not documented]
+
+    def _ordinal(self, feature_id: str) -> int:
+        if feature_id not in self.ids.ordinals:
+            raise KeyError(f"Unknown feature: {feature_id}")
+        return self.ids.ordinals[feature_id]
+
+    def requires(self, feature_id: str, prerequisite_id: str) -> bool:
+        """True if prerequisite_id must be active before feature_id (directly or transitively)"""
+        if prerequisite_id not in self.ids.ordinals:
+            return False
+        return bool(self.closure[self._ordinal(feature_id)] >> self.ids.ordinals[prerequisite_id] & 1)
+
+    def all_prerequisites(self, feature_id: str) -> List[str]:
+        """Every feature that must be active before feature_id"""
+        return self.ids.resolve(_bits(self.closure[self._ordinal(feature_id)]))
+
+    def conflicts_with(self, feature_id: str, other_id: str) -> bool:
+        if other_id not in self.ids.ordinals:
+            return False
+        return bool(self.conflicts[self._ordinal(feature_id)] >> self.ids.ordinals[other_id] & 1)
+
+    def related_features(self, feature_id: str) -> List[str]:
+        return self.ids.resolve(self.related[self._ordinal(feature_id)])
+
+    def _expand(self, feature_ids: Iterable[str]) -> int:
+        bitset = 0
+        for feature_id in feature_ids:
+            ordinal = self._ordinal(feature_id)
+            bitset |= (1 << ordinal) | self.closure[ordinal]
+        return bitset
+
+    def find_conflicts(self, feature_ids: Iterable[str], include_prerequisites: bool = True) -> List[Tuple[str, str]]:
+        """Conflicting pairs within a feature set (and the prerequisites it pulls in)"""
+        feature_ids = list(feature_ids)
+        if include_prerequisites:
+            selected = self._expand(feature_ids)
+        else:
+            selected = 0
+            for feature_id in feature_ids:
+                selected |= 1 << self._ordinal(feature_id)
+        pairs = []
+        for ordinal in _bits(selected):
+            for other in _bits(self.conflicts[ordinal] & selected):
+                if other > ordinal:
+                    pairs.append((self.ids.ids[ordinal], self.ids.ids[other]))
+        return pairs
+
+    def activation_order(self, feature_ids: Iterable[str]) -> List[str]:
+        """The features and all their prerequisites, each after its prerequisites
+
+        Raises ValueError if the set contains a prerequisite cycle. Among
+        features whose prerequisites are satisfied, lower ordinals (earlier
+        processed) come first, so the order is deterministic.
+        """
+        selected = self._expand(feature_ids)
+        for cycle in self.cycles:
+            if selected >> self.ids.ordinals[cycle[0]] & 1:
+                raise ValueError(f"Prerequisite cycle: {' -> '.join(cycle)}")
+
+        order: List[int] = []
+        activated = 0
+        pending = list(_bits(selected))
+        while pending:
+            ready = [ordinal for ordinal in pending if not self.closure[ordinal] & ~activated]
+            for ordinal in ready:
+                activated |= 1 << ordinal
+            order.extend(ready)
+            pending = [ordinal for ordinal in pending if not activated >> ordinal & 1]
+        return self.ids.resolve(order)
+
+    def to_json(self) -> Dict:
+        return {
+            'version': DEPENDENCY_GRAPH_VERSION,
+            'ids': self.ids.ids,
+            'documented': self.documented,
+            'prerequisites': self.prerequisites,
+            'related': self.related,
+            'conflicts': [list(_bits(bitset)) for bitset in self.conflicts],
+            'closure': [format(bitset, 'x') for bitset in self.closure],
+            'cycles': self.cycles,
+        }
+
+    def save(self, path: Path):
+        Path(path).write_text(json.dumps(self.to_json(), separators=(',', ':')))
+
+    @classmethod
+    def load(cls, path: Path) -> 'FeatureDependencyGraph':
+        """Read a saved graph; closures are loaded, not recomputed"""
+        data = json.loads(Path(path).read_text())
+        if data.get('version') != DEPENDENCY_GRAPH_VERSION:
+            raise ValueError(f"Unsupported dependency graph version: {path}")
+        graph = cls()
+        graph.ids = FeatureIdTable(data['ids'])
+        graph.documented = data['documented']
+        graph.prerequisites = data['prerequisites']
+        graph.related = data['related']
+        graph.conflicts = [sum(1 << other for other in others) for others in data['conflicts']]
+        graph.closure = [int(bitset, 16) for bitset in data['closure']]
+        graph.cycles = data['cycles']
+        return graph
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Cross-release feature diff
+Compares two processed feature sets (ericsson_data output directories or
+extraction caches) matched by FAJ id. Every feature is summarized by its
+source file hash and a short digest per field; the processor stores these
+in feature_digests.json, so unchanged features are skipped by comparing
+hashes and only the fields whose digests differ are decoded and compared.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from ericsson_cache import DirectoryFeatureCache, SQLiteFeatureCache
+from ericsson_corpus import CORPUS_FILENAME, CorpusReader
+
+DIGESTS_FILENAME = "feature_digests.json"
+DIGESTS_VERSION = 1
+
+# Where a feature came from and when, not what it says
+UNDIFFED_FIELDS = {'id', 'source_file', 'file_hash', 'processed_at'}
+# Lists of named items, compared item by item
+NAMED_LIST_FIELDS = ('parameters', 'counters', 'events')
+# Scalars reported with their old and new value
+VALUE_FIELDS = ('name', 'cxc_code', 'value_package', 'access_type', 'node_type',
+                'activation_step', 'deactivation_step')
+
+
+def _digest(value) -> str:
+    data = json.dumps(value, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def feature_digest(feature: Dict) -> Dict:
+    """Source file hash and per-field content digests of a feature dict"""
+    return {
+        'file_hash': feature.get('file_hash', ''),
+        'fields': {name: _digest(value) for name, value in feature.items() if name not in UNDIFFED_FIELDS},
+    }
+
+
+def load_digests(path: Path) -> Dict[str, Dict]:
+    """Digests saved by save_digests(), empty if missing or of another version"""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text())
+    return data['features'] if data.get('version') == DIGESTS_VERSION else {}
+
+
+def save_digests(path: Path, digests: Dict[str, Dict]):
+    Path(path).write_text(json.dumps({'version': DIGESTS_VERSION, 'features': digests},
+                                     separators=(',', ':')))
+
+
+@dataclass
+class FeatureSnapshot:
+    """Digests of one processed feature set plus a loader for full features"""
+    label: str
+    digests: Dict[str, Dict]
+    load_feature: Callable[[str], Optional[Dict]]
+
+    @classmethod
+    def from_features(cls, features: Dict[str, Dict], label: str = '') -> 'FeatureSnapshot':
+        return cls(label, {fid: feature_digest(f) for fid, f in features.items()}, features.get)
+
+    @classmethod
+    def open(cls, path: Path) -> 'FeatureSnapshot':
+        """ericsson_data directory, SQLite cache file or directory cache"""
+        path = Path(path)
+        if path.is_file():
+            return cls._from_sqlite_cache(path)
+        if (path / "features.sqlite").exists():
+            return cls._from_sqlite_cache(path / "features.sqlite")
+        if (path / CORPUS_FILENAME).exists() or (path / "features").is_dir():
+            return cls._from_data_dir(path)
+        if path.is_dir():
+            return cls._from_directory_cache(path)
+        raise FileNotFoundError(f"No processed features found at {path}")
+
+    @classmethod
+    def _from_data_dir(cls, data_dir: Path) -> 'FeatureSnapshot':
+        corpus_file = data_dir / CORPUS_FILENAME
+        if corpus_file.exists():
+            corpus = CorpusReader(corpus_file)
+            load_feature, ids = corpus.get, corpus.ids()
+        else:
+            files = {}
+            for feature_file in (data_dir / "features").glob("*.json"):
+                files[feature_file.stem[len('feature_'):].replace('_', ' ')] = feature_file
+            load_feature, ids = (lambda fid: json.loads(files[fid].read_text()) if fid in files else None), files
+
+        digests = load_digests(data_dir / DIGESTS_FILENAME)
+        if digests:
+            return cls(str(data_dir), digests, load_feature)
+        # Written before digests were stored: compute them once from the features
+        return cls(str(data_dir), {fid: feature_digest(load_feature(fid)) for fid in ids}, load_feature)
+
+    @classmethod
+    def _from_cache_features(cls, label: str, features: List[Dict]) -> 'FeatureSnapshot':
+        # Several source files may extract the same FAJ id; the last one wins, as in the processor
+        return cls.from_features({feature['id']: feature for feature in features}, label)
+
+    @classmethod
+    def _from_sqlite_cache(cls, db_path: Path) -> 'FeatureSnapshot':
+        cache = SQLiteFeatureCache(db_path)
+        try:
+            rows = sorted(cache.load_all().items())
+        finally:
+            cache.close()
+        return cls._from_cache_features(str(db_path), [json.loads(row[-1]) for _, row in rows if row[-1]])
+
+    @classmethod
+    def _from_directory_cache(cls, cache_dir: Path) -> 'FeatureSnapshot':
+        cache = DirectoryFeatureCache(cache_dir)
+        entries = (json.loads(entry_file.read_text()) for entry_file in sorted(cache.cache_dir.glob("*.json")))
+        return cls._from_cache_features(str(cache_dir), [entry['feature'] for entry in entries if entry.get('feature')])
+
+
+@dataclass
+class FeatureChange:
+    """What changed in one feature present in both snapshots"""
+    id: str
+    name: str
+    fields: List[str]
+    values: Dict[str, Dict] = field(default_factory=dict)  # Field -> {'old', 'new'}
+    items: Dict[str, Dict[str, List[str]]] = field(default_factory=dict)  # Field -> added/removed/changed names
+
+    def to_json(self) -> Dict:
+        return {'id': self.id, 'name': self.name, 'fields': self.fields, 'values': self.values, 'items': self.items}
+
+
+def _item_changes(old: List[Dict], new: List[Dict]) -> Dict[str, List[str]]:
+    old_items = {item.get('name', ''): item for item in old}
+    new_items = {item.get('name', ''): item for item in new}
+    return {
+        'added': sorted(new_items.keys() - old_items.keys()),
+        'removed': sorted(old_items.keys() - new_items.keys()),
+        'changed': sorted(name for name in old_items.keys() & new_items.keys() if old_items[name] != new_items[name]),
+    }
+
+
+def compare_features(old: Dict, new: Dict, fields: List[str]) -> FeatureChange:
+    """Detail the given (already known to differ) fields of two versions of a feature"""
+    change = FeatureChange(new['id'], new.get('name', ''), fields)
+    for name in fields:
+        if name in NAMED_LIST_FIELDS:
+            change.items[name] = _item_changes(old.get(name) or [], new.get(name) or [])
+        elif name in VALUE_FIELDS:
+            change.values[name] = {'old': old.get(name), 'new': new.get(name)}
+    return change
+
+
+def diff_snapshots(old: FeatureSnapshot, new: FeatureSnapshot) -> Dict:
+    """Structured changelog from old to new
+
+    Features with the same source file hash are unchanged without looking
+    at their fields; otherwise only fields with different digests are
+    decoded and compared.
+    """
+    added = sorted(new.digests.keys() - old.digests.keys())
+    removed = sorted(old.digests.keys() - new.digests.keys())
+    changed: List[FeatureChange] = []
+    unchanged = 0
+    for feature_id in sorted(old.digests.keys() & new.digests.keys()):
+        old_digest, new_digest = old.digests[feature_id], new.digests[feature_id]
+        if old_digest['file_hash'] and old_digest['file_hash'] == new_digest['file_hash']:
+            unchanged += 1
+            continue
+        old_fields, new_fields = old_digest['fields'], new_digest['fields']
+        fields = sorted(name for name in old_fields.keys() | new_fields.keys()
+                        if old_fields.get(name) != new_fields.get(name))
+        if not fields:
+            unchanged += 1
+            continue
+        changed.append(compare_features(old.load_feature(feature_id), new.load_feature(feature_id), fields))
+
+    def named(snapshot: FeatureSnapshot, ids: List[str]) -> List[Dict]:
+        return [{'id': fid, 'name': (snapshot.load_feature(fid) or {}).get('name', '')} for fid in ids]
+
+    return {
+        'old': old.label,
+        'new': new.label,
+        'summary': {'added': len(added), 'removed': len(removed), 'changed': len(changed), 'unchanged': unchanged},
+        'added': named(new, added),
+        'removed': named(old, removed),
+        'changed': [change.to_json() for change in changed],
+    }
+
+
+def format_changelog(changelog: Dict) -> str:
+    """Markdown rendering of a diff_snapshots() changelog"""
+    summary = changelog['summary']
+    lines = [f"# Feature changes: {changelog['old']} → {changelog['new']}", "",
+             f"{summary['added']} added, {summary['removed']} removed, "
+             f"{summary['changed']} changed, {summary['unchanged']} unchanged", ""]
+    for section in ('added', 'removed'):
+        if changelog[section]:
+            lines += [f"## {section.title()} features", ""]
+            lines += [f"- {feature['name']} (FAJ {feature['id']})" for feature in changelog[section]]
+            lines.append("")
+    if changelog['changed']:
+        lines += ["## Changed features", ""]
+    for change in changelog['changed']:
+        lines.append(f"### {change['name']} (FAJ {change['id']})")
+        lines.append(f"Fields: {', '.join(change['fields'])}")
+        for name, value in change['values'].items():
+            lines.append(f"- {name}: {value['old']} → {value['new']}")
+        for name, items in change['items'].items():
+            for kind in ('added', 'removed', 'changed'):
+                if items[kind]:
+                    lines.append(f"- {name} {kind}: {', '.join(items[kind])}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+# Main execution
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Diff two processed Ericsson feature sets')
+    parser.add_argument('old', help='Old ericsson_data directory, features.sqlite cache or cache directory')
+    parser.add_argument('new', help='New ericsson_data directory, features.sqlite cache or cache directory')
+    parser.add_argument('--json', metavar='FILE', help='Write the structured changelog to FILE')
+
+    args = parser.parse_args()
+
+    changelog = diff_snapshots(FeatureSnapshot.open(args.old), FeatureSnapshot.open(args.new))
+    if args.json:
+        Path(args.json).write_text(json.dumps(changelog, indent=2))
+    print(format_changelog(changelog))
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Streaming source file discovery for the Ericsson feature processor
+Walks the source tree with os.scandir and hands files to the processor through
+a bounded queue, so parsing starts while the walk (slow on network mounts)
+is still running.
+"""
+
+import os
+import queue
+import threading
+from pathlib import Path, PurePosixPath
+from typing import Iterator, List, Optional
+
+DEFAULT_INCLUDE = ['*.md']
+
+
+def _matches(relative_path: str, patterns: List[str]) -> bool:
+    """Glob match against the path relative to the source root (PurePath.match rules)"""
+    path = PurePosixPath(relative_path)
+    return any(path.match(pattern) for pattern in patterns)
+
+
+def iter_source_files(root: Path, include: Optional[List[str]] = None,
+                      exclude: Optional[List[str]] = None, sort: bool = False) -> Iterator[Path]:
+    """Yield files under root matching include and not exclude, as they are found
+
+    Files of a directory come before its subdirectories, in scandir order
+    (the same order as Path.rglob) or by name when sort is set. Excluded
+    directories are not descended into; symlinked directories are not followed.
+    """
+    include = include or DEFAULT_INCLUDE
+    exclude = exclude or []
+    root = Path(root)
+    stack = [(root, '')]
+    while stack:
+        directory, prefix = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except PermissionError:
+            continue
+        if sort:
+            entries.sort(key=lambda entry: entry.name)
+
+        subdirs = []
+        for entry in entries:
+            relative_path = prefix + entry.name
+            if exclude and _matches(relative_path, exclude):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append((directory / entry.name, relative_path + '/'))
+            elif _matches(relative_path, include):
+                yield directory / entry.name
+        # Depth first: the first subdirectory is walked completely before the next
+        stack.extend(reversed(subdirs))
+
+
+class DiscoveryStream:
+    """Iterate discovered files while a background thread keeps walking
+
+    At most queue_size paths are buffered ahead of the consumer. Closing the
+    stream (or leaving its with-block) stops the walk; complete tells whether
+    discovered counts the whole tree or only the part walked until then.
+    """
+
+    _DONE = object()
+
+    def __init__(self, files: Iterator[Path], queue_size: int = 1000):
+        self.discovered = 0
+        self.complete = False
+        self.finished = False
+        self._files = files
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._walk, name='file-discovery', daemon=True)
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _walk(self):
+        try:
+            for path in self._files:
+                if not self._put(path):
+                    return
+                self.discovered += 1
+            self.complete = True
+        except BaseException as e:
+            self._error = e
+        self._put(self._DONE)
+
+    def __iter__(self) -> Iterator[Path]:
+        while not self.finished:
+            item = self._queue.get()
+            if item is self._DONE:
+                self.finished = True
+                if self._error is not None:
+                    raise self._error
+                return
+            yield item
+
+    @property
+    def running(self) -> bool:
+        """True while the tree walk is still in progress"""
+        return self._thread.is_alive()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+
+    def __enter__(self) -> 'DiscoveryStream':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Parsed document model for Ericsson feature documentation
+Builds headings, section spans, classified tables and full text in one pass
+so the feature extractors never re-walk the parse tree
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+# Headings that close a section (compared by tag name, as h1 < h2 < h3)
+SECTION_BREAK_TAGS = ('h1', 'h2', 'h3')
+
+# (tag name, raw text) for each sibling node of a heading's parent
+Block = Tuple[Optional[str], str]
+
+
+@dataclass
+class DocumentTable:
+    """A table with its text and cells extracted once"""
+    text: str
+    headers: List[str]  # Lowercased <th> texts
+    rows: List[List[str]]  # All cells (td and th) per row
+    data_rows: List[List[str]]  # <td> cells of every row after the first
+
+    @property
+    def is_feature_identity(self) -> bool:
+        return 'Feature Name' in self.text
+
+    @property
+    def is_parameter_table(self) -> bool:
+        return any('parameter' in h for h in self.headers)
+
+    @property
+    def is_event_table(self) -> bool:
+        return any('event' in h for h in self.headers)
+
+
+@dataclass
+class DocumentHeading:
+    """An h2-h4 heading and the position of its section among its siblings"""
+    name: str  # Tag name, e.g. 'h2'
+    text: str
+    blocks: List[Block] = field(repr=False)
+    start: int = 0  # Index of the first block after the heading
+
+    def section_text(self) -> str:
+        """Stripped text of following blocks until a heading of same or higher level"""
+        content = []
+        for name, text in self.blocks[self.start:]:
+            if name in SECTION_BREAK_TAGS and name <= self.name:
+                break
+            text = text.strip()
+            if text:
+                content.append(text)
+        return '\n'.join(content)
+
+    def block_text(self) -> str:
+        """Raw text of following blocks until any h1-h3 heading"""
+        content = ""
+        for name, text in self.blocks[self.start:]:
+            if name in SECTION_BREAK_TAGS:
+                break
+            content += text + " "
+        return content
+
+
+@dataclass
+class ParsedDocument:
+    """Everything the feature extractors need from one markdown document"""
+    full_text: str
+    title: Optional[str] = None  # Text of the first h1
+    headings: List[DocumentHeading] = field(default_factory=list)
+    paragraphs: List[str] = field(default_factory=list)  # Stripped <p> texts
+    tables: List[DocumentTable] = field(default_factory=list)
+    _sections: Dict[str, str] = field(default_factory=dict, repr=False)
+
+    @property
+    def identity_tables(self) -> List[DocumentTable]:
+        return [t for t in self.tables if t.is_feature_identity]
+
+    @property
+    def parameter_tables(self) -> List[DocumentTable]:
+        return [t for t in self.tables if t.is_parameter_table]
+
+    @property
+    def event_tables(self) -> List[DocumentTable]:
+        return [t for t in self.tables if t.is_event_table]
+
+    def section_headings(self) -> List[DocumentHeading]:
+        """h2 and h3 headings in document order"""
+        return [h for h in self.headings if h.name in ('h2', 'h3')]
+
+    def find_section(self, section_name: str) -> str:
+        """Content of the first h2/h3 section whose heading contains section_name"""
+        if section_name not in self._sections:
+            needle = section_name.lower()
+            content = ""
+            for heading in self.section_headings():
+                if needle in heading.text.lower():
+                    content = heading.section_text()
+                    break
+            self._sections[section_name] = content
+        return self._sections[section_name]
+
+    @classmethod
+    def from_soup(cls, soup) -> 'ParsedDocument':
+        """Build the document model with a single walk over the parse tree"""
+        # Text of each top-level node is computed once and reused for the
+        # full text, section spans and top-level paragraphs
+        sibling_blocks: Dict[int, Tuple[List[Block], Dict[int, int]]] = {}
+
+        def blocks_of(parent) -> Tuple[List[Block], Dict[int, int]]:
+            if id(parent) not in sibling_blocks:
+                sibling_blocks[id(parent)] = (
+                    [(child.name, child.get_text() if hasattr(child, 'get_text') else '')
+                     for child in parent.contents],
+                    {id(child): i for i, child in enumerate(parent.contents)}
+                )
+            return sibling_blocks[id(parent)]
+
+        top_blocks, _ = blocks_of(soup)
+        document = cls(full_text=''.join(text for _, text in top_blocks))
+
+        for tag in _iter_tags(soup, ('h1', 'h2', 'h3', 'h4', 'p', 'table')):
+            if tag.name == 'p':
+                if tag.parent is soup:
+                    blocks, positions = blocks_of(soup)
+                    text = blocks[positions[id(tag)]][1]
+                else:
+                    text = tag.get_text()
+                document.paragraphs.append(text.strip())
+            elif tag.name == 'table':
+                document.tables.append(_table_from_soup(tag))
+            elif tag.name == 'h1':
+                if document.title is None:
+                    document.title = tag.get_text()
+            else:
+                blocks, positions = blocks_of(tag.parent)
+                document.headings.append(DocumentHeading(
+                    name=tag.name,
+                    text=tag.get_text(),
+                    blocks=blocks,
+                    start=positions[id(tag)] + 1
+                ))
+
+        return document
+
+
+def _iter_tags(root, names: Tuple[str, ...]):
+    """Descendant tags with one of the given names, in document order
+
+    Equivalent to root.find_all(list(names)) without the per-node filter overhead.
+    """
+    for node in root.descendants:
+        if node.name in names:
+            yield node
+
+
+def _table_from_soup(table) -> DocumentTable:
+    """Extract text, headers and cells of a <table> element
+
+    Cell texts are only materialized for tables the extractors consume.
+    """
+    rows = []
+    headers = []
+    for element in _iter_tags(table, ('tr', 'td', 'th')):
+        if element.name == 'tr':
+            rows.append([])
+        elif rows:
+            rows[-1].append(element)
+        if element.name == 'th':
+            headers.append(element.get_text().strip().lower())
+
+    document_table = DocumentTable(text=table.get_text(), headers=headers, rows=[], data_rows=[])
+    if (document_table.is_feature_identity or document_table.is_parameter_table
+            or document_table.is_event_table):
+        cell_rows = [[(cell.name, cell.get_text().strip()) for cell in row] for row in rows]
+        document_table.rows = [[text for _, text in row] for row in cell_rows]
+        document_table.data_rows = [[text for name, text in row if name == 'td']
+                                    for row in cell_rows[1:]]
+    return document_table
+
+
+def markdown_to_html(content: str) -> str:
+    """Render markdown with the extensions the HTML backend relies on"""
+    # Only this backend needs markdown and bs4 (see ericsson_markdown for the other)
+    import markdown
+
+    return markdown.markdown(
+        content,
+        extensions=['tables', 'fenced_code', 'toc']
+    )
+
+
+def html_to_soup(html: str):
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, 'html.parser')
+
+
+def parse_html_document(content: str) -> ParsedDocument:
+    """Parse markdown via markdown→HTML→BeautifulSoup into a ParsedDocument"""
+    return ParsedDocument.from_soup(html_to_soup(markdown_to_html(content)))
@@ -8,15 +8,50 @@ Based on Skill_Seekers architecture adapted for local Ericsson documentation
 import os
 import sys
 import json
-import re
-import hashlib
 import time
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from dataclasses import dataclass, field, asdict
 from typing import Dict, List, Optional, Set, Tuple
-from collections import defaultdict
-import markdown
-from bs4 import BeautifulSoup
+from collections import Counter, defaultdict
+
+from ericsson_cache import CACHE_BACKENDS, HASH_ALGORITHMS, CacheEntry, file_digest, open_feature_cache
+from ericsson_corpus import CORPUS_FILENAME, CorpusWriter
+from ericsson_dependencies import DEPENDENCY_GRAPH_FILENAME, FeatureDependencyGraph
+from ericsson_diff import DIGESTS_FILENAME, feature_digest, load_digests, save_digests
+from ericsson_discovery import DiscoveryStream, iter_source_files
+from ericsson_document import ParsedDocument, html_to_soup, markdown_to_html
+from ericsson_markdown import parse_markdown_document
+from ericsson_name_lookup import (
+    COMPLETIONS_FILENAME, DEFAULT_PARAMETER_SPREADSHEET, FuzzyNameIndex, PrefixCompleter,
+    read_parameter_spreadsheet
+)
+from ericsson_patterns import (
+    ACTIVATION_STEP, CXC_CODE, DEACTIVATION_STEP, FAJ_ID, FAJ_REFERENCE,
+    PARAMETER_MENTION, PATTERNS, PM_COUNTER, SECTION_CXC_CODE
+)
+from ericsson_postings import FeatureIdTable, PostingIndex
+from ericsson_profiling import StageProfiler
+from ericsson_similarity import SIMILARITY_FILENAME, FeatureSimilarityIndex
+
+
+# Incremental build state (see save_state)
+STATE_FILENAME = "incremental_state.json"
+STATE_VERSION = 2
+
+# Markdown parse backends producing the ParsedDocument consumed by the extractors,
+# as (profiler stage, step) pairs applied in order to the file content
+PARSE_BACKENDS = {
+    # markdown → HTML → BeautifulSoup
+    'html': [
+        ('parse.markdown_to_html', markdown_to_html),
+        ('parse.soup', html_to_soup),
+        ('parse.document', ParsedDocument.from_soup),
+    ],
+    # Direct tokenizer, no HTML round trip
+    'markdown': [('parse.tokenize', parse_markdown_document)],
+}
 
 
 @dataclass
@@ -65,31 +100,73 @@ class EricssonFeature:
 class EricssonFeatureProcessor:
     """Scalable processor for Ericsson feature documentation"""
 
-    def __init__(self, source_dir: str, output_dir: str = "output", batch_size: int = 50):
+    def __init__(self, source_dir: str, output_dir: str = "output", batch_size: int = 50,
+                 workers: int = 1, parse_backend: str = 'html', cache_backend: str = 'sqlite',
+                 hash_algorithm: str = 'md5', include: Optional[List[str]] = None,
+                 exclude: Optional[List[str]] = None, sort_files: bool = False,
+                 checkpoint_batches: int = 5, checkpoint_seconds: Optional[float] = None,
+                 streaming: bool = False, incremental: bool = False, write_corpus: bool = True,
+                 parameter_spreadsheet: Optional[Path] = DEFAULT_PARAMETER_SPREADSHEET,
+                 profile: bool = False, profile_memory: bool = False, profile_trace: Optional[Path] = None):
         self.source_dir = Path(source_dir)
         self.output_dir = Path(output_dir)
         self.batch_size = batch_size
-
-        # Data storage
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        if parse_backend not in PARSE_BACKENDS:
+            raise ValueError(f"Unknown parse backend: {parse_backend}")
+        self.parse_backend = parse_backend
+        self.parse_steps = PARSE_BACKENDS[parse_backend]
+        self.cache_backend = cache_backend
+        if hash_algorithm not in HASH_ALGORITHMS:
+            raise ValueError(f"Unknown hash algorithm: {hash_algorithm}")
+        self.hash_algorithm = hash_algorithm
+        self.include = include
+        self.exclude = exclude
+        self.sort_files = sort_files
+        self.checkpoint_batches = checkpoint_batches
+        self.checkpoint_seconds = checkpoint_seconds
+        self.streaming = streaming
+        self.incremental = incremental
+        self.write_corpus = write_corpus
+        self.parameter_spreadsheet = parameter_spreadsheet
+        self.profile_trace = profile_trace
+        self.profiler = StageProfiler(profile, profile_memory, trace=profile_trace is not None)
+        self._corpus_writer: Optional[CorpusWriter] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+        # Data storage (slim copies of already saved features in streaming mode)
         self.features: Dict[str, EricssonFeature] = {}
+        self._unsaved: Dict[str, None] = {}  # Ids recorded since the last flush_features(), in order
+        self.feature_digests: Dict[str, Dict] = {}  # Per-field digests of saved features, for diffs
+        self.sources: Dict[str, Optional[str]] = {}  # Absolute source path -> feature id (None: no FAJ ID)
+        self.failed_sources: Dict[str, List[int]] = {}  # Absolute path -> (inode, size, mtime_ns) of files that raised
+        self._patch: Optional[Tuple[List[str], List[str]]] = None  # (changed, removed) ids of an incremental run
         self.processed_files: Set[str] = set()
         self.error_files: List[Tuple[str, str]] = []  # (file, error)
+        self.completed_files: List[str] = []  # Every file handled so far, for checkpoints
 
-        # Search indices
-        self.parameter_index = defaultdict(list)
-        self.counter_index = defaultdict(list)
-        self.cxc_index = {}
-        self.name_index = {}
+        # Search indices: key -> sorted feature ordinals (see feature_ids)
+        self.feature_ids = FeatureIdTable()
+        self.parameter_index = PostingIndex()
+        self.counter_index = PostingIndex()
+        self.cxc_index = PostingIndex()
+        self.name_index = PostingIndex()
+        self.name_lookup: Optional[FuzzyNameIndex] = None  # Built on first find_names()
+        self.similarity_index: Optional[FeatureSimilarityIndex] = None  # Built on first similar_features()
 
         # Create output directories
         self.setup_directories()
 
+        # Extraction cache (only touched by the parent process)
+        self.cache = open_feature_cache(cache_backend, self.output_dir / "ericsson_data" / "cache")
+
         # Statistics
         self.stats = {
             'total_files': 0,
             'processed': 0,
             'errors': 0,
             'start_time': time.time(),
+            'resumed': 0,
             'batches': []
         }
 
@@ -112,46 +189,107 @@ class EricssonFeatureProcessor:
         for dir_path in dirs:
             dir_path.mkdir(parents=True, exist_ok=True)
 
+    def iter_files(self):
+        """Matching source files, yielded lazily in walk order"""
+        return iter_source_files(self.source_dir, self.include, self.exclude, self.sort_files)
+
     def discover_files(self) -> List[Path]:
         """Discover all markdown files in source directory"""
         print(f"🔍 Discovering markdown files in {self.source_dir}")
 
-        md_files = list(self.source_dir.rglob("*.md"))
+        md_files = list(self.iter_files())
         self.stats['total_files'] = len(md_files)
 
         print(f"📊 Found {len(md_files)} markdown files")
         return md_files
 
-    def process_all(self, limit: Optional[int] = None):
-        """Process all files with batching for scalability"""
-        md_files = self.discover_files()
+    def process_all(self, limit: Optional[int] = None, resume: bool = False):
+        """Process all files with batching for scalability
 
-        if limit:
-            md_files = md_files[:limit]
-            print(f"🎯 Processing limited to {limit} files")
+        Batches are dispatched as soon as discovery has produced enough files.
+        With resume, files covered by the last checkpoint are restored from the
+        cache instead of being batched again. In incremental mode only changed
+        sources are processed when a previous run's state is available.
+        """
+        if self.incremental and self.process_changes():
+            return
 
-        # Process in batches to manage memory
-        for i in range(0, len(md_files), self.batch_size):
-            batch = md_files[i:i + self.batch_size]
-            batch_num = i // self.batch_size + 1
-            total_batches = (len(md_files) + self.batch_size - 1) // self.batch_size
+        completed = self.load_progress() if resume else set()
 
-            print(f"\n📦 Processing batch {batch_num}/{total_batches} ({len(batch)} files)")
+        print(f"🔍 Discovering markdown files in {self.source_dir}")
+        discovery = DiscoveryStream(self.iter_files(), queue_size=max(1000, self.batch_size * 2))
+        md_files = iter(discovery)
+        if completed:
+            md_files = (file_path for file_path in md_files
+                        if not self._resume_file(file_path, completed))
 
-            batch_start = time.time()
-            batch_stats = self.process_batch(batch)
-            batch_stats['batch_num'] = batch_num
-            batch_stats['duration'] = time.time() - batch_start
+        if limit:
+            md_files = islice(md_files, limit)
+            print(f"🎯 Processing limited to {limit} files")
 
-            self.stats['batches'].append(batch_stats)
+        if self.workers > 1:
+            print(f"⚙️  Using {self.workers} worker processes")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self._worker_config(),)
+            )
 
-            # Save intermediate results
-            if batch_num % 5 == 0:
-                self.save_progress()
-                print(f"💾 Saved progress after batch {batch_num}")
+        try:
+            # Process in batches to manage memory
+            batch_num = len(self.stats['batches'])
+            last_checkpoint = (batch_num, time.time())
+            taken = 0
+            while True:
+                batch = list(islice(md_files, self.batch_size))
+                if not batch:
+                    break
+                taken += len(batch)
+                batch_num += 1
+                walking = ", discovery still running" if discovery.running else ""
+                print(f"\n📦 Processing batch {batch_num} ({len(batch)} files{walking})")
+
+                batch_start = time.time()
+                batch_stats = self.process_batch(batch)
+                if self.streaming:
+                    self.flush_features()
+                self.profiler.call('cache.flush', self.cache.flush)
+                batch_stats['batch_num'] = batch_num
+                batch_stats['duration'] = time.time() - batch_start
+
+                self.stats['batches'].append(batch_stats)
+
+                # Save intermediate results
+                if self._checkpoint_due(batch_num, *last_checkpoint):
+                    self.save_progress()
+                    last_checkpoint = (batch_num, time.time())
+                    print(f"💾 Saved progress after batch {batch_num}")
+        except BaseException:
+            if self._corpus_writer is not None:
+                self._corpus_writer.abort()
+                self._corpus_writer = None
+            raise
+        finally:
+            discovery.close()
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+            self.cache.flush()
+
+        if discovery.complete:
+            self.stats['total_files'] = discovery.discovered
+            print(f"📊 Found {discovery.discovered} markdown files")
+        else:
+            # The limit stopped the walk early; its partial count depends on timing
+            self.stats['total_files'] = taken + self.stats['resumed']
+            print(f"📊 Processed {taken} markdown files (limit reached, source tree not fully scanned)")
 
         # Final processing
-        self.build_indices()
+        if self.streaming:
+            # Features restored after the last batch are still unsaved
+            self.flush_features()
+        else:
+            self.build_indices()
         self.save_all()
 
         # Build advanced search indices (optional)
@@ -160,6 +298,122 @@ class EricssonFeatureProcessor:
         # Print summary
         self.print_summary()
 
+    def process_changes(self) -> bool:
+        """Incremental build: reprocess added or modified sources, drop features of deleted ones
+
+        Unchanged sources are recognized by their cached stat without
+        decoding anything; unchanged features stay as the slim copies saved in
+        the state file. Only the changed features' JSON files, corpus records,
+        digests and index postings are rewritten. Returns False (nothing done)
+        without usable state from a previous run.
+        """
+        state = self.load_state()
+        if state is None:
+            print("ℹ️  No incremental state from a previous run, processing everything")
+            return False
+
+        print(f"🔍 Checking {self.source_dir} for changed files")
+        previous_sources = state['sources']
+        previous_features = state['features']
+        self.failed_sources = state['failed']
+        current = set()
+        changed_files = []
+        for file_path in self.iter_files():
+            path = os.path.abspath(file_path)
+            current.add(path)
+            try:
+                stat = file_path.stat()
+            except OSError:
+                changed_files.append(file_path)
+                continue
+            if path in previous_sources:
+                unchanged = self.cache.stat_matches(path, stat, self.hash_algorithm)
+            else:
+                # Files that failed are retried once they change
+                unchanged = self.failed_sources.get(path) == [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+            if not unchanged:
+                changed_files.append(file_path)
+        for path in [path for path in self.failed_sources if path not in current]:
+            del self.failed_sources[path]
+        deleted = [path for path in previous_sources if path not in current]
+        self.stats['total_files'] = len(current)
+        if not changed_files and not deleted:
+            print("✅ No source changes, outputs are up to date")
+            return True
+        print(f"🔄 {len(changed_files)} added or modified, {len(deleted)} deleted source files")
+
+        self.sources = dict(previous_sources)
+        self.features = {feature_id: EricssonFeature(**data) for feature_id, data in previous_features.items()}
+        self.feature_digests = load_digests(self.output_dir / "ericsson_data" / DIGESTS_FILENAME)
+        self.build_indices()  # From the slim copies, in memory
+        if self.write_corpus:
+            self._corpus_writer = CorpusWriter(self.output_dir / "ericsson_data" / CORPUS_FILENAME, append=True)
+
+        touched_ids = {previous_sources.get(os.path.abspath(file_path)) for file_path in changed_files}
+        touched_ids.update(previous_sources[path] for path in deleted)
+        touched_ids.discard(None)
+        for path in deleted:
+            del self.sources[path]
+
+        try:
+            batch_stats = self.process_batch(changed_files)
+            batch_stats['batch_num'] = len(self.stats['batches']) + 1
+            self.stats['batches'].append(batch_stats)
+
+            # Touched but identical content: keep the saved feature
+            for feature_id in list(self._unsaved):
+                previous = previous_features.get(feature_id)
+                if previous is not None and previous['file_hash'] == self.features[feature_id].file_hash:
+                    self.features[feature_id] = EricssonFeature(**previous)
+                    del self._unsaved[feature_id]
+
+            # Features no changed source provides any more: restore them from another
+            # source with the same FAJ ID, or remove them
+            removed = []
+            orphaned = touched_ids - set(self._unsaved) - set(self.sources.get(os.path.abspath(f)) for f in changed_files)
+            if orphaned:
+                providers = defaultdict(list)
+                for path, feature_id in self.sources.items():
+                    if feature_id in orphaned:
+                        providers[feature_id].append(path)
+                for feature_id in sorted(orphaned):
+                    if feature_id in providers:
+                        file_path = Path(providers[feature_id][-1])
+                        feature, error = _process_file_safely(self, file_path)
+                        self._record_result(file_path, feature, error, batch_stats)
+                    else:
+                        self.remove_feature(feature_id)
+                        removed.append(feature_id)
+
+            changed = list(self._unsaved)
+            self.flush_features()
+        except BaseException:
+            if self._corpus_writer is not None:
+                self._corpus_writer.abort()
+                self._corpus_writer = None
+            raise
+        finally:
+            self.cache.flush()
+
+        print(f"✏️  {len(changed)} features updated, {len(removed)} removed")
+        self._patch = (changed, removed)
+        self.save_all()
+        self.build_advanced_search_indices()
+        self.print_summary()
+        self._patch = None
+        return True
+
+    def remove_feature(self, feature_id: str):
+        """Delete a feature and its outputs: JSON file, corpus record, digest and index postings"""
+        self.features.pop(feature_id, None)
+        self._unsaved.pop(feature_id, None)
+        self.remove_feature_index(feature_id)
+        self.feature_digests.pop(feature_id, None)
+        feature_file = self.output_dir / "ericsson_data" / "features" / f"feature_{feature_id.replace(' ', '_')}.json"
+        feature_file.unlink(missing_ok=True)
+        if self._corpus_writer is not None:
+            self._corpus_writer.remove(feature_id)
+
     def process_batch(self, files: List[Path]) -> Dict:
         """Process a batch of files"""
         batch_stats = {
@@ -169,23 +423,15 @@ class EricssonFeatureProcessor:
             'features': 0
         }
 
-        for file_path in files:
-            try:
-                feature = self.process_file(file_path)
-                if feature:
-                    self.features[feature.id] = feature
-                    self.processed_files.add(str(file_path))
-                    batch_stats['features'] += 1
-                    batch_stats['processed'] += 1
-                else:
-                    batch_stats['errors'] += 1
-                    self.error_files.append((str(file_path), "No valid FAJ ID found"))
-            except Exception as e:
-                batch_stats['errors'] += 1
-                self.error_files.append((str(file_path), str(e)))
-                print(f"  ✗ Error processing {file_path.name}: {e}")
+        if self._executor is not None:
+            results = self._process_in_workers(files)
+        else:
+            results = (_process_file_safely(self, file_path) for file_path in files)
 
-            self.stats['processed'] += 1
+        for file_path, (feature, error) in zip(files, results):
+            if error is not None:
+                print(f"  ✗ Error processing {file_path.name}: {error}")
+            self._record_result(file_path, feature, error, batch_stats)
 
             # Progress indicator
             if batch_stats['processed'] % 10 == 0:
@@ -193,197 +439,284 @@ class EricssonFeatureProcessor:
 
         return batch_stats
 
+    def _record_result(self, file_path: Path, feature: Optional[EricssonFeature],
+                       error: Optional[str], batch_stats: Dict):
+        """Add one file's outcome to the features, error list and counters"""
+        if error is not None:
+            batch_stats['errors'] += 1
+            self.error_files.append((str(file_path), error))
+            path = os.path.abspath(file_path)
+            self.sources.pop(path, None)
+            try:
+                stat = os.stat(path)
+                self.failed_sources[path] = [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+            except OSError:
+                pass
+        elif feature:
+            self.failed_sources.pop(os.path.abspath(file_path), None)
+            self.sources[os.path.abspath(file_path)] = feature.id
+            self.features[feature.id] = feature
+            self._unsaved[feature.id] = None
+            self.processed_files.add(str(file_path))
+            batch_stats['features'] += 1
+            batch_stats['processed'] += 1
+        else:
+            batch_stats['errors'] += 1
+            self.error_files.append((str(file_path), "No valid FAJ ID found"))
+            self.failed_sources.pop(os.path.abspath(file_path), None)
+            self.sources[os.path.abspath(file_path)] = None
+
+        self.completed_files.append(str(file_path))
+        self.stats['processed'] += 1
+
+    def _process_in_workers(self, files: List[Path]):
+        """Resolve cache hits here and extract the misses in worker processes
+
+        Yields (feature, error) in file order, so merging is identical to a
+        serial run over the same batch.
+        """
+        lookups = []
+        for file_path in files:
+            try:
+                lookups.append(self.profiler.call('cache.lookup', self._lookup_cache, file_path))
+            except Exception:
+                # Let the worker run into (and report) the same error
+                lookups.append((False, None, None, None))
+
+        misses = [(file_path, file_hash) for file_path, (hit, _, file_hash, _) in zip(files, lookups)
+                  if not hit]
+        chunksize = max(1, len(misses) // (self.workers * 4))
+        extracted = self._merge_worker_stats(self._executor.map(
+            _extract_file_in_worker,
+            [file_path for file_path, _ in misses],
+            [file_hash for _, file_hash in misses],
+            chunksize=chunksize
+        ))
+
+        for file_path, (hit, feature, _, stat) in zip(files, lookups):
+            if hit:
+                yield feature, None
+                continue
+            feature, file_hash, error = next(extracted)
+            if error is None and stat is not None:
+                self.profiler.call('cache.put', self._cache_result, file_path, stat, file_hash, feature)
+            yield feature, error
+
+    def _worker_config(self) -> Dict:
+        """Constructor arguments used to build the per-process worker processor"""
+        return {
+            'source_dir': str(self.source_dir),
+            'output_dir': str(self.output_dir),
+            'batch_size': self.batch_size,
+            'parse_backend': self.parse_backend,
+            'cache_backend': self.cache_backend,
+            'hash_algorithm': self.hash_algorithm,
+            'profile': self.profiler.enabled,
+            'profile_memory': self.profiler.track_memory,
+            # Workers only need to record trace events; the parent writes the file
+            'profile_trace': self.profile_trace,
+        }
+
     def process_file(self, file_path: Path) -> Optional[EricssonFeature]:
         """Process a single markdown file"""
         # Check cache first
-        cache_file = self.output_dir / "ericsson_data" / "cache" / f"{file_path.stem}.json"
-        if cache_file.exists():
-            file_hash = self.calculate_file_hash(file_path)
-            cached_data = json.loads(cache_file.read_text())
-            if cached_data.get('file_hash') == file_hash:
-                # Return cached feature
-                return EricssonFeature(**cached_data['feature'])
+        hit, feature, file_hash, stat = self.profiler.call('cache.lookup', self._lookup_cache, file_path)
+        if hit:
+            return feature
+
+        feature, file_hash = self.extract_feature(file_path, file_hash)
+        self.profiler.call('cache.put', self._cache_result, file_path, stat, file_hash, feature)
+        return feature
+
+    def _lookup_cache(self, file_path: Path) -> Tuple[bool, Optional[EricssonFeature], Optional[str], os.stat_result]:
+        """(hit, cached feature, file hash if computed, stat) for a source file
 
-        # Read and parse file
-        content = file_path.read_text(encoding='utf-8')
+        Unchanged (inode, size, mtime) is a hit without reading the file; the
+        content is only hashed when the stat differs from the cached entry.
+        """
+        stat = file_path.stat()
+        entry = self.cache.get(os.path.abspath(file_path))
+        if entry is None or entry.hash_algorithm != self.hash_algorithm:
+            return False, None, None, stat
 
-        # Convert to HTML for easier parsing
-        html = markdown.markdown(
-            content,
-            extensions=['tables', 'fenced_code', 'toc']
-        )
-        soup = BeautifulSoup(html, 'html.parser')
+        file_hash = None
+        if not entry.matches_stat(stat):
+            file_hash = self.calculate_file_hash(file_path)
+            if file_hash != entry.file_hash:
+                return False, None, file_hash, stat
+            # Touched but identical: refresh the stat so the next run skips hashing
+            entry.inode, entry.size, entry.mtime_ns = stat.st_ino, stat.st_size, stat.st_mtime_ns
+            self.cache.put(os.path.abspath(file_path), entry)
+
+        feature = EricssonFeature(**entry.feature) if entry.feature is not None else None
+        return True, feature, file_hash, stat
+
+    def _cache_result(self, file_path: Path, stat: os.stat_result, file_hash: str,
+                      feature: Optional[EricssonFeature]):
+        """Record an extraction result, including files without a valid FAJ ID"""
+        self.cache.put(os.path.abspath(file_path), CacheEntry(
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            file_hash=file_hash,
+            feature=asdict(feature) if feature is not None else None,
+            inode=stat.st_ino,
+            hash_algorithm=self.hash_algorithm
+        ))
+
+    def compact_cache(self) -> int:
+        """Drop cache entries for source files that no longer exist"""
+        live_paths = [os.path.abspath(file_path) for file_path in self.discover_files()]
+        removed = self.cache.compact(live_paths)
+        print(f"🧹 Removed {removed} stale cache entries")
+        return removed
+
+    def extract_feature(self, file_path: Path,
+                        file_hash: Optional[str] = None) -> Tuple[Optional[EricssonFeature], str]:
+        """Parse a markdown file and run all extractors (no caching)
+
+        The file is read once; its hash is computed from the same bytes unless
+        the caller already has it. Returns (feature, file hash).
+        """
+        with self.profiler.file(file_path):
+            return self._extract_feature(file_path, file_hash)
+
+    def _extract_feature(self, file_path: Path,
+                         file_hash: Optional[str]) -> Tuple[Optional[EricssonFeature], str]:
+        run = self.profiler.call  # Each step is a profiler stage (a plain call unless profiling)
+
+        # Read and parse file into a document model shared by all extractors
+        data = run('read', file_path.read_bytes)
+        if file_hash is None:
+            file_hash = run('hash', file_digest, data, self.hash_algorithm)
+        # Same newline handling as read_text()
+        content = data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+        doc = self.parse_document(content)
 
         # Extract feature identity
-        feature = self.extract_feature_identity(soup)
+        feature = run('extract.identity', self.extract_feature_identity, doc)
         if not feature:
-            return None
+            return None, file_hash
 
         # Set metadata
         feature.source_file = str(file_path)
-        feature.file_hash = self.calculate_file_hash(file_path)
+        feature.file_hash = file_hash
         feature.processed_at = time.strftime('%Y-%m-%d %H:%M:%S')
 
         # Extract content sections
-        feature.description = self.extract_section_content(soup, "Overview")
-        feature.summary = self.extract_summary(soup)
+        feature.description = run('extract.description', self.extract_section_content, doc, "Overview")
+        feature.summary = run('extract.summary', self.extract_summary, doc)
 
         # Extract technical details
-        feature.parameters = self.extract_parameters(soup)
-        feature.counters = self.extract_counters(soup)
-        feature.events = self.extract_events(soup)
+        feature.parameters = run('extract.parameters', self.extract_parameters, doc)
+        feature.counters = run('extract.counters', self.extract_counters, doc)
+        feature.events = run('extract.events', self.extract_events, doc)
 
         # Extract dependencies
-        feature.dependencies = self.extract_dependencies(soup)
+        feature.dependencies = run('extract.dependencies', self.extract_dependencies, doc)
 
         # Extract activation/deactivation
-        feature.activation_step = self.extract_activation_step(soup)
-        feature.deactivation_step = self.extract_deactivation_step(soup)
+        feature.activation_step = run('extract.activation_step', self.extract_activation_step, doc)
+        feature.deactivation_step = run('extract.deactivation_step', self.extract_deactivation_step, doc)
 
         # Extract guidelines
-        feature.engineering_guidelines = self.extract_engineering_guidelines(soup)
+        feature.engineering_guidelines = run('extract.engineering_guidelines',
+                                             self.extract_engineering_guidelines, doc)
 
         # Extract impact information
-        feature.network_impact = self.extract_network_impact(soup)
-        feature.performance_impact = self.extract_performance_impact(soup)
+        feature.network_impact = run('extract.network_impact', self.extract_network_impact, doc)
+        feature.performance_impact = run('extract.performance_impact', self.extract_performance_impact, doc)
 
-        # Cache the result
-        cache_data = {
-            'file_hash': feature.file_hash,
-            'feature': asdict(feature)
-        }
-        cache_file.write_text(json.dumps(cache_data, indent=2))
+        return feature, file_hash
 
-        return feature
+    def parse_document(self, content: str) -> ParsedDocument:
+        """Run the parse backend's steps, each timed as its own profiler stage"""
+        parsed = content
+        for stage, step in self.parse_steps:
+            parsed = self.profiler.call(stage, step, parsed)
+        return parsed
 
-    def extract_feature_identity(self, soup: BeautifulSoup) -> Optional[EricssonFeature]:
+    def extract_feature_identity(self, doc: ParsedDocument) -> Optional[EricssonFeature]:
         """Extract feature identity from documentation"""
         # Look for feature identity table
         feature = EricssonFeature()
 
-        # Try multiple patterns for FAJ ID
-        faj_patterns = [
-            r'FAJ\s*(\d+\s+\d+)',  # FAJ 121 3094
-            r'FAJ\s*(\d{3}\s*\d{4})',  # FAJ 1213094
-            r'Feature Identity\s*\|\s*FAJ\s*(\d+\s+\d+)',  # In table
-        ]
-
-        faj_id = None
-        for pattern in faj_patterns:
-            match = re.search(pattern, soup.get_text())
-            if match:
-                faj_id = match.group(1)
-                break
-
-        if not faj_id:
+        # FAJ ID patterns are tried in priority order; the first one that matches wins
+        match = FAJ_ID.search(doc.full_text)
+        if not match:
             return None
 
-        feature.id = faj_id
+        feature.id = match.group(1)
 
         # Extract feature name (usually in first h1)
-        h1 = soup.find('h1')
-        if h1:
-            feature.name = h1.get_text().strip()
+        if doc.title is not None:
+            feature.name = doc.title.strip()
 
         # Extract CXC code from the entire document
-        cxc_pattern = r'FeatureState=(CXC\d+)'
-        cxc_match = re.search(cxc_pattern, soup.get_text())
+        cxc_match = CXC_CODE.search(doc.full_text)
         if cxc_match:
             feature.cxc_code = cxc_match.group(1)
 
         # Extract from feature table if present
-        tables = soup.find_all('table')
-        for table in tables:
-            text = table.get_text()
-            if 'Feature Name' in text:
-                # Parse table rows
-                rows = table.find_all('tr')
-                for row in rows:
-                    cells = row.find_all(['td', 'th'])
-                    if len(cells) >= 2:
-                        key = cells[0].get_text().strip()
-                        value = cells[1].get_text().strip()
-
-                        if 'Feature Name' in key:
-                            feature.name = value
-                        elif 'Value Package Name' in key:
-                            feature.value_package = value
-                        elif 'Value Package Identity' in key:
-                            feature.value_package_id = value
-                        elif 'Node Type' in key:
-                            feature.node_type = value
-                        elif 'Access Type' in key:
-                            feature.access_type = value
-                        elif 'Feature Identity' in key and 'FAJ' in value:
-                            feature.id = re.search(r'FAJ\s*(\d+\s+\d+)', value).group(1)
+        for table in doc.identity_tables:
+            for cells in table.rows:
+                if len(cells) < 2:
+                    continue
+                key, value = cells[0], cells[1]
+
+                if 'Feature Name' in key:
+                    feature.name = value
+                elif 'Value Package Name' in key:
+                    feature.value_package = value
+                elif 'Value Package Identity' in key:
+                    feature.value_package_id = value
+                elif 'Node Type' in key:
+                    feature.node_type = value
+                elif 'Access Type' in key:
+                    feature.access_type = value
+                elif 'Feature Identity' in key and 'FAJ' in value:
+                    feature.id = FAJ_REFERENCE.search(value).group(1)
 
         return feature
 
-    def extract_section_content(self, soup: BeautifulSoup, section_name: str) -> str:
+    def extract_section_content(self, doc: ParsedDocument, section_name: str) -> str:
         """Extract content from a specific section"""
-        # Look for h2 or h3 with the section name
-        for tag in soup.find_all(['h2', 'h3']):
-            if section_name.lower() in tag.get_text().lower():
-                # Get content until next heading of same or higher level
-                content = []
-                current = tag.next_sibling
-
-                while current:
-                    if current.name in ['h1', 'h2', 'h3']:
-                        if current.name <= tag.name:
-                            break
-                    if hasattr(current, 'get_text'):
-                        text = current.get_text().strip()
-                        if text:
-                            content.append(text)
-                    current = current.next_sibling
-
-                return '\n'.join(content)
-
-        return ""
+        # Content of the first h2 or h3 with the section name, up to the next
+        # heading of same or higher level
+        return doc.find_section(section_name)
 
-    def extract_summary(self, soup: BeautifulSoup) -> str:
+    def extract_summary(self, doc: ParsedDocument) -> str:
         """Extract feature summary"""
         # Look for Summary section or first paragraph
-        for p in soup.find_all('p'):
-            text = p.get_text().strip()
+        for text in doc.paragraphs:
             if len(text) > 50 and 'feature' in text.lower():
                 return text
 
         # Look for explicit Summary heading
-        for tag in soup.find_all(['h2', 'h3', 'h4']):
-            if 'summary' in tag.get_text().lower():
-                return self.extract_section_content(soup, tag.get_text())
+        for heading in doc.headings:
+            if 'summary' in heading.text.lower():
+                return self.extract_section_content(doc, heading.text)
 
         return ""
 
-    def extract_parameters(self, soup: BeautifulSoup) -> List[Dict]:
+    def extract_parameters(self, doc: ParsedDocument) -> List[Dict]:
         """Extract parameters from documentation"""
         parameters = []
 
         # Look for parameter tables
-        tables = soup.find_all('table')
-        for table in tables:
-            headers = [th.get_text().strip().lower() for th in table.find_all('th')]
-
-            if any('parameter' in h for h in headers):
-                rows = table.find_all('tr')[1:]  # Skip header
-
-                for row in rows:
-                    cells = row.find_all('td')
-                    if len(cells) >= 2:
-                        param = {
-                            'name': cells[0].get_text().strip(),
-                            'type': cells[1].get_text().strip() if len(cells) > 1 else '',
-                            'description': cells[2].get_text().strip() if len(cells) > 2 else '',
-                            'mo_class': self.extract_mo_class(cells[0].get_text().strip())
-                        }
-                        if param['name']:
-                            parameters.append(param)
+        for table in doc.parameter_tables:
+            for cells in table.data_rows:
+                if len(cells) >= 2:
+                    param = {
+                        'name': cells[0],
+                        'type': cells[1] if len(cells) > 1 else '',
+                        'description': cells[2] if len(cells) > 2 else '',
+                        'mo_class': self.extract_mo_class(cells[0])
+                    }
+                    if param['name']:
+                        parameters.append(param)
 
         # Also look for parameter mentions in text
-        text = soup.get_text()
-        param_mentions = re.findall(r'([A-Z][a-zA-Z]*\.[a-zA-Z][a-zA-Z0-9]*)', text)
+        param_mentions = PARAMETER_MENTION.findall(doc.full_text)
 
         for mention in param_mentions[:10]:  # Limit to avoid too many
             if not any(p['name'] == mention for p in parameters):
@@ -402,20 +735,13 @@ class EricssonFeatureProcessor:
             return param_name.split('.')[0]
         return "Unknown"
 
-    def extract_counters(self, soup: BeautifulSoup) -> List[Dict]:
+    def extract_counters(self, doc: ParsedDocument) -> List[Dict]:
         """Extract performance counters"""
         counters = []
-        text = soup.get_text()
-
-        # Find PM counter patterns
-        counter_patterns = [
-            r'pm([A-Za-z0-9]+)',  # pmCounterName
-            r'PM\s+([A-Za-z0-9]+)',  # PM CounterName
-        ]
 
+        # Find PM counter patterns (pmCounterName and PM CounterName), each alternative searched in turn
         found_counters = set()
-        for pattern in counter_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for matches in PM_COUNTER.findall(doc.full_text).values():
             found_counters.update(matches)
 
         # Create counter entries
@@ -441,32 +767,25 @@ class EricssonFeatureProcessor:
         else:
             return 'General'
 
-    def extract_events(self, soup: BeautifulSoup) -> List[Dict]:
+    def extract_events(self, doc: ParsedDocument) -> List[Dict]:
         """Extract events from documentation"""
         events = []
 
         # Look for event tables
-        tables = soup.find_all('table')
-        for table in tables:
-            headers = [th.get_text().strip().lower() for th in table.find_all('th')]
-
-            if any('event' in h for h in headers):
-                rows = table.find_all('tr')[1:]
-
-                for row in rows:
-                    cells = row.find_all('td')
-                    if len(cells) >= 2:
-                        event = {
-                            'name': cells[0].get_text().strip(),
-                            'type': cells[1].get_text().strip() if len(cells) > 1 else '',
-                            'description': cells[2].get_text().strip() if len(cells) > 2 else ''
-                        }
-                        if event['name']:
-                            events.append(event)
+        for table in doc.event_tables:
+            for cells in table.data_rows:
+                if len(cells) >= 2:
+                    event = {
+                        'name': cells[0],
+                        'type': cells[1] if len(cells) > 1 else '',
+                        'description': cells[2] if len(cells) > 2 else ''
+                    }
+                    if event['name']:
+                        events.append(event)
 
         return events
 
-    def extract_dependencies(self, soup: BeautifulSoup) -> Dict:
+    def extract_dependencies(self, doc: ParsedDocument) -> Dict:
         """Extract feature dependencies"""
         dependencies = {
             'prerequisites': [],
@@ -475,10 +794,10 @@ class EricssonFeatureProcessor:
         }
 
         # Look for Dependencies section
-        dep_section = self.extract_section_content(soup, "Dependencies")
+        dep_section = self.extract_section_content(doc, "Dependencies")
 
         # Extract FAJ references
-        faj_refs = re.findall(r'FAJ\s*(\d+\s+\d+)', dep_section)
+        faj_refs = FAJ_REFERENCE.findall(dep_section)
 
         # Categorize based on context
         for faj in faj_refs:
@@ -491,98 +810,55 @@ class EricssonFeatureProcessor:
 
         return dependencies
 
-    def extract_activation_step(self, soup: BeautifulSoup) -> Optional[str]:
+    def extract_activation_step(self, doc: ParsedDocument) -> Optional[str]:
         """Extract activation command"""
-        # Search entire document with improved pattern matching
-        full_text = soup.get_text()
-
-        # Try exact pattern first (from observed documentation)
-        match = re.search(r'1\.\s+Set the FeatureState\.featureState attribute to ACTIVATED in the (FeatureState=[^\s]+)', full_text)
+        # Exact pattern (from observed documentation), then its fallbacks, tried in order
+        match = ACTIVATION_STEP.search(doc.full_text)
         if match:
             return f"1. Set the FeatureState.featureState attribute to ACTIVATED in the {match.group(1)} MO instance."
 
-        # Try alternative patterns
-        alt_patterns = [
-            r'Set the FeatureState\.featureState attribute to ACTIVATED in the (FeatureState=[^\s]+)',
-            r'ACTIVATED in the (FeatureState=CXC\d+)',
-            r'FeatureState\.featureState.*ACTIVATED.*FeatureState=(CXC\d+)'
-        ]
-
-        for pattern in alt_patterns:
-            match = re.search(pattern, full_text)
-            if match:
-                cxc_code = match.group(1)
-                return f"1. Set the FeatureState.featureState attribute to ACTIVATED in the {cxc_code} MO instance."
-
         # Look for activation section and extract any FeatureState references
-        for tag in soup.find_all(['h2', 'h3']):
-            if 'activate' in tag.get_text().lower():
+        for heading in doc.section_headings():
+            if 'activate' in heading.text.lower():
                 # Look for FeatureState in following content
-                current = tag.next_sibling
-                section_content = ""
-
-                while current and current.name not in ['h1', 'h2', 'h3']:
-                    if hasattr(current, 'get_text'):
-                        section_content += current.get_text() + " "
-                    current = current.next_sibling
+                section_content = heading.block_text()
 
                 if 'FeatureState' in section_content:
                     # Try to extract any FeatureState pattern from this section
-                    match = re.search(r'FeatureState=(CXC\d+)', section_content)
+                    match = SECTION_CXC_CODE.search(section_content)
                     if match:
                         return f"1. Set the FeatureState.featureState attribute to ACTIVATED in the {match.group(1)} MO instance."
 
         return None
 
-    def extract_deactivation_step(self, soup: BeautifulSoup) -> Optional[str]:
+    def extract_deactivation_step(self, doc: ParsedDocument) -> Optional[str]:
         """Extract deactivation command"""
         # Similar to activation but looking for DEACTIVATED
-        full_text = soup.get_text()
-
-        # Try exact pattern first (from observed documentation)
-        match = re.search(r'1\.\s+Set the FeatureState\.featureState attribute to DEACTIVATED in the (FeatureState=[^\s]+)', full_text)
+        # Exact pattern (from observed documentation), then its fallbacks, tried in order
+        match = DEACTIVATION_STEP.search(doc.full_text)
         if match:
             return f"1. Set the FeatureState.featureState attribute to DEACTIVATED in the {match.group(1)} MO instance."
 
-        # Try alternative patterns
-        alt_patterns = [
-            r'Set the FeatureState\.featureState attribute to DEACTIVATED in the (FeatureState=[^\s]+)',
-            r'DEACTIVATED in the (FeatureState=CXC\d+)',
-            r'FeatureState\.featureState.*DEACTIVATED.*FeatureState=(CXC\d+)'
-        ]
-
-        for pattern in alt_patterns:
-            match = re.search(pattern, full_text)
-            if match:
-                cxc_code = match.group(1)
-                return f"1. Set the FeatureState.featureState attribute to DEACTIVATED in the {cxc_code} MO instance."
-
         # Look for deactivation section and extract any FeatureState references
-        for tag in soup.find_all(['h2', 'h3']):
-            if 'deactivate' in tag.get_text().lower():
+        for heading in doc.section_headings():
+            if 'deactivate' in heading.text.lower():
                 # Look for FeatureState in following content
-                current = tag.next_sibling
-                section_content = ""
-
-                while current and current.name not in ['h1', 'h2', 'h3']:
-                    if hasattr(current, 'get_text'):
-                        section_content += current.get_text() + " "
-                    current = current.next_sibling
+                section_content = heading.block_text()
 
                 if 'FeatureState' in section_content:
                     # Try to extract any FeatureState pattern from this section
-                    match = re.search(r'FeatureState=(CXC\d+)', section_content)
+                    match = SECTION_CXC_CODE.search(section_content)
                     if match:
                         return f"1. Set the FeatureState.featureState attribute to DEACTIVATED in the {match.group(1)} MO instance."
 
         return None
 
-    def extract_engineering_guidelines(self, soup: BeautifulSoup) -> str:
+    def extract_engineering_guidelines(self, doc: ParsedDocument) -> str:
         """Extract engineering guidelines"""
         guidelines = []
 
         # Look for Engineering Guidelines section
-        section = self.extract_section_content(soup, "Engineering Guidelines")
+        section = self.extract_section_content(doc, "Engineering Guidelines")
 
         if section:
             # Clean up the content
@@ -602,12 +878,12 @@ class EricssonFeatureProcessor:
 
         return '\n\n'.join(guidelines)
 
-    def extract_network_impact(self, soup: BeautifulSoup) -> Dict:
+    def extract_network_impact(self, doc: ParsedDocument) -> Dict:
         """Extract network impact information"""
         impact = {}
 
         # Look for Network Impact section
-        section = self.extract_section_content(soup, "Network Impact")
+        section = self.extract_section_content(doc, "Network Impact")
 
         if section:
             # Extract key impacts
@@ -620,12 +896,12 @@ class EricssonFeatureProcessor:
 
         return impact
 
-    def extract_performance_impact(self, soup: BeautifulSoup) -> Dict:
+    def extract_performance_impact(self, doc: ParsedDocument) -> Dict:
         """Extract performance impact information"""
         impact = {}
 
         # Look for Performance section
-        section = self.extract_section_content(soup, "Performance")
+        section = self.extract_section_content(doc, "Performance")
 
         if section:
             # Extract key metrics
@@ -637,34 +913,170 @@ class EricssonFeatureProcessor:
         return impact
 
     def calculate_file_hash(self, file_path: Path) -> str:
-        """Calculate MD5 hash of file for caching"""
-        content = file_path.read_bytes()
-        return hashlib.md5(content).hexdigest()
+        """Calculate hash of file for caching (algorithm set by hash_algorithm)"""
+        return file_digest(file_path.read_bytes(), self.hash_algorithm)
 
     def build_indices(self):
         """Build basic search indices for fast lookup (legacy method)"""
         print("\n🔍 Building basic search indices...")
 
+        self.feature_ids = FeatureIdTable()
+        self.parameter_index = PostingIndex()
+        self.counter_index = PostingIndex()
+        self.cxc_index = PostingIndex()
+        self.name_index = PostingIndex()
         for feature in self.features.values():
-            # Parameter index
-            for param in feature.parameters:
-                self.parameter_index[param['name'].lower()].append(feature.id)
+            self.update_feature_index(feature)
+
+        print(f"✅ Built basic indices for {len(self.features)} features")
 
-            # Counter index
-            for counter in feature.counters:
-                self.counter_index[counter['name'].lower()].append(feature.id)
+    def update_feature_index(self, feature: EricssonFeature):
+        """(Re-)index one feature; a feature already indexed has its old keys dropped first"""
+        ordinal = self.feature_ids.ordinal(feature.id)
 
-            # CXC index
-            if feature.cxc_code:
-                self.cxc_index[feature.cxc_code] = feature.id
+        # Parameter index
+        self.parameter_index.replace(ordinal, [param['name'].lower() for param in feature.parameters])
 
-            # Name index
-            name_words = feature.name.lower().split()
-            for word in name_words:
-                if len(word) > 3:
-                    self.name_index[word] = feature.id
+        # Counter index
+        self.counter_index.replace(ordinal, [counter['name'].lower() for counter in feature.counters])
 
-        print(f"✅ Built basic indices for {len(self.features)} features")
+        # CXC index
+        self.cxc_index.replace(ordinal, [feature.cxc_code] if feature.cxc_code else [])
+
+        # Name index
+        self.name_index.replace(ordinal, [word for word in feature.name.lower().split() if len(word) > 3])
+
+    def remove_feature_index(self, feature_id: str):
+        """Drop a deleted feature from the basic indices (its ordinal stays reserved)"""
+        if feature_id in self.feature_ids.ordinals:
+            ordinal = self.feature_ids.ordinals[feature_id]
+            for index in (self.parameter_index, self.counter_index, self.cxc_index, self.name_index):
+                index.remove(ordinal)
+
+    def query_index(self, index_name: str, keys: List[str], match_all: bool = True) -> List[str]:
+        """Feature ids whose entries in an index contain all (or any) of the keys
+
+        index_name is one of 'parameters', 'counters', 'cxc_codes' and 'names';
+        keys are compared lowercased except for CXC codes.
+        """
+        index = self._basic_indices()[index_name]
+        if index_name != 'cxc_codes':
+            keys = [key.lower() for key in keys]
+        ordinals = index.all_of(keys) if match_all else index.any_of(keys)
+        return self.feature_ids.resolve(ordinals)
+
+    def _display_names(self) -> Dict[str, str]:
+        """Lowercased index key -> parameter/counter name as first written in the docs"""
+        display_names = {}
+        for feature in self.features.values():
+            for item in feature.parameters + feature.counters:
+                display_names.setdefault(item['name'].lower(), item['name'])
+        return display_names
+
+    def _spreadsheet_available(self, spreadsheet: Optional[Path]) -> bool:
+        return bool(spreadsheet) and Path(spreadsheet).exists()
+
+    def build_name_lookup(self, spreadsheet: Optional[Path] = None) -> FuzzyNameIndex:
+        """Fuzzy parameter/counter name lookup over the basic indices and the MOM parameter spreadsheet"""
+        spreadsheet = spreadsheet or self.parameter_spreadsheet
+        display_names = self._display_names()
+        lookup = FuzzyNameIndex()
+        lookup.add_posting_index(self.parameter_index, self.feature_ids, 'parameter', display_names)
+        lookup.add_posting_index(self.counter_index, self.feature_ids, 'counter', display_names)
+        if self._spreadsheet_available(spreadsheet):
+            lookup.load_parameter_spreadsheet(spreadsheet)
+        self.name_lookup = lookup
+        return lookup
+
+    def build_completions(self) -> PrefixCompleter:
+        """Parameter name completer ranked by feature count, spreadsheet-only names count 0"""
+        display_names = self._display_names()
+        feature_counts = {display_names.get(key, key): len(ordinals)
+                          for key, ordinals in self.parameter_index.postings.items()}
+        if self._spreadsheet_available(self.parameter_spreadsheet):
+            for name in read_parameter_spreadsheet(self.parameter_spreadsheet):
+                feature_counts.setdefault(name, 0)
+        return PrefixCompleter.build(feature_counts)
+
+    def find_names(self, query: str, top_k: int = 10, kind: Optional[str] = None) -> List[Dict]:
+        """Parameter/counter names matching a possibly misspelled query, with their feature ids"""
+        if self.name_lookup is None:
+            self.build_name_lookup()
+        return self.name_lookup.lookup(query, top_k, kind)
+
+    def build_dependency_graph(self) -> FeatureDependencyGraph:
+        """Prerequisite/conflict graph over the processed features, closures precomputed"""
+        graph = FeatureDependencyGraph.from_features(self.features)
+        if graph.cycles:
+            print(f"⚠️  {len(graph.cycles)} prerequisite cycles: "
+                  + "; ".join(" -> ".join(cycle) for cycle in graph.cycles[:5]))
+        return graph
+
+    def _feature_dicts(self, feature_ids: Optional[List[str]] = None):
+        """(id, feature dict) pairs with full text, re-read from disk for slim copies"""
+        features_dir = self.output_dir / "ericsson_data" / "features"
+        slim = self.streaming or self._patch is not None
+        for feature_id in self.features if feature_ids is None else feature_ids:
+            feature = self.features[feature_id]
+            if slim:
+                feature_file = features_dir / f"feature_{feature_id.replace(' ', '_')}.json"
+                if feature_file.exists():
+                    yield feature_id, json.loads(feature_file.read_text())
+                    continue
+            yield feature_id, vars(feature)
+
+    def build_similarity_index(self, n_clusters: Optional[int] = None) -> FeatureSimilarityIndex:
+        """TF-IDF similarity index over the processed features, clustered into categories"""
+        index = FeatureSimilarityIndex.build(self._feature_dicts())
+        index.cluster(n_clusters)
+        self.similarity_index = index
+        return index
+
+    def update_similarity_index(self, changed: List[str], removed: List[str]) -> FeatureSimilarityIndex:
+        """Patch the saved similarity index with changed and removed features"""
+        similarity_file = self.output_dir / "ericsson_data" / SIMILARITY_FILENAME
+        if not similarity_file.exists():
+            return self.build_similarity_index()
+        index = FeatureSimilarityIndex.load(similarity_file)
+        index.update(self._feature_dicts(changed), removed)
+        self.similarity_index = index
+        return index
+
+    def similar_features(self, feature_id: str, top_k: int = 10) -> List[Dict]:
+        """Features with the most similar description, parameters and counters"""
+        if self.similarity_index is None:
+            self.build_similarity_index()
+        return self.similarity_index.similar(feature_id, top_k)
+
+    def _basic_indices(self) -> Dict[str, PostingIndex]:
+        return {
+            'parameters': self.parameter_index,
+            'counters': self.counter_index,
+            'cxc_codes': self.cxc_index,
+            'names': self.name_index
+        }
+
+    def flush_features(self):
+        """Streaming mode: save and index features recorded since the last flush, then slim them"""
+        for feature_id in self._unsaved:
+            feature = self.features[feature_id]
+            self.save_feature(feature)
+            self.update_feature_index(feature)
+            self.features[feature_id] = _slim_feature(feature)
+        self._unsaved.clear()
+
+    @staticmethod
+    def _report_index_issues(issues: Dict[str, List[str]]) -> int:
+        """Print the result of a search index consistency check; returns the number of issues"""
+        total_issues = sum(len(issue_list) for issue_list in issues.values())
+        if total_issues > 0:
+            print(f"⚠️  Index consistency check found {total_issues} issues:")
+            for issue_type, issue_list in issues.items():
+                if issue_list:
+                    print(f"   {issue_type}: {len(issue_list)} issues")
+        else:
+            print("✅ Index consistency check passed")
+        return total_issues
 
     def build_advanced_search_indices(self):
         """Build advanced search indices using the enhanced search system"""
@@ -677,12 +1089,31 @@ class EricssonFeatureProcessor:
             features_dir = self.output_dir / "ericsson_data" / "features"
             index_builder = EricssonSearchIndexBuilder(str(features_dir), str(self.output_dir))
 
+            # Incremental run: the changes are known, load only the changed features
+            if self._patch is not None and index_builder.load_indices():
+                changed, removed = self._patch
+                index_builder.load_features(changed)
+                index_builder.incremental_update(changed, removed)
+                # The patched postings must still cover exactly the processed features
+                corpus = index_builder.corpus_features()
+                issues = index_builder.check_index_consistency(corpus if corpus is not None else self.features)
+                if self._report_index_issues(issues):
+                    print("🔨 Rebuilding search indices from scratch")
+                    index_builder.load_features()
+                    index_builder.build_all_indices()
+                index_builder.save_indices()
+                index_builder.export_index_summary()
+                self.search_index_builder = index_builder
+                print(f"✅ Search indices patched: {len(changed)} features re-indexed, {len(removed)} removed")
+                return
+
             # Load features
             index_builder.load_features()
 
             # Check if we need incremental updates
             index_file = self.output_dir / "ericsson_data" / "search_index.json"
-            if index_file.exists() and index_builder.load_indices():
+            saved_index_exists = index_file.exists() or index_file.with_suffix('.json.gz').exists()
+            if saved_index_exists and index_builder.load_indices():
                 print("📚 Existing indices found, checking for incremental updates...")
 
                 # Check for changes using feature hashes
@@ -729,15 +1160,7 @@ class EricssonFeatureProcessor:
             index_builder.export_index_summary()
 
             # Run consistency check
-            issues = index_builder.check_index_consistency()
-            total_issues = sum(len(issue_list) for issue_list in issues.values())
-            if total_issues > 0:
-                print(f"⚠️  Index consistency check found {total_issues} issues:")
-                for issue_type, issue_list in issues.items():
-                    if issue_list:
-                        print(f"   {issue_type}: {len(issue_list)} issues")
-            else:
-                print("✅ Index consistency check passed")
+            self._report_index_issues(index_builder.check_index_consistency())
 
             # Store reference for external access
             self.search_index_builder = index_builder
@@ -785,75 +1208,186 @@ class EricssonFeatureProcessor:
 
             return None
 
+    def _merge_worker_stats(self, results):
+        """Fold pattern and profiler stats returned by workers into this process"""
+        for feature, file_hash, error, pattern_stats, profile in results:
+            PATTERNS.merge(pattern_stats)
+            self.profiler.merge(profile)
+            yield feature, file_hash, error
+
+    def _checkpoint_due(self, batch_num: int, last_batch: int, last_time: float) -> bool:
+        """Checkpoint every checkpoint_batches batches or checkpoint_seconds, whichever comes first"""
+        if self.checkpoint_batches and batch_num - last_batch >= self.checkpoint_batches:
+            return True
+        return bool(self.checkpoint_seconds) and time.time() - last_time >= self.checkpoint_seconds
+
     def save_progress(self):
-        """Save intermediate progress"""
+        """Save intermediate progress
+
+        Written to a temporary file and renamed over progress.json, so an
+        interrupted write never leaves a truncated checkpoint behind.
+        """
         progress = {
             'stats': self.stats,
             'processed_files': list(self.processed_files),
+            'completed_files': self.completed_files,
             'error_files': self.error_files[:100]  # Limit error storage
         }
 
         progress_file = self.output_dir / "ericsson_data" / "progress.json"
-        progress_file.write_text(json.dumps(progress, indent=2))
+        temp_file = progress_file.with_name(".progress.json.tmp")
+        with open(temp_file, 'w') as f:
+            json.dump(progress, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, progress_file)
+
+    def load_progress(self) -> Set[str]:
+        """Restore batch history from progress.json; returns the files it covers"""
+        progress_file = self.output_dir / "ericsson_data" / "progress.json"
+        if not progress_file.exists():
+            print("⚠️  No progress.json to resume from, starting from scratch")
+            return set()
+
+        progress = json.loads(progress_file.read_text())
+        self.stats['batches'] = progress.get('stats', {}).get('batches', [])
+        completed = set(progress.get('completed_files') or progress.get('processed_files', []))
+        print(f"⏩ Resuming after batch {len(self.stats['batches'])} ({len(completed)} files done)")
+        return completed
+
+    def _resume_file(self, file_path: Path, completed: Set[str]) -> bool:
+        """Restore a checkpointed file from the cache; False if it must be processed again"""
+        if str(file_path) not in completed:
+            return False
+        try:
+            hit, feature, _, _ = self._lookup_cache(file_path)
+        except OSError:
+            return False
+        if not hit:
+            # Changed since the checkpoint (or failed before it was cached)
+            return False
+
+        self._record_result(file_path, feature, None, {'processed': 0, 'errors': 0, 'features': 0})
+        self.stats['resumed'] += 1
+        return True
+
+    def save_state(self):
+        """Write the source -> feature id map and slim copies of every feature for incremental runs"""
+        state = {
+            'version': STATE_VERSION,
+            'parse_backend': self.parse_backend,
+            'hash_algorithm': self.hash_algorithm,
+            'sources': self.sources,
+            'failed': self.failed_sources,
+            'features': {feature_id: vars(_slim_feature(feature)) for feature_id, feature in self.features.items()},
+        }
+        state_file = self.output_dir / "ericsson_data" / STATE_FILENAME
+        temp_file = state_file.with_name(f".{STATE_FILENAME}.tmp")
+        temp_file.write_text(json.dumps(state, separators=(',', ':')))
+        os.replace(temp_file, state_file)
+
+    def load_state(self) -> Optional[Dict]:
+        """State saved by the last run, or None if missing or made with other settings"""
+        data_dir = self.output_dir / "ericsson_data"
+        state_file = data_dir / STATE_FILENAME
+        if not state_file.exists() or (self.write_corpus and not (data_dir / CORPUS_FILENAME).exists()):
+            return None
+        state = json.loads(state_file.read_text())
+        if (state.get('version'), state.get('parse_backend'), state.get('hash_algorithm')) != (
+                STATE_VERSION, self.parse_backend, self.hash_algorithm):
+            return None
+        return state
 
     def save_all(self):
         """Save all processed data"""
         print("\n💾 Saving processed data...")
 
-        # Save features
-        features_dir = self.output_dir / "ericsson_data" / "features"
-        for feature_id, feature in self.features.items():
-            filename = f"feature_{feature_id.replace(' ', '_')}.json"
-            filepath = features_dir / filename
-            filepath.write_text(json.dumps(asdict(feature), indent=2))
-
-        # Save indices
+        # Save features (already written batch by batch when streaming, only the changes when incremental)
+        if not self.streaming and self._patch is None:
+            for feature in self.features.values():
+                self.save_feature(feature)
+        corpus_file = self.output_dir / "ericsson_data" / CORPUS_FILENAME
+        if self._corpus_writer is not None:
+            self._corpus_writer.close()
+            self._corpus_writer = None
+        elif corpus_file.exists():
+            # Not written this run: do not let readers pick up stale features
+            corpus_file.unlink()
+
+        # Save indices (postings resolved to feature ids)
         indices_dir = self.output_dir / "ericsson_data" / "indices"
-        indices = {
-            'parameters': dict(self.parameter_index),
-            'counters': dict(self.counter_index),
-            'cxc_codes': self.cxc_index,
-            'names': self.name_index
-        }
-
-        for name, index in indices.items():
+        for name, index in self._basic_indices().items():
             index_file = indices_dir / f"{name}_index.json"
-            index_file.write_text(json.dumps(index, indent=2))
+            export = {key: self.feature_ids.resolve(ordinals) for key, ordinals in index.postings.items()}
+            index_file.write_text(json.dumps(export, indent=2))
+
+        # Save name completions for interactive tools (loaded, never rebuilt, at startup)
+        self.build_completions().save(self.output_dir / "ericsson_data" / COMPLETIONS_FILENAME)
+
+        # Save the dependency graph for activation planning
+        self.build_dependency_graph().save(self.output_dir / "ericsson_data" / DEPENDENCY_GRAPH_FILENAME)
+
+        # Save per-field digests so release diffs can skip unchanged features
+        save_digests(self.output_dir / "ericsson_data" / DIGESTS_FILENAME, self.feature_digests)
+
+        # Save the similarity matrix and clusters for related-feature lookups
+        if self._patch is not None:
+            similarity_index = self.update_similarity_index(*self._patch)
+        else:
+            similarity_index = self.build_similarity_index()
+        similarity_index.save(self.output_dir / "ericsson_data" / SIMILARITY_FILENAME)
 
         # Save summary
         summary = {
             'total_features': len(self.features),
             'total_parameters': sum(len(f.parameters) for f in self.features.values()),
             'total_counters': sum(len(f.counters) for f in self.features.values()),
+            'total_events': sum(len(f.events) for f in self.features.values()),
+            'value_packages': dict(Counter(f.value_package for f in self.features.values())),
+            'node_types': dict(Counter(f.node_type for f in self.features.values())),
             'processing_stats': self.stats,
-            'feature_categories': self.categorize_features()
+            'feature_categories': self.categorize_features(),
+            'pattern_stats': PATTERNS.report()
         }
+        if self.profiler.enabled:
+            summary['profile'] = self.profiler.report()
+        if self.profile_trace is not None:
+            self.profiler.write_trace(self.profile_trace)
+            print(f"🧭 Wrote trace events to {self.profile_trace}")
 
         summary_file = self.output_dir / "ericsson_data" / "summary.json"
         summary_file.write_text(json.dumps(summary, indent=2))
 
+        # Save what the next incremental run starts from
+        self.save_state()
+
         print(f"✅ Saved {len(self.features)} features")
 
-    def categorize_features(self) -> Dict[str, int]:
-        """Categorize features by type"""
-        categories = defaultdict(int)
+    def save_feature(self, feature: EricssonFeature):
+        """Write one feature's JSON file and append it to the binary corpus"""
+        with self.profiler.stage('save.feature'):
+            self._save_feature(feature)
 
-        for feature in self.features.values():
-            name_lower = feature.name.lower()
-
-            if 'mimo' in name_lower:
-                categories['MIMO Features'] += 1
-            elif 'sleep' in name_lower or 'energy' in name_lower:
-                categories['Energy Efficiency'] += 1
-            elif 'carrier' in name_lower or 'aggregation' in name_lower:
-                categories['Carrier Aggregation'] += 1
-            elif 'handover' in name_lower or 'mobility' in name_lower:
-                categories['Mobility'] += 1
-            elif 'dual' in name_lower:
-                categories['Dual Connectivity'] += 1
-            else:
-                categories['Other'] += 1
+    def _save_feature(self, feature: EricssonFeature):
+        # vars() rather than asdict(): the fields are serialized as-is, no deep copy needed
+        data = vars(feature)
+        filename = f"feature_{feature.id.replace(' ', '_')}.json"
+        filepath = self.output_dir / "ericsson_data" / "features" / filename
+        filepath.write_text(json.dumps(data, indent=2))
+        self.feature_digests[feature.id] = feature_digest(data)
 
+        if self.write_corpus:
+            if self._corpus_writer is None:
+                self._corpus_writer = CorpusWriter(self.output_dir / "ericsson_data" / CORPUS_FILENAME)
+            self._corpus_writer.add(data)
+
+    def categorize_features(self) -> Dict[str, int]:
+        """Feature count per similarity cluster label"""
+        if self.similarity_index is None or len(self.similarity_index) != len(self.features):
+            self.build_similarity_index()
+        categories = defaultdict(int)
+        for label in self.similarity_index.categories().values():
+            categories[label] += 1
         return dict(categories)
 
     def print_summary(self):
@@ -865,6 +1399,8 @@ class EricssonFeatureProcessor:
         print("="*60)
         print(f"Total files found: {self.stats['total_files']}")
         print(f"Files processed: {self.stats['processed']}")
+        if self.stats['resumed']:
+            print(f"Restored from checkpoint: {self.stats['resumed']}")
         print(f"Features extracted: {len(self.features)}")
         print(f"Processing errors: {len(self.error_files)}")
         print(f"Total time: {duration:.2f} seconds")
@@ -875,6 +1411,21 @@ class EricssonFeatureProcessor:
         for cat, count in sorted(categories.items()):
             print(f"  {cat}: {count}")
 
+        print("\nPattern hits:")
+        for name, stats in PATTERNS.report().items():
+            print(f"  {name}: {stats['hits']}/{stats['calls']} hits, {stats['seconds'] * 1000:.1f} ms")
+
+        if self.profiler.enabled:
+            profile = self.profiler.report()
+            print("\nStage timings (p50 / p95 / max ms):")
+            for name, stats in sorted(profile['stages'].items(), key=lambda item: -item[1]['total_seconds']):
+                print(f"  {name}: {stats['count']} calls, {stats['total_seconds']:.2f} s total, "
+                      f"{stats['p50_ms']} / {stats['p95_ms']} / {stats['max_ms']}")
+            print("\nSlowest files:")
+            for record in profile['slowest_files']:
+                top_stage = next(iter(record['stages_ms']), 'n/a')
+                print(f"  {record['ms']:.1f} ms  {Path(record['file']).name} (mostly {top_stage})")
+
         print(f"\nData saved to: {self.output_dir}/ericsson_data/")
 
         if self.error_files:
@@ -883,6 +1434,52 @@ class EricssonFeatureProcessor:
                 print(f"  {file}: {error}")
 
 
+def _slim_feature(feature: EricssonFeature) -> EricssonFeature:
+    """Copy with only what indices, the dependency graph and the summary need"""
+    return EricssonFeature(
+        id=feature.id,
+        name=feature.name,
+        cxc_code=feature.cxc_code,
+        value_package=feature.value_package,
+        node_type=feature.node_type,
+        parameters=[{'name': param['name']} for param in feature.parameters],
+        counters=[{'name': counter['name']} for counter in feature.counters],
+        events=[{'name': event['name']} for event in feature.events],
+        dependencies=feature.dependencies,
+        source_file=feature.source_file,
+        file_hash=feature.file_hash
+    )
+
+
+# Worker-process state for parallel ingestion
+_worker_processor: Optional[EricssonFeatureProcessor] = None
+
+
+def _init_worker(config: Dict):
+    """Create the processor instance reused by every task in a worker process"""
+    global _worker_processor
+    _worker_processor = EricssonFeatureProcessor(**config)
+
+
+def _process_file_safely(processor: EricssonFeatureProcessor,
+                         file_path: Path) -> Tuple[Optional[EricssonFeature], Optional[str]]:
+    """Process one file, returning (feature, error) instead of raising"""
+    try:
+        return processor.process_file(file_path), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _extract_file_in_worker(file_path: Path, file_hash: Optional[str]
+                            ) -> Tuple[Optional[EricssonFeature], Optional[str], Optional[str], Dict, Dict]:
+    """Process-pool entry point for a single cache miss, also returning the pattern and profiler stats it produced"""
+    try:
+        (feature, file_hash), error = _worker_processor.extract_feature(file_path, file_hash), None
+    except Exception as e:
+        feature, error = None, str(e)
+    return feature, file_hash, error, PATTERNS.drain(), _worker_processor.profiler.drain()
+
+
 # Main execution
 if __name__ == "__main__":
     import argparse
@@ -892,6 +1489,43 @@ if __name__ == "__main__":
     parser.add_argument('--output', default='output', help='Output directory')
     parser.add_argument('--limit', type=int, help='Limit number of files to process (for testing)')
     parser.add_argument('--batch-size', type=int, default=50, help='Batch size for processing')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of worker processes (0 = one per CPU core)')
+    parser.add_argument('--parser', choices=sorted(PARSE_BACKENDS), default='html',
+                        help='Markdown parse backend (markdown = direct tokenizer, no HTML round trip)')
+    parser.add_argument('--cache', choices=CACHE_BACKENDS, default='sqlite',
+                        help='Extraction cache backend (directory = one JSON file per source stem)')
+    parser.add_argument('--hash', choices=sorted(HASH_ALGORITHMS), default='md5',
+                        help='Digest used to detect changed source files (xxhash needs the xxhash package)')
+    parser.add_argument('--include', action='append', metavar='GLOB',
+                        help='Only process files matching this glob, relative to --source (repeatable, default *.md)')
+    parser.add_argument('--exclude', action='append', metavar='GLOB',
+                        help='Skip files and directories matching this glob (repeatable)')
+    parser.add_argument('--sort-files', action='store_true',
+                        help='Walk directories in name order for a deterministic processing order')
+    parser.add_argument('--streaming', action='store_true',
+                        help='Write features after every batch and keep only slim copies in memory')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only process added or modified files and drop features of deleted ones '
+                             '(full run if there is no state from a previous run)')
+    parser.add_argument('--no-corpus', action='store_true',
+                        help=f'Only write per-feature JSON files, not the binary {CORPUS_FILENAME}')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue from progress.json, restoring checkpointed files from the cache')
+    parser.add_argument('--checkpoint-batches', type=int, default=5,
+                        help='Save progress every N batches (0 = only by time)')
+    parser.add_argument('--checkpoint-seconds', type=float, default=0,
+                        help='Also save progress when this many seconds passed since the last checkpoint (0 = off)')
+    parser.add_argument('--parameter-spreadsheet', type=Path, default=DEFAULT_PARAMETER_SPREADSHEET,
+                        help='MOM parameter spreadsheet added to name completion and fuzzy lookup (skipped if missing)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Time every pipeline stage and extractor; adds stage histograms and slowest files to summary.json')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='Also track allocations per stage with tracemalloc (implies --profile, slower)')
+    parser.add_argument('--profile-trace', type=Path, metavar='FILE',
+                        help='Also write Chrome trace-event JSON of every stage to FILE (implies --profile)')
+    parser.add_argument('--compact-cache', action='store_true',
+                        help='Drop cache entries for deleted source files after processing')
 
     args = parser.parse_args()
 
@@ -899,18 +1533,39 @@ if __name__ == "__main__":
     processor = EricssonFeatureProcessor(
         source_dir=args.source,
         output_dir=args.output,
-        batch_size=args.batch_size
+        batch_size=args.batch_size,
+        workers=args.workers,
+        parse_backend=args.parser,
+        cache_backend=args.cache,
+        hash_algorithm=args.hash,
+        include=args.include,
+        exclude=args.exclude,
+        sort_files=args.sort_files,
+        checkpoint_batches=args.checkpoint_batches,
+        checkpoint_seconds=args.checkpoint_seconds,
+        streaming=args.streaming,
+        incremental=args.incremental,
+        write_corpus=not args.no_corpus,
+        parameter_spreadsheet=args.parameter_spreadsheet,
+        profile=args.profile,
+        profile_memory=args.profile_memory,
+        profile_trace=args.profile_trace
     )
 
     # Process files
     print("🚀 Starting Ericsson Feature Processing")
     print(f"Source: {args.source}")
     print(f"Output: {args.output}")
+    print(f"Parser: {args.parser}")
 
     if args.limit:
         print(f"Limit: {args.limit} files")
 
-    processor.process_all(limit=args.limit)
+    processor.process_all(limit=args.limit, resume=args.resume)
+
+    if args.compact_cache:
+        processor.compact_cache()
+    processor.cache.close()
 
     print("\n✅ Processing complete!")
     print(f"Next step: Run ericsson_skill_generator.py to create Claude skill")
\ No newline at end of file
@@ -0,0 +1,934 @@
+#!/usr/bin/env python3
+"""
+Lightweight markdown tokenizer for Ericsson feature documentation
+Scans the markdown directly (fenced blocks, ATX headings, pipe tables, lists,
+paragraphs) and builds the ParsedDocument the extractors consume, without the
+markdown→HTML→BeautifulSoup round trip.
+
+Block and inline rules follow Python-Markdown with the 'tables', 'fenced_code'
+and 'toc' extensions, so the text seen by the extractors matches the HTML
+backend's soup.get_text() output. Raw HTML blocks are not recognized at block
+level (the corpus only has inline tags, which are handled).
+"""
+
+import html
+import html.entities
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+from ericsson_document import Block, DocumentHeading, DocumentTable, ParsedDocument
+
+
+TAB_LENGTH = 4
+
+# Stash placeholders use the same control characters as Python-Markdown
+STX = '\u0002'
+ETX = '\u0003'
+PLACEHOLDER_RE = re.compile(STX + r'(\d+)' + ETX)
+
+# Kinds of stashed inline values
+_TEXT = 0  # Plain text (escapes, literal markers)
+_ELEMENT = 1  # An element whose value is its text content
+_HTML = 2  # Raw HTML markup
+_ENTITY = 3  # A character entity reference
+
+# Characters BeautifulSoup treats as collapsible whitespace
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+ESCAPED_CHARS = set('\\`*_{}[]()>#+-.!|')
+
+FENCED_BLOCK_RE = re.compile(r'''
+    (?P<fence>^(?:~{3,}|`{3,}))[ ]*                          # opening fence
+    ((\{(?P<attrs>[^\n]*)\})|                                # (optional {attrs} or
+    (\.?(?P<lang>[\w#.+-]*)[ ]*)?                            # optional (.)lang
+    (hl_lines=(?P<quot>"|')(?P<hl_lines>.*?)(?P=quot)[ ]*)?) # optional hl_lines)
+    \n                                                       # newline (end of opening fence)
+    (?P<code>.*?)(?<=\n)                                     # the code block
+    (?P=fence)[ ]*$                                          # closing fence
+''', re.MULTILINE | re.DOTALL | re.VERBOSE)
+
+# Block-level patterns
+HASH_HEADER_RE = re.compile(r'(?:^|\n)(?P<level>#{1,6})(?P<header>(?:\\.|[^\\])*?)#*(?:\n|$)')
+SETEXT_HEADER_RE = re.compile(r'^.*?\n(?:=+|-+)[ ]*(\n|$)', re.MULTILINE)
+HR_RE = re.compile(
+    r'^[ ]{0,3}(?=(?P<atomicgroup>(-+[ ]{0,2}){3,}|(_+[ ]{0,2}){3,}|(\*+[ ]{0,2}){3,}))'
+    r'(?P=atomicgroup)[ ]*$', re.MULTILINE)
+BLOCKQUOTE_RE = re.compile(r'(^|\n)[ ]{0,3}>[ ]?(.*)')
+OLIST_RE = re.compile(r'^[ ]{0,%d}\d+\.[ ]+(.*)' % (TAB_LENGTH - 1))
+ULIST_RE = re.compile(r'^[ ]{0,%d}[*+-][ ]+(.*)' % (TAB_LENGTH - 1))
+LIST_CHILD_RE = re.compile(r'^[ ]{0,%d}((\d+\.)|[*+-])[ ]+(.*)' % (TAB_LENGTH - 1))
+LIST_INDENT_RE = re.compile(r'^[ ]{%d,%d}((\d+\.)|[*+-])[ ]+.*' % (TAB_LENGTH, TAB_LENGTH * 2 - 1))
+INDENT_RE = re.compile(r'^(([ ]{%s})+)' % TAB_LENGTH)
+TABLE_END_BORDER_RE = re.compile(r'(?<!\\)(?:\\\\)*\|$')
+TABLE_CODE_PIPES_RE = re.compile(r'(?:(\\\\)|(\\`+)|(`+)|(\\\|)|(\|))')
+
+# Inline patterns, in Python-Markdown priority order
+BACKTICK_RE = re.compile(r'(?:(?<!\\)((?:\\{2})+)(?=`+)|(?<!\\)`)', re.DOTALL)
+ESCAPE_RE = re.compile(r'\\(.)', re.DOTALL)
+LINK_RE = re.compile(r'(?<!\!)\[', re.DOTALL)
+IMAGE_LINK_RE = re.compile(r'\!\[', re.DOTALL)
+LINK_TARGET_RE = re.compile(r'''\(\s*(?:(<[^<>]*>)\s*(?:('[^']*'|"[^"]*")\s*)?\))?''', re.DOTALL)
+AUTOLINK_RE = re.compile(r'<((?:[Ff]|[Hh][Tt])[Tt][Pp][Ss]?://[^<>]*)>', re.DOTALL)
+AUTOMAIL_RE = re.compile(r'<([^<> !]+@[^@<> ]+)>', re.DOTALL)
+LINE_BREAK_RE = re.compile(r'  \n', re.DOTALL)
+HTML_RE = re.compile(
+    r'(<(\/?[a-zA-Z][^<>@ ]*( [^<>]*)?|'
+    r'!--(?:(?!<!--|-->).)*--|'
+    r'[?](?:(?!<[?]|[?]>).)*[?]|'
+    r'!\[CDATA\[(?:(?!<!\[CDATA\[|\]\]>).)*\]\]'
+    r')>)', re.DOTALL)
+ENTITY_RE = re.compile(r'(&(?:\#[0-9]+|\#x[0-9a-fA-F]+|[a-zA-Z0-9]+);)', re.DOTALL)
+NOT_STRONG_RE = re.compile(r'((^|(?<=\s))(\*{1,3}|_{1,3})(?=\s|$))', re.DOTALL)
+ASTERISK_RE = re.compile(r'\*', re.DOTALL)
+UNDERSCORE_RE = re.compile(r'_', re.DOTALL)
+
+# (pattern, groups holding the emphasized text) tried in order at each marker
+ASTERISK_PATTERNS = [
+    (re.compile(r'(\*)\1{2}(.+?)\1(.*?)\1{2}', re.DOTALL), (2, 3)),
+    (re.compile(r'(\*)\1{2}(.+?)\1{2}(.*?)\1', re.DOTALL), (2, 3)),
+    (re.compile(r'(\*)\1(?!\1)([^*]+?)\1(?!\1)(.+?)\1{3}', re.DOTALL), (2, 3)),
+    (re.compile(r'(\*{2})(.+?)\1', re.DOTALL), (2,)),
+    (re.compile(r'(\*)([^\*]+)\1', re.DOTALL), (2,)),
+]
+UNDERSCORE_PATTERNS = [
+    (re.compile(r'(_)\1{2}(.+?)\1(.*?)\1{2}', re.DOTALL), (2, 3)),
+    (re.compile(r'(_)\1{2}(.+?)\1{2}(.*?)\1', re.DOTALL), (2, 3)),
+    (re.compile(r'(?<!\w)(\_)\1(?!\1)(.+?)(?<!\w)\1(?!\1)(.+?)\1{3}(?!\w)', re.DOTALL), (2, 3)),
+    (re.compile(r'(?<!\w)(_{2})(?!_)(.+?)(?<!_)\1(?!\w)', re.DOTALL), (2,)),
+    (re.compile(r'(?<!\w)(_)(?!_)(.+?)(?<!_)\1(?!\w)', re.DOTALL), (2,)),
+]
+
+# Characters that can start an inline construct; text without them is returned as is
+INLINE_TRIGGERS_RE = re.compile(r'[`\\\[!<&*_]|  \n')
+
+
+class _Element:
+    """Minimal element tree node; text and tail hold unrendered inline markdown"""
+    __slots__ = ('tag', 'text', 'tail', 'children')
+
+    def __init__(self, tag: str, text: str = '', tail: str = ''):
+        self.tag = tag
+        self.text = text
+        self.tail = tail
+        self.children: List['_Element'] = []
+
+    def append(self, tag: str, text: str = '') -> '_Element':
+        child = _Element(tag, text)
+        self.children.append(child)
+        return child
+
+    def last_child(self) -> Optional['_Element']:
+        return self.children[-1] if self.children else None
+
+
+class _BlockParser:
+    """Port of Python-Markdown's block processors used by the Ericsson corpus"""
+
+    def __init__(self):
+        self.state: List[str] = []
+
+    def parse_chunk(self, parent: _Element, text: str):
+        self.parse_blocks(parent, text.split('\n\n'))
+
+    def parse_blocks(self, parent: _Element, blocks: List[str]):
+        # Processor order matches Python-Markdown priorities: empty, indent,
+        # code, table, hash header, setext header, hr, olist, ulist, quote, paragraph
+        while blocks:
+            block = blocks[0]
+            if not block or block.startswith('\n'):
+                self._empty(parent, blocks)
+            elif block.startswith(' ' * TAB_LENGTH) and self._in_list_context(parent):
+                self._list_indent(parent, blocks)
+            elif block.startswith(' ' * TAB_LENGTH):
+                self._code(parent, blocks)
+            elif self._is_table(block):
+                self._table(parent, blocks)
+            elif HASH_HEADER_RE.search(block):
+                self._hash_header(parent, blocks)
+            elif SETEXT_HEADER_RE.match(block):
+                self._setext_header(parent, blocks)
+            elif HR_RE.search(block):
+                self._hr(parent, blocks)
+            elif OLIST_RE.match(block):
+                self._list(parent, blocks, 'ol')
+            elif ULIST_RE.match(block):
+                self._list(parent, blocks, 'ul')
+            elif BLOCKQUOTE_RE.search(block):
+                self._blockquote(parent, blocks)
+            else:
+                self._paragraph(parent, blocks)
+
+    # -- helpers -----------------------------------------------------------
+
+    def _in_list_context(self, parent: _Element) -> bool:
+        last = parent.last_child()
+        return ('detabbed' not in self.state[-1:] and
+                (parent.tag == 'li' or (last is not None and last.tag in ('ul', 'ol'))))
+
+    @staticmethod
+    def _detab(text: str, length: int = TAB_LENGTH) -> Tuple[str, str]:
+        lines = text.split('\n')
+        newtext = []
+        for line in lines:
+            if line.startswith(' ' * length):
+                newtext.append(line[length:])
+            elif not line.strip():
+                newtext.append('')
+            else:
+                break
+        return '\n'.join(newtext), '\n'.join(lines[len(newtext):])
+
+    @staticmethod
+    def _loose_detab(text: str, level: int = 1) -> str:
+        lines = text.split('\n')
+        for i in range(len(lines)):
+            if lines[i].startswith(' ' * TAB_LENGTH * level):
+                lines[i] = lines[i][TAB_LENGTH * level:]
+        return '\n'.join(lines)
+
+    # -- processors --------------------------------------------------------
+
+    def _empty(self, parent: _Element, blocks: List[str]):
+        block = blocks.pop(0)
+        filler = '\n\n'
+        if block:
+            filler = '\n'
+            rest = block[1:]
+            if rest:
+                blocks.insert(0, rest)
+        sibling = parent.last_child()
+        if sibling is not None and sibling.tag == 'pre':
+            sibling.text = sibling.text + filler
+
+    def _list_indent(self, parent: _Element, blocks: List[str]):
+        block = blocks.pop(0)
+        level, sibling = self._get_level(parent, block)
+        block = self._loose_detab(block, level)
+        self.state.append('detabbed')
+        if parent.tag == 'li':
+            last = parent.last_child()
+            if last is not None and last.tag in ('ul', 'ol'):
+                self.parse_blocks(last, [block])
+            else:
+                self.parse_blocks(parent, [block])
+        elif sibling.tag == 'li':
+            self.parse_blocks(sibling, [block])
+        elif sibling.children and sibling.children[-1].tag == 'li':
+            item = sibling.children[-1]
+            if item.text:
+                p = _Element('p', item.text)
+                item.text = ''
+                item.children.insert(0, p)
+            self.parse_chunk(item, block)
+        else:
+            self.parse_blocks(sibling.append('li'), [block])
+        self.state.pop()
+
+    def _get_level(self, parent: _Element, block: str) -> Tuple[int, _Element]:
+        m = INDENT_RE.match(block)
+        indent_level = len(m.group(1)) / TAB_LENGTH if m else 0
+        level = 1 if self.state[-1:] == ['list'] else 0
+        while indent_level > level:
+            child = parent.last_child()
+            if child is not None and child.tag in ('ul', 'ol', 'li'):
+                if child.tag in ('ul', 'ol'):
+                    level += 1
+                parent = child
+            else:
+                break
+        return level, parent
+
+    def _code(self, parent: _Element, blocks: List[str]):
+        sibling = parent.last_child()
+        block = blocks.pop(0)
+        block, rest = self._detab(block)
+        if sibling is not None and sibling.tag == 'pre':
+            sibling.text = '{}\n{}\n'.format(sibling.text, block.rstrip())
+        else:
+            parent.append('pre', '%s\n' % block.rstrip())
+        if rest:
+            blocks.insert(0, rest)
+
+    def _is_table(self, block: str) -> bool:
+        rows = [row.strip(' ') for row in block.split('\n')]
+        if len(rows) < 2 or '|' not in rows[0]:
+            return False
+        border = rows[0].startswith('|') or TABLE_END_BORDER_RE.search(rows[0]) is not None
+        row0_len = len(_split_table_row(rows[0], border))
+        is_table = row0_len > 1
+        if not is_table and row0_len == 1 and border:
+            for row in rows[1:]:
+                is_table = row.startswith('|') or TABLE_END_BORDER_RE.search(row) is not None
+                if not is_table:
+                    break
+        if is_table:
+            separator = _split_table_row(rows[1], border)
+            is_table = len(separator) == row0_len and set(''.join(separator)) <= set('|:- ')
+        return is_table
+
+    def _table(self, parent: _Element, blocks: List[str]):
+        lines = blocks.pop(0).split('\n')
+        header = lines[0].strip(' ')
+        border = header.startswith('|') or TABLE_END_BORDER_RE.search(header) is not None
+        columns = len(_split_table_row(lines[1].strip(' '), border))
+
+        table = parent.append('table')
+        thead = table.append('thead')
+        self._table_row(thead.append('tr'), 'th', header, border, columns)
+        tbody = table.append('tbody')
+        body = lines[2:]
+        if not body:
+            tr = tbody.append('tr')
+            for _ in range(columns):
+                tr.append('td')
+        for row in body:
+            self._table_row(tbody.append('tr'), 'td', row.strip(' '), border, columns)
+
+    @staticmethod
+    def _table_row(tr: _Element, tag: str, row: str, border: bool, columns: int):
+        cells = _split_table_row(row, border)
+        for i in range(columns):
+            tr.append(tag, cells[i].strip(' ') if i < len(cells) else '')
+
+    def _hash_header(self, parent: _Element, blocks: List[str]):
+        block = blocks.pop(0)
+        m = HASH_HEADER_RE.search(block)
+        before = block[:m.start()]
+        after = block[m.end():]
+        if before:
+            self.parse_blocks(parent, [before])
+        parent.append('h%d' % len(m.group('level')), m.group('header').strip())
+        if after:
+            blocks.insert(0, after)
+
+    def _setext_header(self, parent: _Element, blocks: List[str]):
+        lines = blocks.pop(0).split('\n')
+        level = 1 if lines[1].startswith('=') else 2
+        parent.append('h%d' % level, lines[0].strip())
+        if len(lines) > 2:
+            blocks.insert(0, '\n'.join(lines[2:]))
+
+    def _hr(self, parent: _Element, blocks: List[str]):
+        block = blocks.pop(0)
+        match = HR_RE.search(block)
+        prelines = block[:match.start()].rstrip('\n')
+        if prelines:
+            self.parse_blocks(parent, [prelines])
+        parent.append('hr')
+        postlines = block[match.end():].lstrip('\n')
+        if postlines:
+            blocks.insert(0, postlines)
+
+    def _list(self, parent: _Element, blocks: List[str], tag: str):
+        items = self._list_items(blocks.pop(0))
+        sibling = parent.last_child()
+        if sibling is not None and sibling.tag in ('ul', 'ol'):
+            lst = sibling
+            item = lst.children[-1]
+            if item.text:
+                p = _Element('p', item.text)
+                item.text = ''
+                item.children.insert(0, p)
+            last = item.last_child()
+            if last is not None and last.tail:
+                item.append('p', last.tail.lstrip())
+                last.tail = ''
+            li = lst.append('li')
+            self.state.append('looselist')
+            self.parse_blocks(li, [items.pop(0)])
+            self.state.pop()
+        elif parent.tag in ('ul', 'ol'):
+            lst = parent
+        else:
+            lst = parent.append(tag)
+        self.state.append('list')
+        for item in items:
+            if item.startswith(' ' * TAB_LENGTH):
+                self.parse_blocks(lst.children[-1], [item])
+            else:
+                self.parse_blocks(lst.append('li'), [item])
+        self.state.pop()
+
+    @staticmethod
+    def _list_items(block: str) -> List[str]:
+        items = []
+        for line in block.split('\n'):
+            m = LIST_CHILD_RE.match(line)
+            if m:
+                items.append(m.group(3))
+            elif LIST_INDENT_RE.match(line):
+                if items[-1].startswith(' ' * TAB_LENGTH):
+                    items[-1] = '{}\n{}'.format(items[-1], line)
+                else:
+                    items.append(line)
+            else:
+                items[-1] = '{}\n{}'.format(items[-1], line)
+        return items
+
+    def _blockquote(self, parent: _Element, blocks: List[str]):
+        block = blocks.pop(0)
+        m = BLOCKQUOTE_RE.search(block)
+        before = block[:m.start()]
+        self.parse_blocks(parent, [before])
+        block = '\n'.join(self._clean_quote(line) for line in block[m.start():].split('\n'))
+        sibling = parent.last_child()
+        quote = sibling if sibling is not None and sibling.tag == 'blockquote' else parent.append('blockquote')
+        self.state.append('blockquote')
+        self.parse_chunk(quote, block)
+        self.state.pop()
+
+    @staticmethod
+    def _clean_quote(line: str) -> str:
+        m = BLOCKQUOTE_RE.match(line)
+        if line.strip() == '>':
+            return ''
+        return m.group(2) if m else line
+
+    def _paragraph(self, parent: _Element, blocks: List[str]):
+        block = blocks.pop(0)
+        if not block.strip():
+            return
+        if self.state[-1:] == ['list']:
+            # Tight list: text joins the item (or the tail of its last child)
+            sibling = parent.last_child()
+            if sibling is not None:
+                sibling.tail = f'{sibling.tail}\n{block}' if sibling.tail else f'\n{block}'
+            elif parent.text:
+                parent.text = f'{parent.text}\n{block}'
+            else:
+                parent.text = block.lstrip()
+        else:
+            parent.append('p', block.lstrip())
+
+
+def _split_table_row(row: str, border: bool) -> List[str]:
+    """Split a pipe-table row into cells, ignoring pipes inside code spans"""
+    if border:
+        if row.startswith('|'):
+            row = row[1:]
+        row = TABLE_END_BORDER_RE.sub('', row)
+    if '`' not in row:
+        # Fast path: only escaped pipes need care
+        if '\\' not in row:
+            return row.split('|')
+
+    pipes = []
+    tics = []
+    tic_points = []
+    tic_region = []
+    for m in TABLE_CODE_PIPES_RE.finditer(row):
+        if m.group(2):
+            tics.append(len(m.group(2)) - 1)
+            tic_points.append((m.start(2), m.end(2) - 1, 1))
+        elif m.group(3):
+            tics.append(len(m.group(3)))
+            tic_points.append((m.start(3), m.end(3) - 1, 0))
+        elif m.group(5):
+            pipes.append(m.start(5))
+
+    pos = 0
+    while pos < len(tics):
+        try:
+            tic_size = tics[pos] - tic_points[pos][2]
+            if tic_size == 0:
+                raise ValueError
+            index = tics[pos + 1:].index(tic_size) + 1
+            tic_region.append((tic_points[pos][0], tic_points[pos + index][1]))
+            pos += index + 1
+        except ValueError:
+            pos += 1
+
+    elements = []
+    pos = 0
+    for pipe in pipes:
+        if any(start <= pipe <= end for start, end in tic_region):
+            continue
+        elements.append(row[pos:pipe])
+        pos = pipe + 1
+    elements.append(row[pos:])
+    return elements
+
+
+class _InlineRenderer:
+    """Renders inline markdown to the plain text BeautifulSoup.get_text() would yield"""
+
+    def __init__(self, stash: List[Tuple[str, int]]):
+        # (value, kind) referenced by STX<index>ETX placeholders
+        self.stash = stash
+        self.raw_html = False
+        self.handlers = [
+            (BACKTICK_RE, self._backtick),
+            (ESCAPE_RE, self._escape),
+            (LINK_RE, self._link),
+            (IMAGE_LINK_RE, self._image),
+            (AUTOLINK_RE, self._autolink),
+            (AUTOMAIL_RE, self._autolink),
+            (LINE_BREAK_RE, self._line_break),
+            (HTML_RE, self._html),
+            (ENTITY_RE, self._entity),
+            (NOT_STRONG_RE, self._not_strong),
+            (ASTERISK_RE, self._asterisk),
+            (UNDERSCORE_RE, self._underscore),
+        ]
+
+    def render(self, text: str) -> str:
+        if not text:
+            return text
+        self.raw_html = False
+        if INLINE_TRIGGERS_RE.search(text):
+            text = self._apply(text, 0)
+        if self.raw_html:
+            # Raw tags may swallow neighbouring text the way html.parser
+            # tokenizes them, so parse the serialized fragment instead
+            parts: List[str] = []
+            self._serialize(text, parts)
+            return _html_text(''.join(parts))
+        if STX in text:
+            text = self._unstash(text)
+        return text
+
+    def _store(self, value: str, kind: int) -> str:
+        self.stash.append((value, kind))
+        return f'{STX}{len(self.stash) - 1}{ETX}'
+
+    def _unstash(self, text: str) -> str:
+        """Expand placeholders, collapsing whitespace-only strings between tags
+
+        BeautifulSoup replaces a text node made only of ASCII whitespace by a
+        single newline or space, so element boundaries are tracked here.
+        """
+        strings = ['']
+        self._flatten(text, strings)
+        return ''.join(_collapse_whitespace(string) for string in strings)
+
+    def _flatten(self, text: str, strings: List[str]):
+        position = 0
+        for m in PLACEHOLDER_RE.finditer(text):
+            strings[-1] += text[position:m.start()]
+            value, kind = self.stash[int(m.group(1))]
+            if kind == _ENTITY:
+                strings[-1] += _resolve_entity(value)
+            elif kind == _ELEMENT:
+                strings.append('')
+                self._flatten(value, strings)
+                strings.append('')
+            elif kind == _HTML:
+                strings.append('')
+            else:
+                self._flatten(value, strings)
+            position = m.end()
+        strings[-1] += text[position:]
+
+    def _serialize(self, text: str, parts: List[str]):
+        """Rebuild the HTML Python-Markdown would emit for text"""
+        position = 0
+        for m in PLACEHOLDER_RE.finditer(text):
+            parts.append(html.escape(text[position:m.start()], quote=False))
+            value, kind = self.stash[int(m.group(1))]
+            if kind in (_HTML, _ENTITY):
+                parts.append(value)
+            elif kind == _ELEMENT:
+                parts.append('<span>')
+                self._serialize(value, parts)
+                parts.append('</span>')
+            else:
+                self._serialize(value, parts)
+            position = m.end()
+        parts.append(html.escape(text[position:], quote=False))
+
+    def _apply(self, text: str, start_handler: int) -> str:
+        for index in range(start_handler, len(self.handlers)):
+            pattern, handler = self.handlers[index]
+            position = 0
+            while True:
+                m = pattern.search(text, position)
+                if not m:
+                    break
+                result = handler(m, text, index)
+                if result is None:
+                    # Rejected match: keep scanning after it
+                    position = m.end(0) if m.end(0) > m.start(0) else m.end(0) + 1
+                    continue
+                value, start, end, kind = result
+                placeholder = self._store(value, kind)
+                text = text[:start] + placeholder + text[end:]
+                position = start + len(placeholder)
+        return text
+
+    def _render_nested(self, text: str, index: int) -> str:
+        return self._apply(text, index + 1)
+
+    # -- handlers return (rendered text, start, end, is element) or None ---
+
+    def _backtick(self, m, data, index):
+        if m.group(1):
+            return '\\' * (len(m.group(1)) // 2), m.start(0), m.end(0), _TEXT
+        begin = m.start(0)
+        result = _find_code_span(begin, data)
+        if result is None:
+            return None
+        start, end = result
+        return data[start:end].strip(), begin, end + (start - begin), _ELEMENT
+
+    def _escape(self, m, data, index):
+        char = m.group(1)
+        if char in ESCAPED_CHARS:
+            return char, m.start(0), m.end(0), _TEXT
+        return None
+
+    def _link(self, m, data, index):
+        text, position, handled = _link_text(data, m.end(0))
+        if not handled:
+            return None
+        position, handled = _link_target(data, position)
+        if not handled:
+            return None
+        return self._render_nested(text, index), m.start(0), position, _ELEMENT
+
+    def _image(self, m, data, index):
+        _, position, handled = _link_text(data, m.end(0))
+        if not handled:
+            return None
+        position, handled = _link_target(data, position)
+        if not handled:
+            return None
+        return '', m.start(0), position, _ELEMENT
+
+    def _autolink(self, m, data, index):
+        return m.group(1), m.start(0), m.end(0), _ELEMENT
+
+    def _line_break(self, m, data, index):
+        # <br /> gets a newline tail, which joins the following text
+        return '', m.start(0), m.end(0) - 1, _ELEMENT
+
+    def _html(self, m, data, index):
+        self.raw_html = True
+        return m.group(0), m.start(0), m.end(0), _HTML
+
+    def _entity(self, m, data, index):
+        return m.group(1), m.start(0), m.end(0), _ENTITY
+
+    def _not_strong(self, m, data, index):
+        return m.group(1), m.start(0), m.end(0), _TEXT
+
+    def _asterisk(self, m, data, index):
+        return self._emphasis(m, data, index, '*', ASTERISK_PATTERNS)
+
+    def _underscore(self, m, data, index):
+        return self._emphasis(m, data, index, '_', UNDERSCORE_PATTERNS)
+
+    def _emphasis(self, m, data, index, marker, patterns):
+        for pattern_index, (pattern, groups) in enumerate(patterns):
+            m1 = pattern.match(data, m.start(0))
+            if m1:
+                text = ''.join(self._emphasis_content(m1.group(g) or '', pattern_index, marker, patterns)
+                               for g in groups)
+                return self._render_nested(text, index), m1.start(0), m1.end(0), _ELEMENT
+        return None
+
+    def _emphasis_content(self, data: str, pattern_index: int, marker: str, patterns) -> str:
+        """Strip nested emphasis markers the way parse_sub_patterns does"""
+        output = []
+        offset = pos = 0
+        while pos < len(data):
+            if data[pos] == marker:
+                matched = False
+                for index, (pattern, groups) in enumerate(patterns):
+                    if index <= pattern_index:
+                        continue
+                    m = pattern.match(data, pos)
+                    if m:
+                        output.append(data[offset:m.start(0)])
+                        output.extend(self._emphasis_content(m.group(g) or '', index, marker, patterns)
+                                      for g in groups)
+                        offset = pos = m.end(0)
+                        matched = True
+                if not matched:
+                    pos += 1
+            else:
+                pos += 1
+        output.append(data[offset:])
+        return ''.join(output)
+
+
+def _find_code_span(start: int, text: str) -> Optional[Tuple[int, int]]:
+    """Locate a code span opening at start (Python-Markdown backtick rules)"""
+    last = len(text)
+    max_ticks = 0
+    while start < last and text[start] == '`':
+        max_ticks += 1
+        start += 1
+    longest_span = 0
+    end = 0
+    i = start
+    while i < last:
+        span_length = 0
+        while i < last and text[i] == '`':
+            span_length += 1
+            i += 1
+        if not span_length:
+            i += 1
+            continue
+        if max_ticks == span_length:
+            return start, i - span_length
+        if span_length > longest_span:
+            longest_span = span_length
+            end = i
+    if longest_span:
+        return start - (max_ticks - longest_span), end - longest_span
+    return None
+
+
+def _link_text(data: str, index: int) -> Tuple[str, int, bool]:
+    """Content between [] of a link or image, resolving nested brackets"""
+    bracket_count = 1
+    text = []
+    for pos in range(index, len(data)):
+        c = data[pos]
+        if c == ']':
+            bracket_count -= 1
+        elif c == '[':
+            bracket_count += 1
+        index += 1
+        if bracket_count == 0:
+            break
+        text.append(c)
+    return ''.join(text), index, bracket_count == 0
+
+
+def _link_target(data: str, index: int) -> Tuple[int, bool]:
+    """Skip the (url "title") part of a link, allowing nested parentheses"""
+    m = LINK_TARGET_RE.match(data, pos=index)
+    if m and m.group(1):
+        return m.end(0), True
+    if not m:
+        return index, False
+
+    bracket_count = 1
+    backtrack_count = 1
+    index = m.end()
+    last_bracket = -1
+    quote = None
+    exit_quote = -1
+    ignore_matches = False
+    alt_quote = None
+    exit_alt_quote = -1
+    last = ''
+    for pos in range(index, len(data)):
+        c = data[pos]
+        if c == '(':
+            if not ignore_matches:
+                bracket_count += 1
+            elif backtrack_count > 0:
+                backtrack_count -= 1
+        elif c == ')':
+            if (exit_quote != -1 and quote == last) or (exit_alt_quote != -1 and alt_quote == last):
+                bracket_count = 0
+            elif not ignore_matches:
+                bracket_count -= 1
+            elif backtrack_count > 0:
+                backtrack_count -= 1
+                if backtrack_count == 0:
+                    last_bracket = index + 1
+        elif c in ("'", '"'):
+            if not quote:
+                ignore_matches = True
+                backtrack_count = bracket_count
+                bracket_count = 1
+                quote = c
+            elif c != quote and not alt_quote:
+                alt_quote = c
+            elif c == quote:
+                exit_quote = index + 1
+            elif alt_quote and c == alt_quote:
+                exit_alt_quote = index + 1
+        index += 1
+        if bracket_count == 0:
+            break
+        if c != ' ':
+            last = c
+    if bracket_count != 0 and backtrack_count == 0:
+        index = last_bracket
+        bracket_count = 0
+    return index, bracket_count == 0
+
+
+def _resolve_entity(entity: str) -> str:
+    """Text html.parser yields for an entity reference"""
+    if entity.startswith('&#'):
+        return html.unescape(entity)
+    # Unknown named entities are kept without their semicolon
+    name = entity[1:-1]
+    return html.entities.html5.get(name + ';', '&' + name)
+
+
+class _TextCollector(HTMLParser):
+    """Collects text nodes the way BeautifulSoup's html.parser builder does"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.strings = ['']
+
+    def _boundary(self, *args):
+        self.strings.append('')
+
+    handle_starttag = handle_endtag = handle_startendtag = _boundary
+    handle_comment = handle_decl = handle_pi = unknown_decl = _boundary
+
+    def handle_data(self, data):
+        self.strings[-1] += data
+
+    def handle_entityref(self, name):
+        self.strings[-1] += _resolve_entity(f'&{name};')
+
+    def handle_charref(self, name):
+        self.strings[-1] += _resolve_entity(f'&#{name};')
+
+
+def _html_text(fragment: str) -> str:
+    collector = _TextCollector()
+    collector.feed(fragment)
+    collector.close()
+    return ''.join(_collapse_whitespace(string) for string in collector.strings)
+
+
+def _collapse_whitespace(string: str) -> str:
+    """Whitespace-only text nodes become a single newline or space in the soup"""
+    if string and not string.strip(ASCII_SPACES):
+        return '\n' if '\n' in string else ' '
+    return string
+
+
+def _extract_fenced_blocks(text: str, stash: List[Tuple[str, int]]) -> str:
+    """Replace fenced code blocks by stash placeholders on their own line"""
+    index = 0
+    while True:
+        m = FENCED_BLOCK_RE.search(text, index)
+        if not m:
+            break
+        if m.group('attrs') and m.group('attrs').count('{') != m.group('attrs').count('}'):
+            index = m.end('attrs')
+            continue
+        stash.append((m.group('code'), _ELEMENT))
+        placeholder = f'{STX}{len(stash) - 1}{ETX}'
+        text = f'{text[:m.start()]}\n{placeholder}\n{text[m.end():]}'
+        index = m.start() + 1 + len(placeholder)
+    return text
+
+
+class _TextBuilder:
+    """Computes get_text()-equivalent strings with Python-Markdown's prettify whitespace"""
+
+    def __init__(self, renderer: _InlineRenderer, fenced: Dict[str, str]):
+        self.renderer = renderer
+        self.fenced = fenced  # Placeholder line -> code of a standalone fenced block
+        self.cache: Dict[int, str] = {}
+
+    def prettify(self, element: _Element):
+        """Apply PrettifyTreeprocessor newlines and render inline text once"""
+        for child in element.children:
+            if child.tag == 'pre':
+                child.text = child.text.rstrip() + '\n' if child.text else child.text
+            elif child.tag == 'p' and child.text in self.fenced:
+                # A fenced block alone in its paragraph replaces the paragraph
+                child.tag = 'pre'
+                child.text = self.fenced[child.text]
+            else:
+                if child.children and not child.text.strip():
+                    child.text = '\n'
+                else:
+                    child.text = self.renderer.render(child.text)
+                self.prettify(child)
+            if not child.tail.strip():
+                child.tail = '\n'
+            else:
+                child.tail = self.renderer.render(child.tail)
+
+    def text(self, element: _Element) -> str:
+        key = id(element)
+        if key not in self.cache:
+            parts = [element.text]
+            for child in element.children:
+                parts.append(self.text(child))
+                parts.append(child.tail)
+            self.cache[key] = ''.join(parts)
+        return self.cache[key]
+
+    def contents(self, element: _Element, is_root: bool = False) -> Tuple[List[Block], Dict[int, int]]:
+        """Sibling blocks of element's children, as soup.contents would list them"""
+        blocks: List[Block] = []
+        positions: Dict[int, int] = {}
+        if element.text:
+            blocks.append((None, element.text))
+        for i, child in enumerate(element.children):
+            positions[id(child)] = len(blocks)
+            blocks.append((child.tag, self.text(child)))
+            # The serialized document is stripped, dropping the last newline
+            if child.tail and not (is_root and i == len(element.children) - 1):
+                blocks.append((None, child.tail))
+        return blocks, positions
+
+
+def parse_markdown_document(content: str) -> ParsedDocument:
+    """Tokenize Ericsson markdown directly into a ParsedDocument"""
+    if not content.strip():
+        return ParsedDocument(full_text='')
+
+    # NormalizeWhitespace preprocessor
+    source = content.replace(STX, '').replace(ETX, '')
+    source = source.replace('\r\n', '\n').replace('\r', '\n') + '\n\n'
+    source = source.expandtabs(TAB_LENGTH)
+    source = re.sub(r'(?<=\n) +\n', '\n', source)
+
+    stash: List[Tuple[str, int]] = []
+    source = _extract_fenced_blocks(source, stash)
+    fenced = {f'{STX}{i}{ETX}': code for i, (code, _) in enumerate(stash)}
+
+    root = _Element('div')
+    _BlockParser().parse_chunk(root, source)
+
+    builder = _TextBuilder(_InlineRenderer(stash), fenced)
+    builder.prettify(root)
+
+    top_blocks, _ = builder.contents(root, is_root=True)
+    document = ParsedDocument(full_text=''.join(text for _, text in top_blocks))
+
+    sibling_blocks: Dict[int, Tuple[List[Block], Dict[int, int]]] = {id(root): builder.contents(root, True)}
+    stack = [(root, child) for child in reversed(root.children)]
+    while stack:
+        parent, element = stack.pop()
+        if element.tag == 'p':
+            document.paragraphs.append(builder.text(element).strip())
+        elif element.tag == 'table':
+            document.tables.append(_table_from_element(element, builder))
+        elif element.tag == 'h1':
+            if document.title is None:
+                document.title = builder.text(element)
+        elif element.tag in ('h2', 'h3', 'h4'):
+            if id(parent) not in sibling_blocks:
+                sibling_blocks[id(parent)] = builder.contents(parent)
+            blocks, positions = sibling_blocks[id(parent)]
+            document.headings.append(DocumentHeading(
+                name=element.tag,
+                text=builder.text(element),
+                blocks=blocks,
+                start=positions[id(element)] + 1
+            ))
+        stack.extend((element, child) for child in reversed(element.children))
+
+    return document
+
+
+def _table_from_element(table: _Element, builder: _TextBuilder) -> DocumentTable:
+    """Build a DocumentTable from a parsed pipe table"""
+    rows = [tr for section in table.children for tr in section.children]
+    headers = [builder.text(cell).strip().lower()
+               for tr in rows for cell in tr.children if cell.tag == 'th']
+    document_table = DocumentTable(text=builder.text(table), headers=headers, rows=[], data_rows=[])
+    if (document_table.is_feature_identity or document_table.is_parameter_table
+            or document_table.is_event_table):
+        document_table.rows = [[builder.text(cell).strip() for cell in tr.children] for tr in rows]
+        document_table.data_rows = [[builder.text(cell).strip() for cell in tr.children if cell.tag == 'td']
+                                    for tr in rows[1:]]
+    return document_table
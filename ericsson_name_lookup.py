@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Fuzzy lookup and prefix completion of parameter and counter names
+Operators type names like EUtranCellFDD.qRxLevMin or pmEbsHoExeAttOutEutran
+with typos and in any case. Every known name is indexed by character
+trigrams, a qualified MO.attribute name also under its attribute alone. A
+query counts shared trigrams over its rarest posting lists only and ranks
+the MAX_CANDIDATES best candidates by trigram similarity.
+
+Completion uses a sorted array of the same keys searched with bisect; it is
+saved by the processor and loaded from that file by interactive tools.
+"""
+
+import csv
+import heapq
+import json
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from ericsson_postings import FeatureIdTable, PostingIndex
+from ericsson_search_index import trigrams
+
+DEFAULT_PARAMETER_SPREADSHEET = Path("data/spreadsheets/Spreadsheets_Parameters.csv")
+
+MIN_SIMILARITY = 0.3
+MAX_CANDIDATES = 25
+POSTING_BUDGET = 2500
+
+COMPLETIONS_FILENAME = "name_completions.json"
+COMPLETIONS_VERSION = 1
+CACHED_PREFIX_LENGTH = 3
+CACHED_COMPLETIONS = 20
+
+
+def read_parameter_spreadsheet(path: Path = DEFAULT_PARAMETER_SPREADSHEET) -> Iterator[str]:
+    """MOClass.parameter names from the MOM parameter spreadsheet, in file order"""
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            mo_class, parameter = row.get('MO Class Name'), row.get('Parameter Name')
+            if mo_class and parameter:
+                yield f"{mo_class}.{parameter}"
+
+
+# Spreadsheet column -> key of read_parameter_details() rows
+PARAMETER_DETAIL_COLUMNS = {
+    'MO Class Name': 'mo_class',
+    'Parameter Name': 'parameter',
+    'Data Type': 'data_type',
+    'Range and Values': 'range',
+    'Default Value': 'default',
+    'Unit': 'unit',
+    'Parameter Description': 'description',
+    'Deprecated': 'deprecated',
+}
+
+
+def read_parameter_details(path: Path = DEFAULT_PARAMETER_SPREADSHEET) -> Iterator[Dict[str, str]]:
+    """Data type, range, default, unit and description of every spreadsheet parameter, in file order"""
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row.get('MO Class Name') and row.get('Parameter Name'):
+                yield {key: (row.get(column) or '').strip() for column, key in PARAMETER_DETAIL_COLUMNS.items()}
+
+
+def _lookup_keys(lower_name: str) -> List[str]:
+    """A lowercased name and, for MO.attribute names, the attribute alone"""
+    if '.' in lower_name:
+        return [lower_name, lower_name.rsplit('.', 1)[1]]
+    return [lower_name]
+
+
+class FuzzyNameIndex:
+    """Known parameter/counter names with their features, searchable with typos"""
+
+    def __init__(self):
+        # Entries: one per distinct (lowercased) name
+        self.names: List[str] = []
+        self.kinds: List[str] = []
+        self.feature_ids: List[List[str]] = []
+        self._entries: Dict[str, int] = {}
+        # Lookup keys: lowercased names and attribute parts, each shared by one or more entries
+        self._keys: Dict[str, int] = {}
+        self._key_names: List[str] = []
+        self._key_entries: List[List[int]] = []
+        self.trigram_index: Dict[str, List[int]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, name: str, kind: str, feature_ids: Iterable[str] = ()):
+        """Add a name, or merge feature ids into an already known one"""
+        lower = name.lower()
+        entry = self._entries.get(lower)
+        if entry is not None:
+            known = self.feature_ids[entry]
+            known.extend(feature_id for feature_id in feature_ids if feature_id not in known)
+            return
+
+        entry = len(self.names)
+        self._entries[lower] = entry
+        self.names.append(name)
+        self.kinds.append(kind)
+        self.feature_ids.append(list(dict.fromkeys(feature_ids)))
+        for key in _lookup_keys(lower):
+            self._add_key(key, entry)
+
+    def _add_key(self, key: str, entry: int):
+        if key in self._keys:
+            self._key_entries[self._keys[key]].append(entry)
+            return
+        key_id = len(self._key_entries)
+        self._keys[key] = key_id
+        self._key_names.append(key)
+        self._key_entries.append([entry])
+        for gram in trigrams(key):
+            self.trigram_index[gram].append(key_id)
+
+    def add_posting_index(self, index: PostingIndex, feature_table: FeatureIdTable, kind: str,
+                          display_names: Optional[Dict[str, str]] = None):
+        """Add every key of a processor index (lowercased keys, shown as display_names[key] if given)"""
+        display_names = display_names or {}
+        for key, ordinals in index.postings.items():
+            self.add(display_names.get(key, key), kind, feature_table.resolve(ordinals))
+
+    def load_parameter_spreadsheet(self, path: Path = DEFAULT_PARAMETER_SPREADSHEET) -> int:
+        """Add MOClass.parameter names from the MOM parameter spreadsheet, returns the row count"""
+        rows = 0
+        for name in read_parameter_spreadsheet(path):
+            self.add(name, 'parameter')
+            rows += 1
+        return rows
+
+    def _similar_keys(self, query: str) -> Dict[int, float]:
+        """Key id -> trigram similarity for keys at least MIN_SIMILARITY similar to the query"""
+        grams = trigrams(query)
+        # Candidates come from the rarest trigrams only, up to POSTING_BUDGET
+        # postings: a close match shares most of the query's trigrams, so it
+        # shares rare ones too
+        shared: Counter = Counter()
+        scanned = 0
+        for postings in sorted((self.trigram_index.get(gram, ()) for gram in grams), key=len):
+            if scanned and scanned + len(postings) > POSTING_BUDGET:
+                break
+            shared.update(postings)
+            scanned += len(postings)
+
+        similar = {}
+        for key_id, _ in shared.most_common(MAX_CANDIDATES):
+            key_grams = trigrams(self._key_names[key_id])
+            common = len(grams & key_grams)
+            similarity = common / (len(grams) + len(key_grams) - common)
+            if similarity >= MIN_SIMILARITY:
+                similar[key_id] = similarity
+        return similar
+
+    def lookup(self, query: str, top_k: int = 10, kind: Optional[str] = None) -> List[Dict]:
+        """Best matching names for a possibly misspelled query, most similar first
+
+        Each match is {'name', 'kind', 'score', 'feature_ids'}; an exact
+        (case-insensitive) name or attribute match scores 1.0.
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+        scores: Dict[int, float] = {}
+        for key_id, similarity in self._similar_keys(query).items():
+            for entry in self._key_entries[key_id]:
+                if similarity > scores.get(entry, 0.0) and (kind is None or self.kinds[entry] == kind):
+                    scores[entry] = similarity
+
+        best = heapq.nsmallest(top_k, scores.items(), key=lambda item: (-item[1], self.names[item[0]]))
+        return [
+            {
+                'name': self.names[entry],
+                'kind': self.kinds[entry],
+                'score': round(score, 4),
+                'feature_ids': self.feature_ids[entry],
+            }
+            for entry, score in best
+        ]
+
+
+class PrefixCompleter:
+    """Completions of a typed prefix, ranked by how many features reference each name
+
+    Lookup keys (see FuzzyNameIndex) are kept in one sorted array and a
+    prefix is the bisected range of keys starting with it. Prefixes of up to
+    CACHED_PREFIX_LENGTH characters cover thousands of keys, so their best
+    completions are computed once when the completer is built.
+    """
+
+    def __init__(self, names: List[str], counts: List[int], keys: List[str],
+                 key_entries: List[int], top: Dict[str, List[int]]):
+        self.names = names
+        self.counts = counts
+        self.keys = keys
+        self.key_entries = key_entries
+        self.top = top
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def build(cls, feature_counts: Dict[str, int]) -> 'PrefixCompleter':
+        """Build from name -> number of referencing features (names compared case-insensitively)"""
+        names: List[str] = []
+        counts: List[int] = []
+        seen: Dict[str, int] = {}
+        for name, count in feature_counts.items():
+            lower = name.lower()
+            if lower in seen:
+                counts[seen[lower]] = max(counts[seen[lower]], count)
+                continue
+            seen[lower] = len(names)
+            names.append(name)
+            counts.append(count)
+
+        pairs = sorted((key, entry) for lower, entry in seen.items() for key in _lookup_keys(lower))
+        keys = [key for key, _ in pairs]
+        key_entries = [entry for _, entry in pairs]
+
+        completer = cls(names, counts, keys, key_entries, {})
+        by_prefix: Dict[str, Dict[int, None]] = defaultdict(dict)
+        for key, entry in pairs:
+            for length in range(min(len(key), CACHED_PREFIX_LENGTH) + 1):
+                by_prefix[key[:length]][entry] = None
+        completer.top = {prefix: completer._best(entries, CACHED_COMPLETIONS)
+                         for prefix, entries in by_prefix.items()}
+        return completer
+
+    def _best(self, entries: Iterable[int], n: int) -> List[int]:
+        return heapq.nsmallest(n, entries, key=lambda entry: (-self.counts[entry], self.names[entry]))
+
+    def complete(self, prefix: str, n: int = 10) -> List[Dict]:
+        """Up to n names starting with prefix (or whose attribute does), most referenced first"""
+        prefix = prefix.strip().lower()
+        if len(prefix) <= CACHED_PREFIX_LENGTH and n <= CACHED_COMPLETIONS:
+            best = self.top.get(prefix, [])[:n]
+        else:
+            start = bisect_left(self.keys, prefix)
+            end = bisect_left(self.keys, prefix + '\uffff', start)
+            best = self._best(dict.fromkeys(self.key_entries[start:end]), n)
+        return [{'name': self.names[entry], 'features': self.counts[entry]} for entry in best]
+
+    def save(self, path: Path):
+        data = {
+            'version': COMPLETIONS_VERSION,
+            'names': self.names,
+            'counts': self.counts,
+            'keys': self.keys,
+            'key_entries': self.key_entries,
+            'top': self.top,
+        }
+        Path(path).write_text(json.dumps(data, separators=(',', ':')))
+
+    @classmethod
+    def load(cls, path: Path) -> 'PrefixCompleter':
+        data = json.loads(Path(path).read_text())
+        if data.get('version') != COMPLETIONS_VERSION:
+            raise ValueError(f"Unsupported completions file version: {path}")
+        return cls(data['names'], data['counts'], data['keys'], data['key_entries'], data['top'])
+
+
+# Main execution
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Complete or fuzzy-match Ericsson parameter names')
+    parser.add_argument('query', help='Name prefix (or misspelled name with --fuzzy)')
+    parser.add_argument('--data', default='output/ericsson_data', help='Processor ericsson_data directory')
+    parser.add_argument('-n', type=int, default=10, help='Number of results')
+    parser.add_argument('--fuzzy', action='store_true',
+                        help='Fuzzy match parameter/counter names instead of completing a prefix')
+
+    args = parser.parse_args()
+
+    if args.fuzzy:
+        from ericsson_corpus import CORPUS_FILENAME, CorpusReader
+        lookup = FuzzyNameIndex()
+        with CorpusReader(Path(args.data) / CORPUS_FILENAME) as corpus:
+            for feature_id, feature in corpus.items():
+                for param in feature['parameters']:
+                    lookup.add(param['name'], 'parameter', [feature_id])
+                for counter in feature['counters']:
+                    lookup.add(counter['name'], 'counter', [feature_id])
+        if DEFAULT_PARAMETER_SPREADSHEET.exists():
+            lookup.load_parameter_spreadsheet()
+        for match in lookup.lookup(args.query, args.n):
+            print(f"{match['score']:.2f}  {match['name']} ({match['kind']}): {', '.join(match['feature_ids'][:5])}")
+    else:
+        completer = PrefixCompleter.load(Path(args.data) / COMPLETIONS_FILENAME)
+        for completion in completer.complete(args.query, args.n):
+            print(f"{completion['name']}  ({completion['features']} features)")
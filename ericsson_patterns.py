@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Precompiled regex registry for Ericsson feature extraction
+Patterns are compiled once at import time and every search is counted and
+timed, so the summary shows which patterns (and which fallbacks) actually fire.
+"""
+
+import re
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class PatternStats:
+    """Usage counters for one registered pattern"""
+    calls: int = 0
+    hits: int = 0  # Calls in which the pattern produced the result
+    seconds: float = 0.0
+
+
+class RegisteredPattern:
+    """A compiled pattern whose searches are counted and timed"""
+
+    def __init__(self, name: str, regex: re.Pattern, stats: PatternStats):
+        self.name = name
+        self.regex = regex
+        self.stats = stats
+
+    def search(self, text: str) -> Optional[re.Match]:
+        start = time.perf_counter()
+        match = self.regex.search(text)
+        self._record(match is not None, start)
+        return match
+
+    def findall(self, text: str) -> List:
+        start = time.perf_counter()
+        matches = self.regex.findall(text)
+        self._record(bool(matches), start)
+        return matches
+
+    def _record(self, hit: bool, start: float):
+        self.stats.calls += 1
+        self.stats.seconds += time.perf_counter() - start
+        if hit:
+            self.stats.hits += 1
+
+
+class PatternSet:
+    """Ordered fallback patterns behind a single call, with per-alternative stats
+
+    Each alternative keeps its own compiled regex: CPython's backtracking
+    engine searches a literal-prefixed pattern much faster than a combined
+    alternation, so trying the alternatives in order is the cheaper scan.
+    """
+
+    def __init__(self, name: str, alternatives: List[Tuple[str, str]], flags: int,
+                 registry: 'PatternRegistry'):
+        self.name = name
+        self.alternatives = [registry.compile(f'{name}.{alt_name}', pattern, flags)
+                             for alt_name, pattern in alternatives]
+        self.stats = registry.stats_for(name)
+
+    def search(self, text: str) -> Optional[re.Match]:
+        """Match of the first alternative that matches anywhere in text"""
+        start = time.perf_counter()
+        for alternative in self.alternatives:
+            match = alternative.search(text)
+            if match:
+                self._record(True, start)
+                return match
+        self._record(False, start)
+        return None
+
+    def findall(self, text: str) -> Dict[str, List]:
+        """re.findall result of every alternative, keyed by alternative name"""
+        start = time.perf_counter()
+        results = {alternative.name.split('.', 1)[1]: alternative.findall(text)
+                   for alternative in self.alternatives}
+        self._record(any(results.values()), start)
+        return results
+
+    def _record(self, hit: bool, start: float):
+        self.stats.calls += 1
+        self.stats.seconds += time.perf_counter() - start
+        if hit:
+            self.stats.hits += 1
+
+
+class PatternRegistry:
+    """Named compiled patterns with per-pattern hit counts and timings"""
+
+    def __init__(self):
+        self.stats: Dict[str, PatternStats] = {}
+
+    def stats_for(self, name: str) -> PatternStats:
+        if name not in self.stats:
+            self.stats[name] = PatternStats()
+        return self.stats[name]
+
+    def compile(self, name: str, pattern: str, flags: int = 0) -> RegisteredPattern:
+        return RegisteredPattern(name, re.compile(pattern, flags), self.stats_for(name))
+
+    def compile_first(self, name: str, alternatives: List[Tuple[str, str]],
+                      flags: int = 0) -> PatternSet:
+        """Register patterns tried in order until one matches"""
+        return PatternSet(name, alternatives, flags, self)
+
+    def report(self) -> Dict[str, Dict]:
+        """Stats of every pattern, keyed by name ('set.alternative' for set members)"""
+        return {name: asdict(stats) for name, stats in sorted(self.stats.items())}
+
+    def drain(self) -> Dict[str, Dict]:
+        """Report the stats gathered since the last drain and reset them"""
+        report = {name: asdict(stats) for name, stats in self.stats.items() if stats.calls}
+        for stats in self.stats.values():
+            stats.calls = stats.hits = 0
+            stats.seconds = 0.0
+        return report
+
+    def merge(self, report: Dict[str, Dict]):
+        """Add stats drained in another process"""
+        for name, values in report.items():
+            stats = self.stats_for(name)
+            stats.calls += values['calls']
+            stats.hits += values['hits']
+            stats.seconds += values['seconds']
+
+
+PATTERNS = PatternRegistry()
+
+# Feature identity
+FAJ_ID = PATTERNS.compile_first('faj_id', [
+    ('spaced', r'FAJ\s*(\d+\s+\d+)'),  # FAJ 121 3094
+    ('compact', r'FAJ\s*(\d{3}\s*\d{4})'),  # FAJ 1213094
+    ('table', r'Feature Identity\s*\|\s*FAJ\s*(\d+\s+\d+)'),  # In table
+])
+FAJ_REFERENCE = PATTERNS.compile('faj_reference', r'FAJ\s*(\d+\s+\d+)')
+CXC_CODE = PATTERNS.compile('cxc_code', r'FeatureState=(CXC\d+)')
+
+# Parameters and counters
+PARAMETER_MENTION = PATTERNS.compile('parameter_mention', r'([A-Z][a-zA-Z]*\.[a-zA-Z][a-zA-Z0-9]*)')
+PM_COUNTER = PATTERNS.compile_first('pm_counter', [
+    ('prefixed', r'pm([A-Za-z0-9]+)'),  # pmCounterName
+    ('spaced', r'PM\s+([A-Za-z0-9]+)'),  # PM CounterName
+], re.IGNORECASE)
+
+
+def _feature_state_patterns(state: str) -> List[Tuple[str, str]]:
+    """Activation/deactivation step patterns, most specific first"""
+    return [
+        ('exact', rf'1\.\s+Set the FeatureState\.featureState attribute to {state} in the (FeatureState=[^\s]+)'),
+        ('set_attribute', rf'Set the FeatureState\.featureState attribute to {state} in the (FeatureState=[^\s]+)'),
+        ('state_in', rf'{state} in the (FeatureState=CXC\d+)'),
+        ('same_line', rf'FeatureState\.featureState.*{state}.*FeatureState=(CXC\d+)'),
+    ]
+
+
+ACTIVATION_STEP = PATTERNS.compile_first('activation_step', _feature_state_patterns('ACTIVATED'))
+DEACTIVATION_STEP = PATTERNS.compile_first('deactivation_step', _feature_state_patterns('DEACTIVATED'))
+# Last resort: any CXC code in an (de)activation section
+SECTION_CXC_CODE = PATTERNS.compile('section_cxc_code', r'FeatureState=(CXC\d+)')
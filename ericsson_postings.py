@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Posting lists over integer feature ordinals
+Features get a dense ordinal from an id table; every index maps a key to the
+sorted, duplicate-free list of ordinals containing it. Sorted lists make
+multi-term AND/OR queries a merge, and a reverse map lets a single feature be
+removed or re-indexed without rebuilding the index.
+"""
+
+import heapq
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class FeatureIdTable:
+    """Feature id <-> dense integer ordinal, in first-seen order"""
+
+    def __init__(self, ids: Optional[List[str]] = None):
+        self.ids: List[str] = list(ids or [])
+        self.ordinals: Dict[str, int] = {feature_id: i for i, feature_id in enumerate(self.ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def ordinal(self, feature_id: str) -> int:
+        """Ordinal of a feature id, assigning the next one if it is new"""
+        if feature_id not in self.ordinals:
+            self.ordinals[feature_id] = len(self.ids)
+            self.ids.append(feature_id)
+        return self.ordinals[feature_id]
+
+    def resolve(self, ordinals: Iterable[int]) -> List[str]:
+        return [self.ids[ordinal] for ordinal in ordinals]
+
+
+def intersect(*postings: List[int]) -> List[int]:
+    """Ordinals present in every list (smallest list first, binary search in the others)"""
+    if not postings:
+        return []
+    ordered = sorted(postings, key=len)
+    result = []
+    for ordinal in ordered[0]:
+        for other in ordered[1:]:
+            i = bisect_left(other, ordinal)
+            if i == len(other) or other[i] != ordinal:
+                break
+        else:
+            result.append(ordinal)
+    return result
+
+
+def union(*postings: List[int]) -> List[int]:
+    """Ordinals present in any list, sorted and without duplicates"""
+    result: List[int] = []
+    for ordinal in heapq.merge(*postings):
+        if not result or result[-1] != ordinal:
+            result.append(ordinal)
+    return result
+
+
+class PostingIndex:
+    """Key -> sorted feature ordinals, with the reverse map needed to remove a feature"""
+
+    def __init__(self):
+        self.postings: Dict[str, List[int]] = {}
+        self._keys_of: Dict[int, Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self.postings)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.postings
+
+    def add(self, ordinal: int, keys: Iterable[str]):
+        for key in keys:
+            if key in self._keys_of[ordinal]:
+                continue
+            self._keys_of[ordinal].add(key)
+            ordinals = self.postings.setdefault(key, [])
+            if ordinals and ordinals[-1] > ordinal:
+                insort(ordinals, ordinal)
+            else:
+                ordinals.append(ordinal)
+
+    def remove(self, ordinal: int):
+        for key in self._keys_of.pop(ordinal, ()):
+            ordinals = self.postings[key]
+            del ordinals[bisect_left(ordinals, ordinal)]
+            if not ordinals:
+                del self.postings[key]
+
+    def replace(self, ordinal: int, keys: Iterable[str]):
+        """Re-index one feature whose keys changed"""
+        self.remove(ordinal)
+        self.add(ordinal, keys)
+
+    def get(self, key: str) -> List[int]:
+        return self.postings.get(key, [])
+
+    def all_of(self, keys: Iterable[str]) -> List[int]:
+        return intersect(*(self.get(key) for key in keys))
+
+    def any_of(self, keys: Iterable[str]) -> List[int]:
+        return union(*(self.get(key) for key in keys))
+
+    def to_json(self) -> Dict[str, List[int]]:
+        return self.postings
+
+    @classmethod
+    def from_json(cls, data: Dict[str, List[int]]) -> 'PostingIndex':
+        index = cls()
+        index.postings = data
+        for key, ordinals in data.items():
+            for ordinal in ordinals:
+                index._keys_of[ordinal].add(key)
+        return index
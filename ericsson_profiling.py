@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Opt-in stage profiler for the Ericsson feature processor
+Times named pipeline stages (parse steps, each extractor, cache I/O) and
+whole file extractions. Optionally tracks allocations per stage with
+tracemalloc and records Chrome trace events (chrome://tracing, Perfetto).
+When disabled every hook is a plain call, so the processor can leave the
+instrumentation in place.
+"""
+
+import heapq
+import json
+import math
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, List, Optional
+
+_NO_PROFILING = nullcontext()
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class StageProfiler:
+    """Per-stage durations, optional allocation sizes and trace events
+
+    Stages must not nest when memory is tracked: each one resets the
+    tracemalloc peak. File scopes may contain stages.
+    """
+
+    def __init__(self, enabled: bool = False, track_memory: bool = False, trace: bool = False,
+                 slowest: int = 10):
+        self.enabled = enabled or track_memory or trace
+        self.track_memory = track_memory
+        self.trace = trace
+        self.slowest = slowest
+        self.samples: Dict[str, List[float]] = {}  # Stage -> seconds per call
+        self.allocated: Dict[str, List[int]] = {}  # Stage -> peak bytes allocated per call
+        self.files: List[tuple] = []  # Min-heap of (seconds, path, stage seconds) for the slowest files
+        self.events: List[Dict] = []
+        self._file_stages: Optional[Dict[str, float]] = None
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _event(self, name: str, category: str, start_ns: int, end_ns: int, args: Optional[Dict] = None):
+        event = {'name': name, 'cat': category, 'ph': 'X', 'ts': start_ns / 1000, 'dur': (end_ns - start_ns) / 1000,
+                 'pid': os.getpid(), 'tid': threading.get_ident()}
+        if args:
+            event['args'] = args
+        self.events.append(event)
+
+    @contextmanager
+    def _stage(self, name: str):
+        if self.track_memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            seconds = (end - start) / 1e9
+            self.samples.setdefault(name, []).append(seconds)
+            if self.track_memory:
+                self.allocated.setdefault(name, []).append(max(0, tracemalloc.get_traced_memory()[1] - base))
+            if self._file_stages is not None:
+                self._file_stages[name] = self._file_stages.get(name, 0.0) + seconds
+            if self.trace:
+                self._event(name, 'stage', start, end)
+
+    def stage(self, name: str):
+        """Context manager timing one call of a stage"""
+        return self._stage(name) if self.enabled else _NO_PROFILING
+
+    def call(self, name: str, function, *args):
+        """function(*args), timed as a stage"""
+        if not self.enabled:
+            return function(*args)
+        with self._stage(name):
+            return function(*args)
+
+    @contextmanager
+    def _file(self, path: str):
+        self._file_stages = {}
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            stages, self._file_stages = self._file_stages, None
+            self._add_file(((end - start) / 1e9, path, stages))
+            if self.trace:
+                self._event(Path(path).name, 'file', start, end, {'path': path})
+
+    def file(self, path):
+        """Context manager timing the extraction of one file, with its stage breakdown"""
+        return self._file(str(path)) if self.enabled else _NO_PROFILING
+
+    def _add_file(self, record: tuple):
+        if len(self.files) < self.slowest:
+            heapq.heappush(self.files, record)
+        elif record[0] > self.files[0][0]:
+            heapq.heapreplace(self.files, record)
+
+    def report(self) -> Dict:
+        """Per-stage count/total/p50/p95/max (ms) and the slowest files"""
+        stages = {}
+        for name, samples in sorted(self.samples.items()):
+            ordered = sorted(samples)
+            stats = {
+                'count': len(ordered),
+                'total_seconds': round(sum(ordered), 6),
+                'p50_ms': round(percentile(ordered, 0.50) * 1000, 3),
+                'p95_ms': round(percentile(ordered, 0.95) * 1000, 3),
+                'max_ms': round(ordered[-1] * 1000, 3),
+            }
+            if name in self.allocated:
+                allocated = sorted(self.allocated[name])
+                stats.update({
+                    'alloc_p50_kb': round(percentile(allocated, 0.50) / 1024, 1),
+                    'alloc_p95_kb': round(percentile(allocated, 0.95) / 1024, 1),
+                    'alloc_max_kb': round(allocated[-1] / 1024, 1),
+                })
+            stages[name] = stats
+        slowest_files = [
+            {'file': path, 'ms': round(seconds * 1000, 3),
+             'stages_ms': {name: round(value * 1000, 3)
+                           for name, value in sorted(file_stages.items(), key=lambda item: -item[1])}}
+            for seconds, path, file_stages in sorted(self.files, reverse=True)
+        ]
+        return {'stages': stages, 'slowest_files': slowest_files}
+
+    def drain(self) -> Dict:
+        """Raw measurements gathered since the last drain (for merge() in another process), then reset"""
+        raw = {'samples': self.samples, 'allocated': self.allocated, 'files': self.files, 'events': self.events}
+        self.samples, self.allocated, self.files, self.events = {}, {}, [], []
+        return raw
+
+    def merge(self, raw: Dict):
+        """Add measurements drained in another process"""
+        for name, samples in raw['samples'].items():
+            self.samples.setdefault(name, []).extend(samples)
+        for name, allocated in raw['allocated'].items():
+            self.allocated.setdefault(name, []).extend(allocated)
+        for record in raw['files']:
+            self._add_file(tuple(record))
+        self.events.extend(raw['events'])
+
+    def write_trace(self, path: Path):
+        """Chrome trace-event JSON of every recorded stage and file"""
+        Path(path).write_text(json.dumps({'traceEvents': self.events, 'displayTimeUnit': 'ms'}))
@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Advanced search index for processed Ericsson features
+Inverted index with BM25 ranking over feature names, descriptions, parameters,
+counters and CXC codes, plus exact lookup tables and a trigram index for
+misspelled query terms. Persists to ericsson_data/search_index.json.gz and
+supports incremental updates when only some features changed.
+"""
+
+import gzip
+import hashlib
+import heapq
+import json
+import math
+import re
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ericsson_corpus import CORPUS_FILENAME, CorpusReader, LazyFeatureMap
+from ericsson_postings import PostingIndex
+
+INDEX_VERSION = 1
+INDEX_FILENAME = "search_index.json.gz"
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Term frequency weight of each feature field
+FIELD_WEIGHTS = {
+    'id': 3,
+    'name': 3,
+    'cxc_code': 3,
+    'parameters': 2,
+    'counters': 2,
+    'summary': 1,
+    'description': 1,
+}
+
+# Query terms missing from the vocabulary are matched to terms sharing enough trigrams
+FUZZY_MIN_SIMILARITY = 0.35
+FUZZY_MAX_EXPANSIONS = 3
+
+_WORD = re.compile(r'[a-z0-9]+')
+_CAMEL_PART = re.compile(r'[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric words"""
+    return _WORD.findall(text.lower())
+
+
+def identifier_tokens(name: str) -> List[str]:
+    """Tokens of a parameter or counter name: the full name and its camelCase parts
+
+    'MimoSleepFunction.sleepMode' -> mimosleepfunction.sleepmode, mimo, sleep,
+    function, sleep, mode
+    """
+    return [name.lower()] + [part.lower() for part in _CAMEL_PART.findall(name)]
+
+
+def trigrams(term: str) -> Set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class EricssonSearchIndexBuilder:
+    """Builds, updates, persists and queries the feature search index"""
+
+    def __init__(self, features_dir: str, output_dir: str = "output"):
+        self.features_dir = Path(features_dir)
+        self.output_dir = Path(output_dir)
+        self.index_file = self.output_dir / "ericsson_data" / INDEX_FILENAME
+
+        self.features: Dict[str, Dict] = {}
+        self.feature_hashes: Dict[str, str] = {}
+        self._corpus: Optional[LazyFeatureMap] = None  # Every processed feature, opened on first use
+        self.build_time = 0.0
+        self._reset_index()
+
+    def _reset_index(self):
+        """Empty every index structure"""
+        # Feature ordinals: position in doc_ids, None once a feature is deleted
+        self.doc_ids: List[Optional[str]] = []
+        self.ordinals: Dict[str, int] = {}
+        self.doc_lengths: List[int] = []
+
+        # BM25 postings: term -> {ordinal: weighted term frequency}
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self._terms_of: Dict[int, List[str]] = {}
+
+        # Exact lookups
+        self.parameter_index = PostingIndex()
+        self.counter_index = PostingIndex()
+        self.cxc_index = PostingIndex()
+        self.name_tokens_index = PostingIndex()
+
+        # Trigram -> vocabulary terms, for misspelled query terms
+        self.fuzzy_index: Dict[str, Set[str]] = defaultdict(set)
+        self._trigram_counts: Dict[str, int] = {}
+
+        self._norms: List[float] = []
+
+    # Loading
+
+    def load_features(self, feature_ids: Optional[Iterable[str]] = None) -> int:
+        """Load processed features (only feature_ids if given), from the binary corpus when available"""
+        corpus_file = self.features_dir.parent / CORPUS_FILENAME
+        if feature_ids is not None:
+            self.features = {}
+            corpus = CorpusReader(corpus_file) if corpus_file.exists() else None
+            for feature_id in feature_ids:
+                feature = corpus.get(feature_id) if corpus is not None else self._read_feature_file(feature_id)
+                if feature is not None:
+                    self.features[feature_id] = feature
+            if corpus is not None:
+                corpus.close()
+        elif corpus_file.exists():
+            with CorpusReader(corpus_file) as corpus:
+                self.features = dict(corpus.items())
+        else:
+            self.features = {}
+            for feature_file in sorted(self.features_dir.glob("*.json")):
+                try:
+                    feature = json.loads(feature_file.read_text())
+                except json.JSONDecodeError as e:
+                    print(f"⚠️  Warning: Skipping corrupted file {feature_file}: {e}")
+                    continue
+                if 'id' in feature:
+                    self.features[feature['id']] = feature
+        return len(self.features)
+
+    def _read_feature_file(self, feature_id: str) -> Optional[Dict]:
+        feature_file = self.features_dir / f"feature_{feature_id.replace(' ', '_')}.json"
+        return json.loads(feature_file.read_text()) if feature_file.exists() else None
+
+    def corpus_features(self) -> Optional[LazyFeatureMap]:
+        """Every processed feature from the binary corpus, decoded on access; None without a corpus"""
+        if self._corpus is None:
+            corpus_file = self.features_dir.parent / CORPUS_FILENAME
+            if corpus_file.exists():
+                self._corpus = LazyFeatureMap(CorpusReader(corpus_file))
+        return self._corpus
+
+    def feature_name(self, feature_id: str) -> str:
+        """Name of an indexed feature, read from the corpus (or its JSON file) if it is not loaded"""
+        feature = self.features.get(feature_id)
+        if feature is None:
+            corpus = self.corpus_features()
+            feature = corpus.get(feature_id) if corpus is not None else self._read_feature_file(feature_id)
+        return (feature or {}).get('name', '')
+
+    def load_indices(self) -> bool:
+        """Load a previously saved index; False if there is none or it is unreadable"""
+        if not self.index_file.exists():
+            return False
+        try:
+            with gzip.open(self.index_file, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️  Could not read {self.index_file.name}: {e}")
+            return False
+        if data.get('metadata', {}).get('version') != INDEX_VERSION:
+            return False
+
+        metadata = data['metadata']
+        self.feature_hashes = metadata.get('feature_hashes', {})
+        self.build_time = metadata.get('build_time', 0.0)
+        self.doc_ids = data['doc_ids']
+        self.ordinals = {feature_id: i for i, feature_id in enumerate(self.doc_ids) if feature_id is not None}
+        self.doc_lengths = data['doc_lengths']
+
+        self.postings = {}
+        self._terms_of = defaultdict(list)
+        for term, flat in data['postings'].items():
+            postings = dict(zip(flat[0::2], flat[1::2]))
+            self.postings[term] = postings
+            for ordinal in postings:
+                self._terms_of[ordinal].append(term)
+        self._terms_of = dict(self._terms_of)
+
+        self.parameter_index = PostingIndex.from_json(data['parameter_index'])
+        self.counter_index = PostingIndex.from_json(data['counter_index'])
+        self.cxc_index = PostingIndex.from_json(data['cxc_index'])
+        self.name_tokens_index = PostingIndex.from_json(data['name_tokens_index'])
+
+        self._rebuild_fuzzy_index()
+        self._update_norms()
+        return True
+
+    # Building
+
+    def _compute_feature_hashes(self, feature_ids: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """Content hash of every loaded feature, or of feature_ids (processing timestamp excluded)"""
+        hashes = {}
+        for feature_id in self.features if feature_ids is None else feature_ids:
+            feature = self.features[feature_id]
+            content = {key: value for key, value in feature.items() if key != 'processed_at'}
+            hashes[feature_id] = hashlib.md5(
+                json.dumps(content, sort_keys=True).encode('utf-8')
+            ).hexdigest()
+        return hashes
+
+    def build_all_indices(self):
+        """Index every loaded feature from scratch"""
+        print("🔨 Building search indices...")
+        start = time.perf_counter()
+
+        self._reset_index()
+        for feature_id, feature in self.features.items():
+            self._add_feature(feature_id, feature)
+        self.feature_hashes = self._compute_feature_hashes()
+        self._rebuild_fuzzy_index()
+        self._update_norms()
+
+        self.build_time = time.perf_counter() - start
+        print(f"✅ Indexed {len(self.ordinals)} features, {len(self.postings)} terms")
+
+    def incremental_update(self, modified_features: List[str], deleted_features: List[str]):
+        """Re-index changed or new features and drop deleted ones
+
+        Only the modified features need to be loaded; the hashes of the
+        others are kept. Every update leaves the old ordinal behind as a
+        tombstone; once tombstones outnumber live features, all features are
+        loaded and the index is rebuilt with dense ordinals.
+        """
+        start = time.perf_counter()
+
+        for feature_id in list(modified_features) + list(deleted_features):
+            if feature_id in self.ordinals:
+                self._remove_feature(feature_id)
+        for feature_id in modified_features:
+            if feature_id in self.features:
+                self._add_feature(feature_id, self.features[feature_id])
+
+        for feature_id in deleted_features:
+            self.feature_hashes.pop(feature_id, None)
+        self.feature_hashes.update(self._compute_feature_hashes(
+            [feature_id for feature_id in modified_features if feature_id in self.features]))
+        if self.tombstones > len(self.ordinals):
+            print(f"🧹 {self.tombstones} deleted ordinals, rebuilding the index")
+            self.load_features()
+            self.build_all_indices()
+            return
+        self._rebuild_fuzzy_index()
+        self._update_norms()
+
+        self.build_time = time.perf_counter() - start
+        print(f"✅ Re-indexed {len(modified_features)} features, removed {len(deleted_features)}")
+
+    @property
+    def tombstones(self) -> int:
+        """Ordinals of deleted or re-indexed features still held in doc_ids"""
+        return len(self.doc_ids) - len(self.ordinals)
+
+    def _feature_terms(self, feature: Dict) -> Dict[str, int]:
+        """Weighted term frequencies of a feature's indexed fields"""
+        tf: Dict[str, int] = defaultdict(int)
+
+        def add(tokens: Iterable[str], weight: int):
+            for token in tokens:
+                tf[token] += weight
+
+        add(tokenize(feature.get('id') or ''), FIELD_WEIGHTS['id'])
+        add(tokenize(feature.get('name') or ''), FIELD_WEIGHTS['name'])
+        if feature.get('cxc_code'):
+            add([feature['cxc_code'].lower()], FIELD_WEIGHTS['cxc_code'])
+        for param in feature.get('parameters', []):
+            add(identifier_tokens(param.get('name', '')), FIELD_WEIGHTS['parameters'])
+        for counter in feature.get('counters', []):
+            add(identifier_tokens(counter.get('name', '')), FIELD_WEIGHTS['counters'])
+        add(tokenize(feature.get('summary') or ''), FIELD_WEIGHTS['summary'])
+        add(tokenize(feature.get('description') or ''), FIELD_WEIGHTS['description'])
+        return tf
+
+    def _add_feature(self, feature_id: str, feature: Dict):
+        ordinal = len(self.doc_ids)
+        self.doc_ids.append(feature_id)
+        self.ordinals[feature_id] = ordinal
+
+        tf = self._feature_terms(feature)
+        for term, frequency in tf.items():
+            self.postings.setdefault(term, {})[ordinal] = frequency
+        self._terms_of[ordinal] = list(tf)
+        self.doc_lengths.append(sum(tf.values()))
+
+        self.parameter_index.add(ordinal, (p['name'].lower() for p in feature.get('parameters', [])
+                                           if p.get('name')))
+        self.counter_index.add(ordinal, (c['name'].lower() for c in feature.get('counters', [])
+                                         if c.get('name')))
+        if feature.get('cxc_code'):
+            self.cxc_index.add(ordinal, [feature['cxc_code']])
+        self.name_tokens_index.add(ordinal, tokenize(feature.get('name') or ''))
+
+    def _remove_feature(self, feature_id: str):
+        ordinal = self.ordinals.pop(feature_id)
+        self.doc_ids[ordinal] = None
+        self.doc_lengths[ordinal] = 0
+        for term in self._terms_of.pop(ordinal, []):
+            postings = self.postings[term]
+            del postings[ordinal]
+            if not postings:
+                del self.postings[term]
+        for index in (self.parameter_index, self.counter_index, self.cxc_index, self.name_tokens_index):
+            index.remove(ordinal)
+
+    def _rebuild_fuzzy_index(self):
+        self.fuzzy_index = defaultdict(set)
+        self._trigram_counts = {}
+        for term in self.postings:
+            # Full MO.attribute names are looked up exactly; their parts are words of their own
+            if len(term) >= 3 and '.' not in term:
+                grams = trigrams(term)
+                self._trigram_counts[term] = len(grams)
+                for gram in grams:
+                    self.fuzzy_index[gram].add(term)
+
+    def _update_norms(self):
+        """Precompute the BM25 length normalization of every feature"""
+        live_lengths = [self.doc_lengths[ordinal] for ordinal in self.ordinals.values()]
+        average = (sum(live_lengths) / len(live_lengths)) if live_lengths else 1.0
+        self._norms = [BM25_K1 * (1 - BM25_B + BM25_B * length / (average or 1.0))
+                       for length in self.doc_lengths]
+
+    # Querying
+
+    def _idf(self, document_frequency: int) -> float:
+        total = len(self.ordinals)
+        return math.log(1 + (total - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def expand_term(self, term: str) -> List[Tuple[str, float]]:
+        """The term itself if indexed, else up to FUZZY_MAX_EXPANSIONS similar terms with their similarity"""
+        if term in self.postings:
+            return [(term, 1.0)]
+        if len(term) < 3:
+            return []
+        grams = trigrams(term)
+        # A match shares at least `required` trigrams, so it contains one of the
+        # rarest len - required + 1 of them: only those posting sets are scanned,
+        # the common ones are just probed for the surviving candidates
+        required = math.ceil(FUZZY_MIN_SIMILARITY * len(grams))
+        by_rarity = sorted(grams, key=lambda gram: len(self.fuzzy_index.get(gram, ())))
+        split = len(grams) - required + 1
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in by_rarity[:split]:
+            for candidate in self.fuzzy_index.get(gram, ()):
+                shared[candidate] += 1
+
+        min_grams, max_grams = FUZZY_MIN_SIMILARITY * len(grams), len(grams) / FUZZY_MIN_SIMILARITY
+        scored = []
+        for candidate, count in shared.items():
+            candidate_grams = self._trigram_counts[candidate]
+            if not min_grams <= candidate_grams <= max_grams:
+                continue
+            # Even sharing every common trigram would not reach the threshold
+            needed = FUZZY_MIN_SIMILARITY * (len(grams) + candidate_grams) / (1 + FUZZY_MIN_SIMILARITY)
+            if count + len(grams) - split < needed:
+                continue
+            count += sum(1 for gram in by_rarity[split:] if candidate in self.fuzzy_index.get(gram, ()))
+            similarity = count / (len(grams) + candidate_grams - count)
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                scored.append((candidate, similarity))
+        return heapq.nlargest(FUZZY_MAX_EXPANSIONS, scored, key=lambda item: item[1])
+
+    def search(self, query: str, top_k: int = 10) -> List[Dict]:
+        """Features ranked by BM25 score for a free-text query"""
+        scores: Dict[int, float] = defaultdict(float)
+        for token in tokenize(query):
+            for term, similarity in self.expand_term(token):
+                postings = self.postings[term]
+                idf = self._idf(len(postings)) * similarity
+                for ordinal, frequency in postings.items():
+                    scores[ordinal] += idf * frequency * (BM25_K1 + 1) / (frequency + self._norms[ordinal])
+
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        return [{'id': self.doc_ids[ordinal],
+                 'name': self.feature_name(self.doc_ids[ordinal]),
+                 'score': round(score, 4)}
+                for ordinal, score in best]
+
+    def _ids(self, ordinals: List[int]) -> List[str]:
+        return [self.doc_ids[ordinal] for ordinal in ordinals]
+
+    def find_by_parameter(self, name: str) -> List[str]:
+        return self._ids(self.parameter_index.get(name.lower()))
+
+    def find_by_counter(self, name: str) -> List[str]:
+        return self._ids(self.counter_index.get(name.lower()))
+
+    def find_by_cxc(self, cxc_code: str) -> List[str]:
+        return self._ids(self.cxc_index.get(cxc_code))
+
+    # Persistence and reporting
+
+    def save_indices(self):
+        """Write the index to search_index.json.gz"""
+        data = {
+            'metadata': {
+                'version': INDEX_VERSION,
+                'built_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'build_time': self.build_time,
+                'total_features': len(self.ordinals),
+                'feature_hashes': self.feature_hashes,
+            },
+            'doc_ids': self.doc_ids,
+            'doc_lengths': self.doc_lengths,
+            'postings': {term: [value for item in sorted(postings.items()) for value in item]
+                         for term, postings in self.postings.items()},
+            'parameter_index': self.parameter_index.to_json(),
+            'counter_index': self.counter_index.to_json(),
+            'cxc_index': self.cxc_index.to_json(),
+            'name_tokens_index': self.name_tokens_index.to_json(),
+        }
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        # dumps() uses the C encoder; dump() would encode chunk by chunk in Python
+        with gzip.open(self.index_file, 'wt', encoding='utf-8', compresslevel=6) as f:
+            f.write(json.dumps(data, separators=(',', ':')))
+        print(f"💾 Saved search index to {self.index_file}")
+
+    def get_index_statistics(self) -> Dict:
+        return {
+            'total_features': len(self.ordinals),
+            'build_time': self.build_time,
+            'terms': len(self.postings),
+            'postings': sum(len(postings) for postings in self.postings.values()),
+            'indices': {
+                'parameter_index': len(self.parameter_index),
+                'counter_index': len(self.counter_index),
+                'cxc_index': len(self.cxc_index),
+                'name_tokens_index': len(self.name_tokens_index),
+                'fuzzy_index': len(self.fuzzy_index),
+            }
+        }
+
+    def export_index_summary(self):
+        """Write index statistics and the most frequent terms next to the index"""
+        document_frequencies = ((term, len(postings)) for term, postings in self.postings.items())
+        summary = {
+            'statistics': self.get_index_statistics(),
+            'top_terms': dict(heapq.nlargest(50, document_frequencies, key=lambda item: item[1])),
+            'top_parameters': {key: len(ordinals) for key, ordinals in heapq.nlargest(
+                20, self.parameter_index.postings.items(), key=lambda item: len(item[1]))},
+        }
+        summary_file = self.index_file.with_name("search_index_summary.json")
+        summary_file.write_text(json.dumps(summary, indent=2))
+
+    def check_index_consistency(self, feature_ids: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+        """Problems found between the processed features and the index, by kind
+
+        feature_ids are the ids of every processed feature; without them the
+        loaded features are checked, and the hashes stand in for the others.
+        """
+        known = None if feature_ids is None else set(feature_ids)
+        issues: Dict[str, List[str]] = {
+            'missing_features': [feature_id for feature_id in (self.features if known is None else sorted(known))
+                                 if feature_id not in self.ordinals],
+            # Indexed but not known as a processed feature
+            'stale_features': [feature_id for feature_id in self.ordinals if feature_id not in self.feature_hashes
+                               or (known is not None and feature_id not in known)],
+            'dangling_postings': [],
+            'unsorted_postings': [],
+        }
+        live = set(self.ordinals.values())
+        for term, postings in self.postings.items():
+            if not live.issuperset(postings):
+                issues['dangling_postings'].append(term)
+        for name, index in (('parameter', self.parameter_index), ('counter', self.counter_index),
+                            ('cxc', self.cxc_index), ('name_token', self.name_tokens_index)):
+            for key, ordinals in index.postings.items():
+                if not live.issuperset(ordinals):
+                    issues['dangling_postings'].append(f"{name}:{key}")
+                if any(a >= b for a, b in zip(ordinals, ordinals[1:])):
+                    issues['unsorted_postings'].append(f"{name}:{key}")
+        return issues
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+TF-IDF feature similarity and clustering
+Each feature becomes a sparse, L2-normalized TF-IDF vector over the words of
+its name, summary and description and the identifier tokens of its
+parameters and counters. The matrix is stored row-wise (CSR) and
+column-wise (CSC) in one binary file. "Features similar to X" is a single
+sparse matrix-vector product, and spherical k-means over the rows groups
+features by content instead of keyword rules.
+
+NumPy is used when installed; otherwise the same computations run in pure
+Python over the column lists, touching only the query's terms.
+"""
+
+import array
+import heapq
+import importlib.util
+import json
+import math
+import struct
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ericsson_search_index import identifier_tokens, tokenize
+
+SIMILARITY_FILENAME = "feature_similarity.bin"
+
+MAGIC = b'EFSIMIDX'
+VERSION = 1
+# magic, version, rows, columns, non-zeros, metadata length
+HEADER = struct.Struct('<8sHIIIQ')
+
+BACKENDS = ('numpy', 'python')
+
+# Terms in fewer documents say nothing about similarity, terms in more are noise
+MIN_DOCUMENT_FREQUENCY = 2
+MAX_DOCUMENT_RATIO = 0.5
+KMEANS_ITERATIONS = 20
+LABEL_TERMS = 3
+LABEL_STOPWORDS = {'and', 'for', 'the', 'with', 'from', 'based'}
+
+
+def default_backend() -> str:
+    """numpy if installed, pure Python otherwise"""
+    return 'numpy' if importlib.util.find_spec('numpy') is not None else 'python'
+
+
+def feature_terms(feature: Dict) -> Counter:
+    """Term counts of the fields that describe what a feature does"""
+    terms: Counter = Counter()
+    for field_name in ('name', 'summary', 'description'):
+        terms.update(tokenize(feature.get(field_name) or ''))
+    # Long counter families (pmMacVolDl...) would drown the prose: each name
+    # counts once, each camelCase part once per feature
+    names = {item.get('name', '') for item in feature.get('parameters', []) + feature.get('counters', [])}
+    terms.update(name.lower() for name in names)
+    terms.update({part for name in names for part in identifier_tokens(name)[1:]})
+    return terms
+
+
+def _csr(vectors: List[List[Tuple[int, float]]]) -> Tuple[List[int], List[int], List[float]]:
+    """Row pointers, columns and values of sparse row vectors"""
+    row_ptr, row_cols, row_data = [0], [], []
+    for vector in vectors:
+        for column, weight in vector:
+            row_cols.append(column)
+            row_data.append(weight)
+        row_ptr.append(len(row_cols))
+    return row_ptr, row_cols, row_data
+
+
+class FeatureSimilarityIndex:
+    """Normalized TF-IDF matrix with top-k similarity queries and k-means clusters"""
+
+    def __init__(self, backend: Optional[str] = None):
+        self.backend = backend or default_backend()
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown similarity backend: {self.backend}")
+        self.ids: List[str] = []
+        self.terms: List[str] = []
+        self.columns: Dict[str, int] = {}
+        self.rows: Dict[str, int] = {}
+        self.name_columns: Set[int] = set()  # Terms that occur in feature names, used for labels
+        self.clusters: List[int] = []  # Cluster number per row, empty until cluster()
+        self.cluster_labels: List[str] = []
+        # CSR / CSC arrays and idf (numpy arrays or array.array, depending on backend)
+        self.row_ptr = self.row_cols = self.row_data = None
+        self.col_ptr = self.col_rows = self.col_data = None
+        self.idf = None
+        self._nnz_rows = None  # Row of every stored value, for the NumPy product
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nnz(self) -> int:
+        return len(self.row_data)
+
+    def _arrays(self, typecode: str, values):
+        if self.backend == 'numpy':
+            import numpy as np
+            return np.asarray(values, dtype=np.uint32 if typecode == 'I' else np.float32)
+        return array.array(typecode, values)
+
+    @classmethod
+    def build(cls, features: Iterable[Tuple[str, Dict]], backend: Optional[str] = None) -> 'FeatureSimilarityIndex':
+        """Vectorize (id, feature dict) pairs"""
+        index = cls(backend)
+        documents = []
+        document_frequency: Counter = Counter()
+        name_words = set()
+        for feature_id, feature in features:
+            terms = feature_terms(feature)
+            index.ids.append(feature_id)
+            documents.append(terms)
+            document_frequency.update(terms.keys())
+            name_words.update(tokenize(feature.get('name') or ''))
+
+        max_df = max(MIN_DOCUMENT_FREQUENCY, MAX_DOCUMENT_RATIO * len(documents))
+        index.terms = sorted(term for term, df in document_frequency.items()
+                             if MIN_DOCUMENT_FREQUENCY <= df <= max_df)
+        index.columns = {term: column for column, term in enumerate(index.terms)}
+        index.rows = {feature_id: row for row, feature_id in enumerate(index.ids)}
+        index.name_columns = {index.columns[word] for word in name_words if word in index.columns}
+        idf = [math.log((1 + len(documents)) / (1 + document_frequency[term])) + 1 for term in index.terms]
+        index._set_matrix(*_csr([index._vector(terms, idf) for terms in documents]), idf)
+        return index
+
+    def _vector(self, terms: Counter, idf=None) -> List[Tuple[int, float]]:
+        """Normalized (column, weight) pairs of term counts, by column; unknown terms are ignored"""
+        idf = self.idf if idf is None else idf
+        weights = {self.columns[term]: (1 + math.log(count)) * float(idf[self.columns[term]])
+                   for term, count in terms.items() if term in self.columns}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+        return [(column, weights[column] / norm) for column in sorted(weights)]
+
+    def update(self, features: Iterable[Tuple[str, Dict]], removed: Iterable[str] = ()):
+        """Re-vectorize changed or new features and drop removed ones, without a full rebuild
+
+        Vocabulary and idf stay those of the last build(), so words new to the
+        corpus are ignored until the next one. A changed feature joins the
+        cluster of its most similar unchanged feature.
+        """
+        vectors = {feature_id: self._row(row) for feature_id, row in self.rows.items()}
+        clusters = dict(zip(self.ids, self.clusters))
+        for feature_id in removed:
+            vectors.pop(feature_id, None)
+            clusters.pop(feature_id, None)
+        changed = []
+        for feature_id, feature in features:
+            vectors[feature_id] = self._vector(feature_terms(feature))
+            clusters.pop(feature_id, None)
+            changed.append(feature_id)
+            self.name_columns.update(self.columns[word] for word in tokenize(feature.get('name') or '')
+                                     if word in self.columns)
+
+        self.ids = list(vectors)
+        self.rows = {feature_id: row for row, feature_id in enumerate(self.ids)}
+        self._set_matrix(*_csr(list(vectors.values())), self.idf)
+        self._nnz_rows = None
+        if not self.cluster_labels:
+            return
+        for feature_id in changed:
+            neighbours = (match['id'] for match in self.similar(feature_id, top_k=len(changed) + 1))
+            neighbour = next((other for other in neighbours if other in clusters), None)
+            if neighbour is None:
+                if 'Other' not in self.cluster_labels:
+                    self.cluster_labels.append('Other')
+                clusters[feature_id] = self.cluster_labels.index('Other')
+            else:
+                clusters[feature_id] = clusters[neighbour]
+        self.clusters = [clusters[feature_id] for feature_id in self.ids]
+
+    def _set_matrix(self, row_ptr, row_cols, row_data, idf):
+        """Store the CSR arrays and derive the CSC copy"""
+        col_lists: Dict[int, List[Tuple[int, float]]] = defaultdict(list)
+        for row in range(len(row_ptr) - 1):
+            for i in range(row_ptr[row], row_ptr[row + 1]):
+                col_lists[row_cols[i]].append((row, row_data[i]))
+        col_ptr, col_rows, col_data = [0], [], []
+        for column in range(len(idf)):
+            for row, weight in col_lists.get(column, ()):
+                col_rows.append(row)
+                col_data.append(weight)
+            col_ptr.append(len(col_rows))
+
+        self.row_ptr, self.row_cols, self.row_data = (
+            self._arrays('I', row_ptr), self._arrays('I', row_cols), self._arrays('f', row_data))
+        self.col_ptr, self.col_rows, self.col_data = (
+            self._arrays('I', col_ptr), self._arrays('I', col_rows), self._arrays('f', col_data))
+        self.idf = self._arrays('f', idf)
+
+    def _row(self, row: int) -> List[Tuple[int, float]]:
+        start, end = int(self.row_ptr[row]), int(self.row_ptr[row + 1])
+        return list(zip((int(c) for c in self.row_cols[start:end]), (float(w) for w in self.row_data[start:end])))
+
+    def _scores(self, vector: List[Tuple[int, float]]):
+        """Matrix-vector product: cosine similarity of every row with a sparse normalized vector"""
+        if self.backend == 'numpy':
+            import numpy as np
+            query = np.zeros(len(self.terms), dtype=np.float32)
+            for column, weight in vector:
+                query[column] = weight
+            if self._nnz_rows is None:
+                self._nnz_rows = np.repeat(np.arange(len(self.ids)), np.diff(self.row_ptr))
+            return np.bincount(self._nnz_rows, weights=self.row_data * query[self.row_cols], minlength=len(self.ids))
+        scores = [0.0] * len(self.ids)
+        for column, weight in vector:
+            for i in range(self.col_ptr[column], self.col_ptr[column + 1]):
+                scores[self.col_rows[i]] += self.col_data[i] * weight
+        return scores
+
+    def _top(self, scores, top_k: int, exclude: Optional[int] = None) -> List[Dict]:
+        if self.backend == 'numpy':
+            import numpy as np
+            rows = np.flatnonzero(scores > 0)
+            rows = rows[rows != exclude]
+            if len(rows) > top_k:
+                rows = rows[np.argpartition(-scores[rows], top_k - 1)[:top_k]]
+            candidates = ((int(row), float(scores[row])) for row in rows)
+        else:
+            candidates = ((row, score) for row, score in enumerate(scores) if score > 0 and row != exclude)
+        best = heapq.nsmallest(top_k, candidates, key=lambda item: (-item[1], item[0]))
+        return [{'id': self.ids[row], 'score': round(score, 4)} for row, score in best]
+
+    def similar(self, feature_id: str, top_k: int = 10) -> List[Dict]:
+        """Most similar other features, as {'id', 'score'} with cosine scores"""
+        row = self.rows.get(feature_id)
+        if row is None:
+            raise KeyError(f"Unknown feature: {feature_id}")
+        return self._top(self._scores(self._row(row)), top_k, exclude=row)
+
+    def similar_to_text(self, text: str, top_k: int = 10) -> List[Dict]:
+        """Features most similar to free text (words and parameter/counter names)"""
+        terms: Counter = Counter()
+        for word in text.split():
+            terms.update(identifier_tokens(word) if any(c.isupper() for c in word[1:]) else tokenize(word))
+        return self._top(self._scores(self._vector(terms)), top_k)
+
+    def cluster(self, n_clusters: Optional[int] = None, iterations: int = KMEANS_ITERATIONS) -> List[int]:
+        """Spherical k-means over the rows; sets clusters and data-driven cluster_labels
+
+        Seeds are picked farthest-first from the first feature, so the result
+        is deterministic. The default k is sqrt(n / 2).
+        """
+        n_rows = len(self.ids)
+        if n_rows == 0:
+            self.clusters, self.cluster_labels = [], []
+            return self.clusters
+        k = min(n_rows, n_clusters or max(1, round(math.sqrt(n_rows / 2))))
+        rows = [self._row(row) for row in range(n_rows)]
+
+        centroids = [dict(rows[0])]
+        best = list(self._scores(rows[0]))
+        while len(centroids) < k:
+            farthest = min(range(n_rows), key=lambda row: (best[row], row))
+            centroids.append(dict(rows[farthest]))
+            best = [max(a, b) for a, b in zip(best, self._scores(rows[farthest]))]
+
+        assignments: List[int] = []
+        for _ in range(iterations):
+            similarities = [list(self._scores(list(centroid.items()))) for centroid in centroids]
+            updated = [max(range(k), key=lambda j: (similarities[j][row], -j)) for row in range(n_rows)]
+            if updated == assignments:
+                break
+            assignments = updated
+            for j in range(k):
+                total: Dict[int, float] = defaultdict(float)
+                for row in range(n_rows):
+                    if assignments[row] == j:
+                        for column, weight in rows[row]:
+                            total[column] += weight
+                norm = math.sqrt(sum(weight * weight for weight in total.values()))
+                if norm:
+                    centroids[j] = {column: weight / norm for column, weight in total.items()}
+
+        self.clusters = assignments
+        self.cluster_labels = [self._label(centroid) for centroid in centroids]
+        return self.clusters
+
+    def _label(self, centroid: Dict[int, float]) -> str:
+        """Heaviest feature-name words of a centroid, e.g. 'Sleep / Mimo / Energy'"""
+        columns = sorted((column for column in centroid if column in self.name_columns),
+                         key=lambda column: (-centroid[column], column))
+        words = (self.terms[column] for column in columns)
+        label = [word.title() for word in words
+                 if word.isalpha() and len(word) > 2 and word not in LABEL_STOPWORDS][:LABEL_TERMS]
+        return ' / '.join(label) or 'Other'
+
+    def categories(self) -> Dict[str, str]:
+        """Feature id -> cluster label (empty before cluster())"""
+        return {feature_id: self.cluster_labels[cluster] for feature_id, cluster in zip(self.ids, self.clusters)}
+
+    def save(self, path: Path):
+        metadata = json.dumps({
+            'ids': self.ids,
+            'terms': self.terms,
+            'name_columns': sorted(self.name_columns),
+            'clusters': self.clusters,
+            'cluster_labels': self.cluster_labels,
+        }, separators=(',', ':')).encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(self.ids), len(self.terms), self.nnz, len(metadata)))
+            f.write(metadata)
+            for values in (self.row_ptr, self.row_cols, self.row_data,
+                           self.col_ptr, self.col_rows, self.col_data, self.idf):
+                f.write(values.tobytes())
+
+    @classmethod
+    def load(cls, path: Path, backend: Optional[str] = None) -> 'FeatureSimilarityIndex':
+        """Read a saved index; nothing is recomputed"""
+        data = Path(path).read_bytes()
+        magic, version, n_rows, n_columns, nnz, metadata_length = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} similarity index: {path}")
+        index = cls(backend)
+        offset = HEADER.size
+        metadata = json.loads(data[offset:offset + metadata_length])
+        offset += metadata_length
+        index.ids = metadata['ids']
+        index.terms = metadata['terms']
+        index.columns = {term: column for column, term in enumerate(index.terms)}
+        index.rows = {feature_id: row for row, feature_id in enumerate(index.ids)}
+        index.name_columns = set(metadata['name_columns'])
+        index.clusters = metadata['clusters']
+        index.cluster_labels = metadata['cluster_labels']
+
+        def read(typecode: str, count: int):
+            nonlocal offset
+            chunk = data[offset:offset + 4 * count]
+            offset += 4 * count
+            if index.backend == 'numpy':
+                import numpy as np
+                return np.frombuffer(chunk, dtype=np.uint32 if typecode == 'I' else np.float32)
+            values = array.array(typecode)
+            values.frombytes(chunk)
+            return values
+
+        index.row_ptr, index.row_cols, index.row_data = read('I', n_rows + 1), read('I', nnz), read('f', nnz)
+        index.col_ptr, index.col_rows, index.col_data = read('I', n_columns + 1), read('I', nnz), read('f', nnz)
+        index.idf = read('f', n_columns)
+        return index
+
+
+# Main execution
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Find Ericsson features similar to a feature or free text')
+    parser.add_argument('query', help='FAJ id of a processed feature, or free text with --text')
+    parser.add_argument('--data', default='output/ericsson_data', help='Processor ericsson_data directory')
+    parser.add_argument('-n', type=int, default=10, help='Number of results')
+    parser.add_argument('--text', action='store_true', help='Treat the query as free text instead of a FAJ id')
+
+    args = parser.parse_args()
+
+    index = FeatureSimilarityIndex.load(Path(args.data) / SIMILARITY_FILENAME)
+    categories = index.categories()
+    matches = index.similar_to_text(args.query, args.n) if args.text else index.similar(args.query, args.n)
+    for match in matches:
+        print(f"{match['score']:.4f}  FAJ {match['id']}  [{categories.get(match['id'], 'Other')}]")
@@ -13,27 +13,134 @@ Based on final-plan.md requirements:
 
 import os
 import json
+import hashlib
+import struct
 import zipfile
+import zlib
 import re
 from pathlib import Path
 from typing import Dict, List, Set, Tuple, Optional
 from datetime import datetime
 from collections import defaultdict, Counter
 import sys
+import threading
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from string import Template
+
+from ericsson_corpus import CORPUS_FILENAME, CorpusReader, LazyFeatureMap
+from ericsson_diff import DIGESTS_FILENAME, feature_digest, load_digests
+from ericsson_name_lookup import DEFAULT_PARAMETER_SPREADSHEET, read_parameter_details
+from ericsson_similarity import SIMILARITY_FILENAME, FeatureSimilarityIndex
+
+# Feature page templates, compiled once; bump PAGE_TEMPLATE_VERSION when they change
+PAGE_TEMPLATE_VERSION = 1
+FEATURE_PAGE = Template("""# $name
+
+**FAJ ID**: FAJ $id
+$cxc_line**Access Type**: $access_type
+**Value Package**: $value_package
+**Node Type**: $node_type
+
+## Description
+$description
+
+## Activation
+$activation$deactivation$parameters$counters$related$guidelines""")
+CXC_LINE = Template("**CXC Code**: $cxc_code  \n")
+CODE_BLOCK = Template("```bash\n$code\n```\n\n")
+DEACTIVATION = Template("## Deactivation\n```bash\n$code\n```\n\n")
+PARAMETERS = Template("## Parameters ($count)\n\n$items")
+PARAMETER = Template("### $name\n- **Type**: $type\n- **MO Class**: $mo_class\n- **Description**: $description\n\n")
+COUNTERS = Template("## Performance Counters ($count)\n\n$items")
+COUNTER = Template("- **$name**: $description\n")
+RELATED = Template("\n## Related Features\n\n$items")
+FEATURE_LINK = Template("- $name (FAJ $id)\n")
+GUIDELINES = Template("\n## Engineering Guidelines\n\n$text\n")
+
+# Page keys of the last full feature page run, next to the skill directory (not packaged)
+PAGES_MANIFEST_FILENAME = "feature_pages.json"
+
+# (size, mtime, crc) of every file in the last skill package, for incremental packaging
+PACKAGE_MANIFEST_FILENAME = "skill_package.json"
+DEFAULT_COMPRESSION_LEVEL = 6
+_LOCAL_HEADER = struct.Struct('<4s2B4HL2L2H')  # zipfile.sizeFileHeader bytes
+
+
+# Summary statistics the processor precomputes (older summaries lack them)
+PRECOMPUTED_STATISTICS = ('total_parameters', 'total_counters', 'total_events', 'feature_categories',
+                          'value_packages', 'node_types')
+_NOT_LOADED = object()
+
+
+class LazyJSONFiles(Mapping):
+    """Name -> parsed JSON file, read on first access"""
+
+    def __init__(self, files: Dict[str, Path]):
+        self.files = files
+        self._loaded: Dict[str, Dict] = {}
+
+    def __getitem__(self, name: str) -> Dict:
+        if name not in self._loaded:
+            try:
+                self._loaded[name] = json.loads(self.files[name].read_text())
+            except json.JSONDecodeError as e:
+                print(f"⚠️  Warning: Skipping corrupted index {self.files[name]}: {e}")
+                self._loaded[name] = {}
+        return self._loaded[name]
+
+    def __iter__(self):
+        return iter(self.files)
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+
+def _read_raw_entry(fp, info: zipfile.ZipInfo) -> bytes:
+    """Compressed bytes of a zip entry, read without decompressing"""
+    fp.seek(info.header_offset)
+    header = _LOCAL_HEADER.unpack(fp.read(_LOCAL_HEADER.size))
+    fp.seek(header[-2] + header[-1], os.SEEK_CUR)  # File name and extra field lengths
+    return fp.read(info.compress_size)
+
+
+def _file_crc(path: str) -> int:
+    """CRC-32 of a file's contents, as stored in its zip entry"""
+    crc = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def _deflate(path: str, level: int) -> Tuple[int, int, bytes]:
+    """(size, crc, raw deflate stream) of a file, as stored in a ZIP_DEFLATED entry"""
+    data = Path(path).read_bytes()
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return len(data), zlib.crc32(data), compressor.compress(data) + compressor.flush()
 
 
 class EricssonSkillGenerator:
     """Enhanced Claude skill generator for Ericsson RAN features"""
 
-    def __init__(self, data_dir: str, output_dir: str = "output"):
+    def __init__(self, data_dir: str, output_dir: str = "output", workers: int = 1,
+                 all_feature_pages: bool = False, compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+                 parameter_spreadsheet: Optional[Path] = DEFAULT_PARAMETER_SPREADSHEET):
         self.data_dir = Path(data_dir)
         self.output_dir = Path(output_dir)
         self.skill_dir = self.output_dir / "ericsson"
-
-        # Data structures
-        self.features: Dict[str, Dict] = {}
-        self.indices: Dict[str, Dict] = {}
+        self.workers = workers  # Reference writers run concurrently when > 1
+        self.all_feature_pages = all_feature_pages  # One page per feature instead of samples
+        self.compression_level = compression_level  # zlib level of the skill package
+        self.parameter_spreadsheet = parameter_spreadsheet  # MOM details joined into the parameter reference
+
+        # Data structures; features and indices are decoded on first access
+        self.features: Mapping = {}
+        self.corpus: Optional[CorpusReader] = None
+        self.indices: Mapping = {}
         self.summary: Dict = {}
+        self._lazy: Dict[str, object] = {}  # Loaded on first use: similarity, categories, digests
+        self._load_lock = threading.RLock()
 
         # Statistics
         self.stats = {
@@ -54,34 +161,22 @@ class EricssonSkillGenerator:
         if not self.data_dir.exists():
             raise FileNotFoundError(f"Data directory not found: {self.data_dir}")
 
-        # Load features
-        features_dir = self.data_dir / "features"
-        if not features_dir.exists():
-            raise FileNotFoundError(f"Features directory not found: {features_dir}")
-
-        loaded_count = 0
-        for feature_file in features_dir.glob("*.json"):
-            try:
-                feature_data = json.loads(feature_file.read_text())
-                if 'id' in feature_data:
-                    self.features[feature_data['id']] = feature_data
-                    loaded_count += 1
-            except (json.JSONDecodeError, KeyError) as e:
-                print(f"⚠️  Warning: Skipping corrupted file {feature_file}: {e}")
+        # Load features, from the binary corpus when the processor wrote one
+        corpus_file = self.data_dir / CORPUS_FILENAME
+        if corpus_file.exists():
+            loaded_count = self._load_corpus(corpus_file)
+        else:
+            loaded_count = self._load_feature_files()
 
         print(f"✅ Loaded {loaded_count} features")
         self.stats['total_features'] = loaded_count
 
-        # Load indices
+        # Indices are parsed when a writer first asks for one
         indices_dir = self.data_dir / "indices"
         if indices_dir.exists():
-            for index_file in indices_dir.glob("*_index.json"):
-                try:
-                    index_name = index_file.stem.replace('_index', '')
-                    self.indices[index_name] = json.loads(index_file.read_text())
-                    print(f"  📊 Loaded {index_name} index with {len(self.indices[index_name])} entries")
-                except (json.JSONDecodeError) as e:
-                    print(f"⚠️  Warning: Skipping corrupted index {index_file}: {e}")
+            self.indices = LazyJSONFiles({index_file.stem.replace('_index', ''): index_file
+                                          for index_file in sorted(indices_dir.glob("*_index.json"))})
+            print(f"  📊 Found indices: {', '.join(self.indices)}")
 
         # Load summary
         summary_file = self.data_dir / "summary.json"
@@ -93,17 +188,99 @@ class EricssonSkillGenerator:
                 print(f"⚠️  Warning: Could not load summary: {e}")
                 self.summary = {}
 
+        # Calculate comprehensive statistics (reusing the processor's when present)
+        self._calculate_statistics()
+
         # Ensure summary has required fields with defaults
         self.summary.setdefault('total_features', len(self.features))
-        self.summary.setdefault('total_parameters', sum(len(f.get('parameters', [])) for f in self.features.values()))
-        self.summary.setdefault('total_counters', sum(len(f.get('counters', [])) for f in self.features.values()))
-        self.summary.setdefault('total_events', sum(len(f.get('events', [])) for f in self.features.values()))
+        for name in ('total_parameters', 'total_counters', 'total_events'):
+            self.summary.setdefault(name, self.stats[name])
+
+    def _loaded(self, name: str, loader):
+        """Value of loader(), called on first use only (once, also with concurrent writers)"""
+        value = self._lazy.get(name, _NOT_LOADED)
+        if value is _NOT_LOADED:
+            with self._load_lock:
+                value = self._lazy.get(name, _NOT_LOADED)
+                if value is _NOT_LOADED:
+                    value = self._lazy[name] = loader()
+        return value
+
+    @property
+    def similarity(self) -> Optional[FeatureSimilarityIndex]:
+        """Similarity index saved by the processor, None without one"""
+        return self._loaded('similarity', self._load_similarity)
+
+    @property
+    def categories(self) -> Dict[str, str]:
+        """Feature id -> similarity cluster label (clusters replace the keyword categories)"""
+        return self._loaded('categories', lambda: self.similarity.categories() if self.similarity else {})
+
+    @property
+    def digests(self) -> Dict[str, Dict]:
+        """Per-field feature digests saved by the processor (keys of the feature pages)"""
+        return self._loaded('digests', lambda: load_digests(self.data_dir / DIGESTS_FILENAME))
+
+    def _load_similarity(self) -> Optional[FeatureSimilarityIndex]:
+        similarity_file = self.data_dir / SIMILARITY_FILENAME
+        if not similarity_file.exists():
+            return None
+        try:
+            similarity = FeatureSimilarityIndex.load(similarity_file)
+        except ValueError as e:
+            print(f"⚠️  Warning: Skipping similarity index: {e}")
+            return None
+        print(f"  🔗 Loaded similarity index with {len(similarity.cluster_labels)} clusters")
+        return similarity
+
+    def _load_corpus(self, corpus_file: Path) -> int:
+        """Map features lazily onto the memory-mapped corpus (only its offset table is read)"""
+        self.corpus = CorpusReader(corpus_file)
+        print(f"  📦 Reading {corpus_file.name} ({self.corpus.codec} records)")
+        self.features = LazyFeatureMap(self.corpus)
+        return len(self.corpus)
+
+    def _load_feature_files(self) -> int:
+        """Load features from the per-feature JSON files"""
+        features_dir = self.data_dir / "features"
+        if not features_dir.exists():
+            raise FileNotFoundError(f"Features directory not found: {features_dir}")
 
-        # Calculate comprehensive statistics
-        self._calculate_statistics()
+        self.features = {}
+        loaded_count = 0
+        for feature_file in features_dir.glob("*.json"):
+            try:
+                feature_data = json.loads(feature_file.read_text())
+                if 'id' in feature_data:
+                    self.features[feature_data['id']] = feature_data
+                    loaded_count += 1
+            except (json.JSONDecodeError, KeyError) as e:
+                print(f"⚠️  Warning: Skipping corrupted file {feature_file}: {e}")
+        return loaded_count
+
+    def get_feature(self, feature_id: str) -> Optional[Dict]:
+        """A single feature by FAJ id, decoded from the corpus if not loaded"""
+        if feature_id in self.features:
+            return self.features[feature_id]
+        if self.corpus is not None:
+            return self.corpus.get(feature_id)
+        return None
 
     def _calculate_statistics(self):
-        """Calculate comprehensive statistics from loaded data"""
+        """Calculate comprehensive statistics from loaded data
+
+        Totals precomputed by the processor are reused (its categories are
+        the similarity clusters, as here when the index exists); only older
+        summaries make this decode every feature.
+        """
+        if all(name in self.summary for name in PRECOMPUTED_STATISTICS) and \
+                (self.data_dir / SIMILARITY_FILENAME).exists():
+            self.stats.update({name: self.summary[name] for name in PRECOMPUTED_STATISTICS})
+            self.stats['categories'] = self.stats.pop('feature_categories')
+            print(f"📊 Using precomputed statistics: {self.stats['total_parameters']} parameters, "
+                  f"{self.stats['total_counters']} counters, {self.stats['total_events']} events")
+            return
+
         print("📊 Calculating statistics...")
 
         total_params = 0
@@ -176,6 +353,7 @@ class EricssonSkillGenerator:
             refs_dir / "features" / "by_category",
             refs_dir / "features" / "by_package",
             refs_dir / "parameters",
+            refs_dir / "parameters" / "by_mo",
             refs_dir / "counters",
             refs_dir / "cxc_codes",
             refs_dir / "guidelines",
@@ -299,30 +477,31 @@ Features: {self.summary['total_features']}
 
         print("✅ SKILL.md created")
 
+    def reference_writers(self) -> List:
+        """Independent reference writers; each reads the loaded data and writes its own files"""
+        return [
+            self.generate_feature_indexes,
+            self.generate_feature_samples,
+            self.generate_parameter_index,
+            self.generate_counter_index,
+            self.generate_cxc_index,
+            self.generate_guidelines,
+            self.generate_quick_reference,
+        ]
+
     def generate_references(self):
-        """Generate all reference files"""
+        """Generate all reference files, concurrently with more than one worker"""
         print("📚 Generating reference files...")
 
-        # Feature indexes
-        self.generate_feature_indexes()
-
-        # Feature details (sample for demo)
-        self.generate_feature_samples()
-
-        # Parameter index
-        self.generate_parameter_index()
-
-        # Counter index
-        self.generate_counter_index()
-
-        # CXC code index
-        self.generate_cxc_index()
-
-        # Engineering guidelines
-        self.generate_guidelines()
-
-        # Quick reference
-        self.generate_quick_reference()
+        writers = self.reference_writers()
+        if self.workers > 1:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(writers))) as pool:
+                # result() re-raises a writer's exception here
+                for future in [pool.submit(writer) for writer in writers]:
+                    future.result()
+        else:
+            for writer in writers:
+                writer()
 
         print("✅ Reference files generated")
 
@@ -336,43 +515,35 @@ Features: {self.summary['total_features']}
             f.write(f"**Total Features**: {len(self.features)}\n\n")
 
             # Group by category
-            categories = {}
+            categories = defaultdict(list)
             for feature in self.features.values():
-                category = self.categorize_feature(feature)
-                if category not in categories:
-                    categories[category] = []
-                categories[category].append(feature)
+                categories[self.categorize_feature(feature)].append(feature)
 
             for category, features in sorted(categories.items()):
                 f.write(f"## {category} ({len(features)})\n\n")
-                for feature in sorted(features[:20], key=lambda x: x['name']):
-                    f.write(f"- {feature['name']} (FAJ {feature['id']}")
-                    if feature.get('cxc_code'):
-                        f.write(f", CXC {feature['cxc_code']}")
-                    f.write(")\n")
-                if len(features) > 20:
-                    f.write(f"- ... and {len(features) - 20} more features\n")
+                for feature in sorted(features, key=lambda x: x['name']):
+                    cxc = f", CXC {feature['cxc_code']}" if feature.get('cxc_code') else ""
+                    f.write(f"- {feature['name']} (FAJ {feature['id']}{cxc})\n")
                 f.write("\n")
 
         # By value package
         with open(refs_dir / "by_package" / "index.md", 'w') as f:
             f.write("# Features by Value Package\n\n")
 
-            packages = {}
+            packages = defaultdict(list)
             for feature in self.features.values():
-                package = feature.get('value_package', 'Unknown')
-                if package not in packages:
-                    packages[package] = []
-                packages[package].append(feature)
+                packages[feature.get('value_package') or 'Unknown'].append(feature)
 
             for package, features in sorted(packages.items()):
-                f.write(f"## {package}\n\n")
-                for feature in features[:10]:
+                f.write(f"## {package} ({len(features)})\n\n")
+                for feature in sorted(features, key=lambda x: x['name']):
                     f.write(f"- {feature['name']} (FAJ {feature['id']})\n")
                 f.write("\n")
 
     def categorize_feature(self, feature: Dict) -> str:
-        """Categorize a feature"""
+        """Similarity cluster label, or a keyword category for data without a similarity index"""
+        if feature['id'] in self.categories:
+            return self.categories[feature['id']]
         name = feature['name'].lower()
 
         if 'mimo' in name:
@@ -388,88 +559,203 @@ Features: {self.summary['total_features']}
         else:
             return 'Other Features'
 
+    def related_features(self, feature_id: str, top_k: int = 5) -> List[Dict]:
+        """Most similar features by the similarity index (empty without one)"""
+        if self.similarity is None or feature_id not in self.similarity.rows:
+            return []
+        related = []
+        for match in self.similarity.similar(feature_id, top_k):
+            other = self.get_feature(match['id'])
+            if other is not None:
+                related.append(other)
+        return related
+
     def generate_feature_samples(self):
-        """Generate sample feature files (first 10 for demo)"""
+        """Generate feature pages: every feature in all_feature_pages mode, else the first 10"""
+        if self.all_feature_pages:
+            self.generate_feature_pages()
+            return
         refs_dir = self.skill_dir / "references" / "features"
-        sample_features = list(self.features.values())[:10]
-
-        for feature in sample_features:
-            filename = f"FAJ_{feature['id'].replace(' ', '_')}.md"
-            filepath = refs_dir / filename
-
-            content = f"""# {feature['name']}
-
-**FAJ ID**: FAJ {feature['id']}
-"""
-            if feature.get('cxc_code'):
-                content += f"**CXC Code**: {feature['cxc_code']}  \n"
-            content += f"""**Access Type**: {feature.get('access_type', 'N/A')}
-**Value Package**: {feature.get('value_package', 'N/A')}
-**Node Type**: {feature.get('node_type', 'N/A')}
-
-## Description
-{feature.get('description', feature.get('summary', 'No description available'))}
-
-## Activation
-"""
-            if feature.get('activation_step'):
-                content += f"```bash\n{feature['activation_step']}\n```\n\n"
-            else:
-                content += "Activation steps not documented\n\n"
-
-            if feature.get('deactivation_step'):
-                content += "## Deactivation\n"
-                content += f"```bash\n{feature['deactivation_step']}\n```\n\n"
-
-            if feature.get('parameters'):
-                content += f"## Parameters ({len(feature['parameters'])})\n\n"
-                for param in feature['parameters'][:10]:
-                    content += f"### {param['name']}\n"
-                    content += f"- **Type**: {param.get('type', 'N/A')}\n"
-                    content += f"- **MO Class**: {param.get('mo_class', 'N/A')}\n"
-                    content += f"- **Description**: {param.get('description', 'N/A')}\n\n"
-
-            if feature.get('counters'):
-                content += f"## Performance Counters ({len(feature['counters'])})\n\n"
-                for counter in feature['counters'][:5]:
-                    content += f"- **{counter['name']}**: {counter.get('description', 'N/A')}\n"
-
-            if feature.get('engineering_guidelines'):
-                content += "\n## Engineering Guidelines\n\n"
-                content += feature['engineering_guidelines'][:500]
-                if len(feature['engineering_guidelines']) > 500:
-                    content += "..."
-                content += "\n"
-
-            filepath.write_text(content)
+        for feature in list(self.features.values())[:10]:
+            (refs_dir / self.feature_page_name(feature['id'])).write_text(self.render_feature_page(feature))
+
+    @staticmethod
+    def feature_page_name(feature_id: str) -> str:
+        return f"FAJ_{feature_id.replace(' ', '_')}.md"
+
+    def page_key(self, feature_id: str) -> str:
+        """Hash of everything a feature page is rendered from
+
+        Built from the processor's field digests, so unchanged pages are
+        recognized without decoding their features.
+        """
+        def fields(fid):
+            if fid not in self.digests:
+                self.digests[fid] = feature_digest(self.get_feature(fid))
+            return self.digests[fid]['fields']
+
+        related = []
+        if self.similarity is not None and feature_id in self.similarity.rows:
+            related = [(match['id'], fields(match['id']).get('name')) for match in self.similarity.similar(feature_id, 5)]
+        data = json.dumps([PAGE_TEMPLATE_VERSION, fields(feature_id), related], sort_keys=True).encode('utf-8')
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def generate_feature_pages(self) -> Dict[str, int]:
+        """Render a page for every feature, skipping pages whose key is unchanged since the last run
+
+        Keys are tracked in PAGES_MANIFEST_FILENAME next to the skill
+        directory; pages of features that disappeared are deleted.
+        """
+        refs_dir = self.skill_dir / "references" / "features"
+        manifest_file = self.output_dir / PAGES_MANIFEST_FILENAME
+        previous = {}
+        if manifest_file.exists():
+            previous = json.loads(manifest_file.read_text()).get('pages', {})
+
+        pages = {}
+        rendered = 0
+        for feature_id in self.features:
+            key = self.page_key(feature_id)
+            pages[feature_id] = key
+            page_file = refs_dir / self.feature_page_name(feature_id)
+            if previous.get(feature_id) == key and page_file.exists():
+                continue
+            page_file.write_text(self.render_feature_page(self.get_feature(feature_id)))
+            rendered += 1
+
+        removed = 0
+        for feature_id in previous.keys() - pages.keys():
+            (refs_dir / self.feature_page_name(feature_id)).unlink(missing_ok=True)
+            removed += 1
+
+        manifest_file.write_text(json.dumps({'version': PAGE_TEMPLATE_VERSION, 'pages': pages}))
+        print(f"  📄 Feature pages: {rendered} rendered, {len(pages) - rendered} unchanged, {removed} removed")
+        return {'rendered': rendered, 'unchanged': len(pages) - rendered, 'removed': removed}
+
+    def render_feature_page(self, feature: Dict) -> str:
+        """One feature's reference page"""
+        cxc_line = CXC_LINE.substitute(cxc_code=feature['cxc_code']) if feature.get('cxc_code') else ""
+        if feature.get('activation_step'):
+            activation = CODE_BLOCK.substitute(code=feature['activation_step'])
+        else:
+            activation = "Activation steps not documented\n\n"
+        deactivation = ""
+        if feature.get('deactivation_step'):
+            deactivation = DEACTIVATION.substitute(code=feature['deactivation_step'])
+
+        parameters = ""
+        if feature.get('parameters'):
+            items = "".join(PARAMETER.substitute(name=param['name'], type=param.get('type', 'N/A'),
+                                                 mo_class=param.get('mo_class', 'N/A'),
+                                                 description=param.get('description', 'N/A'))
+                            for param in feature['parameters'])
+            parameters = PARAMETERS.substitute(count=len(feature['parameters']), items=items)
+
+        counters = ""
+        if feature.get('counters'):
+            items = "".join(COUNTER.substitute(name=counter['name'], description=counter.get('description', 'N/A'))
+                            for counter in feature['counters'])
+            counters = COUNTERS.substitute(count=len(feature['counters']), items=items)
+
+        related = self.related_features(feature['id'])
+        related = RELATED.substitute(items="".join(FEATURE_LINK.substitute(name=other['name'], id=other['id'])
+                                                   for other in related)) if related else ""
+
+        guidelines = ""
+        if feature.get('engineering_guidelines'):
+            text = feature['engineering_guidelines']
+            guidelines = GUIDELINES.substitute(text=text[:500] + ("..." if len(text) > 500 else ""))
+
+        return FEATURE_PAGE.substitute(
+            name=feature['name'], id=feature['id'], cxc_line=cxc_line,
+            access_type=feature.get('access_type', 'N/A'), value_package=feature.get('value_package', 'N/A'),
+            node_type=feature.get('node_type', 'N/A'),
+            description=feature.get('description', feature.get('summary', 'No description available')),
+            activation=activation, deactivation=deactivation, parameters=parameters, counters=counters,
+            related=related, guidelines=guidelines)
+
+    def parameters_by_mo_class(self) -> Dict[str, Dict[str, Dict]]:
+        """MO class -> attribute -> {'name', 'features', 'details'}
+
+        Joins the features' parameters with the MOM spreadsheet on (MO class,
+        attribute) in one pass over each; spreadsheet parameters no feature
+        mentions are included too. The first spreadsheet row of a parameter
+        listed under several models wins. MO classes are matched ignoring
+        case (the documentation spells some of them differently) and keyed by
+        the spreadsheet's spelling, or the first one seen.
+        """
+        mo_params: Dict[str, Dict[str, Dict]] = defaultdict(dict)
+        titles: Dict[str, str] = {}  # Lowercased MO class -> spelling used as the shard title
+        for feature in self.features.values():
+            for param in feature.get('parameters', []):
+                mo_class = param.get('mo_class') or 'Unknown'
+                titles.setdefault(mo_class.lower(), mo_class)
+                attribute = param['name'].rsplit('.', 1)[-1]
+                entry = mo_params[mo_class.lower()].setdefault(attribute.lower(),
+                                                               {'name': attribute, 'features': [], 'details': None})
+                entry['features'].append(feature)
+
+        spreadsheet = self.parameter_spreadsheet
+        if spreadsheet is not None and Path(spreadsheet).exists():
+            spreadsheet_titles: Dict[str, str] = {}
+            for details in read_parameter_details(spreadsheet):
+                key = details['mo_class'].lower()
+                spreadsheet_titles.setdefault(key, details['mo_class'])
+                entry = mo_params[key].setdefault(
+                    details['parameter'].lower(), {'name': details['parameter'], 'features': [], 'details': None})
+                if entry['details'] is None:
+                    entry['details'] = details
+            titles.update(spreadsheet_titles)
+        return {titles[key]: params for key, params in mo_params.items()}
+
+    @staticmethod
+    def mo_shard_name(mo_class: str) -> str:
+        return re.sub(r'[^\w.-]', '_', mo_class) + ".md"
 
     def generate_parameter_index(self):
-        """Generate parameter master index"""
+        """Generate the parameter master index and one reference shard per MO class"""
         refs_dir = self.skill_dir / "references" / "parameters"
+        shards_dir = refs_dir / "by_mo"
+        shards_dir.mkdir(parents=True, exist_ok=True)
+        mo_params = self.parameters_by_mo_class()
 
         with open(refs_dir / "index.md", 'w') as f:
             f.write("# Parameter Master Index\n\n")
-
-            # Group by MO class
-            mo_params = {}
-            if 'parameters' in self.indices:
-                for param_name, feature_ids in self.indices['parameters'].items():
-                    for fid in feature_ids[:3]:  # Limit to 3 features per param
-                        if fid in self.features:
-                            feature = self.features[fid]
-                            for param in feature.get('parameters', []):
-                                if param_name in param['name'].lower():
-                                    mo_class = param.get('mo_class', 'Unknown')
-                                    if mo_class not in mo_params:
-                                        mo_params[mo_class] = []
-                                    mo_params[mo_class].append((param, feature))
-                                    break
-
+            f.write(f"**{sum(len(params) for params in mo_params.values())} parameters** "
+                    f"in {len(mo_params)} MO classes, one reference file per MO class.\n\n")
             for mo_class, params in sorted(mo_params.items()):
-                f.write(f"## {mo_class}\n\n")
-                for param, feature in params[:10]:  # Limit to 10 per MO
-                    f.write(f"- **{param['name']}** - Used in {feature['name']} (FAJ {feature['id']})\n")
-                f.write("\n")
+                used = sum(1 for entry in params.values() if entry['features'])
+                f.write(f"- [{mo_class}](by_mo/{self.mo_shard_name(mo_class)}) - "
+                        f"{len(params)} parameters, {used} used by features\n")
+
+        # Stale shards go first: on a case-insensitive filesystem a shard whose MO class
+        # changed spelling would otherwise keep its old name
+        shard_names = {self.mo_shard_name(mo_class) for mo_class in mo_params}
+        for shard_file in shards_dir.glob("*.md"):
+            if shard_file.name not in shard_names:
+                shard_file.unlink()
+        for mo_class, params in mo_params.items():
+            with open(shards_dir / self.mo_shard_name(mo_class), 'w') as f:
+                self.write_parameter_shard(f, mo_class, params)
+
+    def write_parameter_shard(self, f, mo_class: str, params: Dict[str, Dict]):
+        """Write every parameter of one MO class with its MOM details and features"""
+        f.write(f"# {mo_class} Parameters\n\n")
+        for _, entry in sorted(params.items()):
+            f.write(f"## {mo_class}.{entry['name']}\n\n")
+            details = entry['details']
+            if details is not None:
+                for label, key in (('Type', 'data_type'), ('Range', 'range'), ('Default', 'default'),
+                                   ('Unit', 'unit'), ('Deprecated', 'deprecated')):
+                    if details[key]:
+                        f.write(f"- **{label}**: {' '.join(details[key].split())}\n")
+                description = details['description'].split('\n', 1)[0].strip()
+                if description:
+                    f.write(f"- **Description**: {description}\n")
+            if entry['features']:
+                used_in = ", ".join(f"{feature['name']} (FAJ {feature['id']})" for feature in entry['features'])
+                f.write(f"- **Used in**: {used_in}\n")
+            f.write("\n")
 
     def generate_counter_index(self):
         """Generate counter index"""
@@ -478,16 +764,15 @@ Features: {self.summary['total_features']}
         with open(refs_dir / "index.md", 'w') as f:
             f.write("# Performance Counter Index\n\n")
 
-            if 'counters' in self.indices:
-                for counter_name, feature_ids in sorted(self.indices['counters'].items())[:50]:
-                    f.write(f"## {counter_name}\n\n")
-                    f.write(f"**Used in {len(feature_ids)} features**:\n\n")
+            for counter_name, feature_ids in sorted(self.indices.get('counters', {}).items()):
+                f.write(f"## {counter_name}\n\n")
+                f.write(f"**Used in {len(feature_ids)} features**:\n\n")
 
-                    for fid in feature_ids[:5]:
-                        if fid in self.features:
-                            feature = self.features[fid]
-                            f.write(f"- {feature['name']} (FAJ {feature['id']})\n")
-                    f.write("\n")
+                for fid in feature_ids:
+                    if fid in self.features:
+                        feature = self.features[fid]
+                        f.write(f"- {feature['name']} (FAJ {feature['id']})\n")
+                f.write("\n")
 
     def generate_cxc_index(self):
         """Generate CXC code index"""
@@ -497,8 +782,13 @@ Features: {self.summary['total_features']}
             f.write("# CXC Feature Code Index\n\n")
             f.write("Quick reference for feature activation codes:\n\n")
 
-            for cxc_code, feature_id in sorted(self.indices.get('cxc_codes', {}).items()):
-                if feature_id in self.features:
+            for cxc_code, feature_ids in sorted(self.indices.get('cxc_codes', {}).items()):
+                # One feature id per code in older indices, a list of ids now
+                if isinstance(feature_ids, str):
+                    feature_ids = [feature_ids]
+                for feature_id in feature_ids:
+                    if feature_id not in self.features:
+                        continue
                     feature = self.features[feature_id]
                     f.write(f"## {cxc_code}\n\n")
                     f.write(f"**Feature**: {feature['name']}\n")
@@ -532,7 +822,7 @@ Features: {self.summary['total_features']}
                 'Best Practices': []
             }
 
-            for feature in list(self.features.values())[:20]:  # Sample for demo
+            for feature in self.features.values():
                 guidelines = feature.get('engineering_guidelines', '')
                 if guidelines:
                     category = 'Best Practices'
@@ -549,7 +839,7 @@ Features: {self.summary['total_features']}
             for category, guidelines in guidelines_by_category.items():
                 if guidelines:
                     f.write(f"## {category}\n\n")
-                    for feature_name, guideline in guidelines[:5]:
+                    for feature_name, guideline in guidelines:
                         f.write(f"### {feature_name}\n\n")
                         f.write(f"{guideline}...\n\n")
 
@@ -581,30 +871,92 @@ Features: {self.summary['total_features']}
                     f.write("\n")
 
     def package_skill(self):
-        """Package skill into zip file and return statistics"""
+        """Package skill into zip file and return statistics
+
+        Entries of files unchanged since the last package are copied from
+        the previous zip without recompressing. A file is unchanged if its
+        size and mtime match the package manifest or, since the reference
+        writers rewrite every file on each run, if its size and CRC do. New
+        or changed files are compressed concurrently with more than one worker.
+        """
         print("📦 Packaging skill...")
 
         zip_filename = f"ericsson_ran_features_skill_{len(self.features)}_features.zip"
         zip_path = self.output_dir / zip_filename
 
-        # Count files before packaging
-        file_count = 0
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Add all files in skill directory
-            for root, dirs, files in os.walk(self.skill_dir):
-                for file in files:
-                    if not file.endswith('.backup'):  # Skip backup files
-                        file_path = os.path.join(root, file)
-                        arcname = os.path.relpath(file_path, self.skill_dir)
-                        zipf.write(file_path, arcname)
-                        file_count += 1
+        files = []
+        for root, dirs, names in os.walk(self.skill_dir):
+            for name in names:
+                if not name.endswith('.backup'):  # Skip backup files
+                    file_path = os.path.join(root, name)
+                    files.append((os.path.relpath(file_path, self.skill_dir), file_path, os.stat(file_path)))
+        files.sort()
+
+        # Entries that can be copied from the previous package
+        manifest_file = self.output_dir / PACKAGE_MANIFEST_FILENAME
+        previous = json.loads(manifest_file.read_text()) if manifest_file.exists() else {}
+        previous_zip = self.output_dir / previous.get('zip', zip_filename)
+        reusable: Dict[str, zipfile.ZipInfo] = {}
+        if previous.get('compression_level') == self.compression_level and previous_zip.exists():
+            with zipfile.ZipFile(previous_zip) as old_zip:
+                old_entries = {info.filename: info for info in old_zip.infolist()}
+            rewritten = []  # Same size, new mtime: the CRC decides
+            for arcname, file_path, stat in files:
+                entry, info = previous['files'].get(arcname), old_entries.get(arcname)
+                if info is None or entry is None or entry[0] != stat.st_size or entry[2] != info.CRC:
+                    continue
+                if entry[1] == stat.st_mtime_ns:
+                    reusable[arcname] = info
+                else:
+                    rewritten.append((arcname, file_path, info))
+            paths = [file_path for _, file_path, _ in rewritten]
+            if self.workers > 1 and len(paths) > 1:
+                with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                    crcs = list(pool.map(_file_crc, paths))
+            else:
+                crcs = [_file_crc(file_path) for file_path in paths]
+            for (arcname, _, info), crc in zip(rewritten, crcs):
+                if crc == info.CRC:
+                    reusable[arcname] = info
+
+        changed = [file_path for arcname, file_path, stat in files if arcname not in reusable]
+        if self.workers > 1 and len(changed) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:  # zlib releases the GIL
+                compressed = dict(zip(changed, pool.map(_deflate, changed,
+                                                        [self.compression_level] * len(changed))))
+        else:
+            compressed = {file_path: _deflate(file_path, self.compression_level) for file_path in changed}
+
+        manifest_files = {}
+        temp_path = zip_path.with_name(f".{zip_filename}.tmp")
+        old_fp = open(previous_zip, 'rb') if reusable else None
+        try:
+            with zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                for arcname, file_path, stat in files:
+                    if arcname in reusable:
+                        info = reusable[arcname]
+                        data = _read_raw_entry(old_fp, info)
+                    else:
+                        info = zipfile.ZipInfo.from_file(file_path, arcname)
+                        info.compress_type = zipfile.ZIP_DEFLATED
+                        info.file_size, info.CRC, data = compressed[file_path]
+                        info.compress_size = len(data)
+                    self._write_raw_entry(zipf, info, data)
+                    manifest_files[arcname] = [stat.st_size, stat.st_mtime_ns, info.CRC]
+        finally:
+            if old_fp is not None:
+                old_fp.close()
+        os.replace(temp_path, zip_path)
+        manifest_file.write_text(json.dumps({'zip': zip_filename, 'compression_level': self.compression_level,
+                                             'files': manifest_files}))
+        file_count = len(files)
 
         # Get file size
         size_mb = os.path.getsize(zip_path) / (1024 * 1024)
 
         print(f"✅ Skill packaged: {zip_filename}")
         print(f"📊 Package size: {size_mb:.2f} MB")
-        print(f"📄 Files included: {file_count}")
+        print(f"📄 Files included: {file_count} ({len(reusable)} reused, {len(changed)} compressed)")
         print(f"\nNext steps:")
         print(f"1. Upload {zip_filename} to Claude")
         print(f"2. Test with sample queries")
@@ -615,9 +967,24 @@ Features: {self.summary['total_features']}
             'zip_file_name': zip_filename,
             'zip_size_mb': size_mb,
             'file_count': file_count,
+            'reused_count': len(reusable),
+            'compressed_count': len(changed),
             'features_count': len(self.features)
         }
 
+    @staticmethod
+    def _write_raw_entry(zipf: zipfile.ZipFile, info: zipfile.ZipInfo, data: bytes):
+        """Append an already compressed entry; the central directory is written by close()"""
+        entry = zipfile.ZipInfo(info.filename, info.date_time)
+        entry.compress_type, entry.external_attr = info.compress_type, info.external_attr
+        entry.file_size, entry.compress_size, entry.CRC = info.file_size, info.compress_size, info.CRC
+        entry.header_offset = zipf.fp.tell()
+        zipf.fp.write(entry.FileHeader())
+        zipf.fp.write(data)
+        zipf.filelist.append(entry)
+        zipf.NameToInfo[entry.filename] = entry
+        zipf.start_dir = zipf.fp.tell()
+
 
 # Main execution
 if __name__ == "__main__":
@@ -626,6 +993,13 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Generate Claude skill from Ericsson features')
     parser.add_argument('--data-dir', default='output/ericsson_data', help='Processed data directory')
     parser.add_argument('--output-dir', default='output', help='Output directory')
+    parser.add_argument('--workers', type=int, default=1, help='Reference writers run concurrently')
+    parser.add_argument('--compression-level', type=int, default=DEFAULT_COMPRESSION_LEVEL, choices=range(10),
+                        metavar='0-9', help='Deflate level of the skill package')
+    parser.add_argument('--parameter-spreadsheet', type=Path, default=DEFAULT_PARAMETER_SPREADSHEET,
+                        help='MOM parameter spreadsheet joined into the parameter reference (skipped if missing)')
+    parser.add_argument('--all-feature-pages', action='store_true',
+                        help='Render a page for every feature, regenerating only changed ones')
 
     args = parser.parse_args()
 
@@ -639,7 +1013,11 @@ if __name__ == "__main__":
     # Generate skill
     generator = EricssonSkillGenerator(
         data_dir=args.data_dir,
-        output_dir=args.output_dir
+        output_dir=args.output_dir,
+        workers=args.workers,
+        all_feature_pages=args.all_feature_pages,
+        compression_level=args.compression_level,
+        parameter_spreadsheet=args.parameter_spreadsheet
     )
 
     generator.generate_skill()
\ No newline at end of file
@@ -0,0 +1,1051 @@
+#!/usr/bin/env python3
+"""
+Tests for the Ericsson feature processor
+Run with: python -m pytest test_ericsson_feature_processor.py
+"""
+
+import importlib.util
+import json
+import os
+import random
+import re
+import tracemalloc
+import zipfile
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+
+import ericsson_benchmark
+from ericsson_benchmark import compare_reports, edit_corpus, feature_document, generate_corpus, run_benchmark
+from ericsson_cache import CacheEntry, SQLiteFeatureCache
+from ericsson_corpus import CORPUS_FILENAME, CorpusReader, CorpusWriter, LazyFeatureMap
+from ericsson_dependencies import FeatureDependencyGraph
+from ericsson_diff import DIGESTS_FILENAME, FeatureSnapshot, diff_snapshots, format_changelog
+from ericsson_discovery import DiscoveryStream, iter_source_files
+from ericsson_document import DocumentHeading, DocumentTable, parse_html_document
+from ericsson_feature_processor import EricssonFeature, EricssonFeatureProcessor
+from ericsson_markdown import parse_markdown_document
+from ericsson_name_lookup import COMPLETIONS_FILENAME, PrefixCompleter
+from ericsson_patterns import PatternRegistry
+from ericsson_postings import PostingIndex, intersect, union
+from ericsson_profiling import StageProfiler, percentile
+from ericsson_search_index import EricssonSearchIndexBuilder
+from ericsson_similarity import FeatureSimilarityIndex
+from ericsson_skill_generator import EricssonSkillGenerator
+
+ELEX_FEATURES = Path(__file__).parent / "elex_features"
+
+
+def _extract(processor, file_path):
+    """Feature fields (without timestamp) or the error raised for a file"""
+    try:
+        feature = processor.process_file(file_path)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    if feature is None:
+        return None
+    data = asdict(feature)
+    data.pop('processed_at')
+    return data
+
+
+@pytest.mark.skipif(not ELEX_FEATURES.is_dir(), reason="elex_features/ corpus not available")
+def test_markdown_backend_matches_html_backend(tmp_path):
+    """The direct tokenizer extracts the same features as markdown→HTML→BeautifulSoup"""
+    pytest.importorskip("markdown")
+    pytest.importorskip("bs4")
+
+    html_processor = EricssonFeatureProcessor(ELEX_FEATURES, tmp_path / "html", parse_backend='html')
+    md_processor = EricssonFeatureProcessor(ELEX_FEATURES, tmp_path / "markdown", parse_backend='markdown')
+
+    files = html_processor.discover_files()
+    assert files
+
+    mismatches = []
+    for file_path in files:
+        expected = _extract(html_processor, file_path)
+        actual = _extract(md_processor, file_path)
+        if expected != actual:
+            mismatches.append(file_path.name)
+
+    assert not mismatches, f"{len(mismatches)} files differ, e.g. {mismatches[:5]}"
+
+
+def test_unknown_parse_backend_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        EricssonFeatureProcessor("elex_features", tmp_path, parse_backend='lxml')
+
+
+SECTIONED_DOCUMENT = """# Doc Title
+
+## Summary
+
+Intro text.
+
+### Detail
+
+Detail text.
+
+## Parameters
+
+| Parameter | Description |
+|---|---|
+| A.b | x |
+
+## Events
+
+| Event | Type |
+|---|---|
+| EV1 | t |
+
+| Feature Name | Doc |
+|---|---|
+| Access Type | LTE |
+"""
+
+
+def _document_parsers():
+    """Both document backends; the HTML one only with markdown and bs4 installed"""
+    parsers = [pytest.param(parse_markdown_document, id='markdown')]
+    html_missing = importlib.util.find_spec('markdown') is None or importlib.util.find_spec('bs4') is None
+    parsers.append(pytest.param(parse_html_document, id='html',
+                                marks=pytest.mark.skipif(html_missing, reason="markdown/bs4 not installed")))
+    return parsers
+
+
+@pytest.mark.parametrize("parse", _document_parsers())
+def test_parsed_document_sections_end_at_same_or_higher_level_headings(parse):
+    doc = parse(SECTIONED_DOCUMENT)
+    assert doc.title == "Doc Title"
+    assert [(h.name, h.text) for h in doc.headings] == [
+        ('h2', 'Summary'), ('h3', 'Detail'), ('h2', 'Parameters'), ('h2', 'Events')]
+    # An h2 section runs through its h3 subsections; an h3 one stops at the next h2
+    assert doc.find_section('Summary') == "Intro text.\nDetail\nDetail text."
+    assert doc.find_section('detail') == "Detail text."
+    assert doc.find_section('Missing') == ""
+    # block_text() stops at any h1-h3
+    assert doc.headings[0].block_text().split() == ["Intro", "text."]
+
+
+def test_document_heading_section_boundaries():
+    blocks = [('h2', 'A'), ('p', ' one '), ('h4', 'Sub'), ('p', 'two'), ('h3', 'B'), ('p', 'three'), ('h2', 'C')]
+    h2, h3 = DocumentHeading('h2', 'A', blocks, 1), DocumentHeading('h3', 'B', blocks, 5)
+    assert h2.section_text() == "one\nSub\ntwo\nB\nthree"
+    assert h3.section_text() == "three"
+    assert h2.block_text() == " one  Sub two "
+
+
+@pytest.mark.parametrize("parse", _document_parsers())
+def test_parsed_document_classifies_tables(parse):
+    doc = parse(SECTIONED_DOCUMENT)
+    assert [table.headers for table in doc.parameter_tables] == [['parameter', 'description']]
+    assert doc.parameter_tables[0].data_rows == [['A.b', 'x']]
+    assert [table.data_rows for table in doc.event_tables] == [[['EV1', 't']]]
+    assert [table.rows for table in doc.identity_tables] == [[['Feature Name', 'Doc'], ['Access Type', 'LTE']]]
+
+    table = DocumentTable(text="Feature Name", headers=[], rows=[], data_rows=[])
+    assert table.is_feature_identity and not table.is_parameter_table and not table.is_event_table
+
+
+@pytest.mark.parametrize("backend", [
+    'markdown',
+    pytest.param('html', marks=pytest.mark.skipif(
+        importlib.util.find_spec('markdown') is None or importlib.util.find_spec('bs4') is None,
+        reason="markdown/bs4 not installed")),
+])
+def test_identity_table_rows_and_short_rows(tmp_path, backend):
+    processor = EricssonFeatureProcessor(tmp_path, tmp_path / "out", parse_backend=backend)
+    short = tmp_path / "short.md"
+    short.write_text("# Doc\n\nFeature Identity: FAJ 121 1234\n\n| Feature Name |\n|---|\n| Something |\n")
+    feature = processor.process_file(short)
+    assert (feature.id, feature.name) == ('121 1234', 'Doc')
+
+    identity = tmp_path / "identity.md"
+    identity.write_text("# Doc\n\nFAJ 121 1111\n\n| Feature Name | Named Feature |\n|---|---|\n"
+                        "| Feature Identity | FAJ 121 2222 |\n| Value Package Name | Base |\n"
+                        "| Node Type | Baseband |\n| Access Type | NR |\n")
+    feature = processor.process_file(identity)
+    processor.cache.close()
+    assert (feature.id, feature.name, feature.value_package, feature.node_type, feature.access_type) == \
+        ('121 2222', 'Named Feature', 'Base', 'Baseband', 'NR')
+
+
+def test_pattern_set_tries_alternatives_in_order_and_counts_hits():
+    registry = PatternRegistry()
+    faj = registry.compile_first('faj', [
+        ('spaced', r'FAJ\s*(\d+\s+\d+)'),
+        ('compact', r'FAJ\s*(\d{3}\s*\d{4})'),
+    ])
+
+    # A later 'spaced' match wins over an earlier 'compact' one, as with sequential re.search
+    assert faj.search("FAJ 1213094 and FAJ 121 3094").group(1) == '121 3094'
+    assert faj.search("FAJ 1213094").group(1) == '1213094'
+    assert faj.search("no identity") is None
+
+    stats = registry.report()
+    assert stats['faj']['calls'] == 3 and stats['faj']['hits'] == 2
+    assert stats['faj.spaced']['hits'] == 1 and stats['faj.compact']['hits'] == 1
+
+
+def test_sqlite_cache_round_trip_and_compaction(tmp_path):
+    cache = SQLiteFeatureCache(tmp_path / "features.sqlite")
+    cache.put("/corpus/a.md", CacheEntry(1, 10, "hash-a", {'id': '121 0001'}))
+    cache.put("/corpus/b.md", CacheEntry(2, 20, "hash-b", None))
+    cache.close()
+
+    cache = SQLiteFeatureCache(tmp_path / "features.sqlite")
+    assert cache.get("/corpus/a.md") == CacheEntry(1, 10, "hash-a", {'id': '121 0001'})
+    assert cache.get("/corpus/b.md").feature is None
+    assert cache.get("/corpus/c.md") is None
+
+    assert cache.compact(["/corpus/a.md"]) == 1
+    assert cache.get("/corpus/b.md") is None
+    cache.close()
+
+
+def test_cache_skips_hashing_for_unchanged_stat(tmp_path, monkeypatch):
+    source = tmp_path / "docs"
+    source.mkdir()
+    doc = source / "feature.md"
+    doc.write_text("# Test Feature\n\n| Feature Name | Feature Identity |\n|---|---|\n| Test | FAJ 121 0001 |\n")
+
+    processor = EricssonFeatureProcessor(source, tmp_path / "out", parse_backend='markdown',
+                                         hash_algorithm='blake2b')
+    first = processor.process_file(doc)
+    assert first is not None and first.file_hash == processor.calculate_file_hash(doc)
+
+    hashed = []
+    original_hash = processor.calculate_file_hash
+    monkeypatch.setattr(processor, 'calculate_file_hash', lambda path: hashed.append(path) or original_hash(path))
+
+    # Same inode, size and mtime: no read at all
+    assert processor.process_file(doc).id == first.id
+    assert hashed == []
+
+    # Touched but identical: hashed once, then the refreshed stat is trusted again
+    stat = doc.stat()
+    os.utime(doc, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert processor.process_file(doc).id == first.id
+    assert processor.process_file(doc).id == first.id
+    assert len(hashed) == 1
+
+
+def test_unknown_hash_algorithm_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        EricssonFeatureProcessor("elex_features", tmp_path, hash_algorithm='sha0')
+
+
+def test_discovery_filters_sorts_and_streams(tmp_path):
+    for name in ["b/2.md", "b/1.md", "a.md", "a.txt", "skip/3.md", "b/draft/4.md"]:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("x")
+
+    files = iter_source_files(tmp_path, exclude=["skip", "draft"], sort=True)
+    assert [p.relative_to(tmp_path).as_posix() for p in files] == ["a.md", "b/1.md", "b/2.md"]
+
+    # Files of a directory come before its subdirectories, as with rglob
+    assert sorted(iter_source_files(tmp_path)) == sorted(tmp_path.rglob("*.md"))
+    assert [p.name for p in iter_source_files(tmp_path, include=["b/*.md"], sort=True)] == ["1.md", "2.md"]
+
+    with DiscoveryStream(iter_source_files(tmp_path, sort=True), queue_size=1) as stream:
+        assert len(list(stream)) == 5
+    assert stream.discovered == 5 and stream.complete and not stream.running
+
+
+def _write_feature_docs(source, count):
+    source.mkdir()
+    for i in range(count):
+        (source / f"feature_{i}.md").write_text(
+            f"# Feature {i}\n\n| Feature Name | Feature Identity |\n|---|---|\n| Feature {i} | FAJ 121 {i:04d} |\n"
+        )
+
+
+def test_parallel_workers_match_serial_run_including_worker_errors(tmp_path):
+    source = tmp_path / "docs"
+    _write_feature_docs(source, 6)
+    # FAJ in the identity value without a number makes extraction raise inside the worker
+    (source / "feature_broken.md").write_text(
+        "# Broken\n\nFAJ 121 9999\n\n| Feature Name | Broken |\n|---|---|\n| Feature Identity | FAJ pending |\n")
+    (source / "guide.md").write_text("# Guide\n\nNo feature identity here.\n")
+    options = dict(batch_size=3, parse_backend='markdown', sort_files=True)
+
+    runs = {}
+    for workers in (1, 2):
+        processor = EricssonFeatureProcessor(source, tmp_path / f"out{workers}", workers=workers, **options)
+        processor.process_all()
+        processor.cache.close()
+        runs[workers] = processor
+
+    serial, parallel = runs[1], runs[2]
+    assert {fid: {**asdict(f), 'processed_at': ''} for fid, f in parallel.features.items()} == \
+        {fid: {**asdict(f), 'processed_at': ''} for fid, f in serial.features.items()}
+    assert len(serial.features) == 6
+    assert parallel.error_files == serial.error_files
+    assert sorted((Path(path).name, "group" in error) for path, error in serial.error_files) == \
+        [("feature_broken.md", True), ("guide.md", False)]
+    for key in ('total_files', 'processed'):
+        assert parallel.stats[key] == serial.stats[key]
+
+    def batches(processor):
+        return [{key: value for key, value in batch.items() if key != 'duration'}
+                for batch in processor.stats['batches']]
+    assert batches(parallel) == batches(serial)
+    for name in ["parameters", "counters", "cxc_codes", "names"]:
+        index_file = Path("ericsson_data") / "indices" / f"{name}_index.json"
+        assert (tmp_path / "out2" / index_file).read_bytes() == (tmp_path / "out1" / index_file).read_bytes()
+
+
+def test_limited_run_reports_processed_files_not_a_partial_walk(tmp_path, capsys):
+    # More files than the discovery queue holds, so the walk cannot finish ahead of the limit
+    source = tmp_path / "docs"
+    _write_feature_docs(source, 5)
+    for subdir in range(20):
+        _write_feature_docs(source / f"more_{subdir}", 50)
+
+    processor = EricssonFeatureProcessor(source, tmp_path / "out", batch_size=2, parse_backend='markdown')
+    processor.process_all(limit=3)
+    processor.cache.close()
+    assert processor.stats['total_files'] == processor.stats['processed'] == 3
+    assert "Processed 3 markdown files (limit reached" in capsys.readouterr().out
+
+    _write_feature_docs(tmp_path / "small", 5)
+    processor = EricssonFeatureProcessor(tmp_path / "small", tmp_path / "out_small", parse_backend='markdown')
+    processor.process_all(limit=10)
+    processor.cache.close()
+    assert processor.stats['total_files'] == processor.stats['processed'] == 5
+    assert "Found 5 markdown files" in capsys.readouterr().out
+
+
+def test_resume_restores_checkpointed_files_from_cache(tmp_path, monkeypatch):
+    source = tmp_path / "docs"
+    _write_feature_docs(source, 4)
+    options = dict(batch_size=1, parse_backend='markdown', sort_files=True, checkpoint_batches=1)
+
+    crashing = EricssonFeatureProcessor(source, tmp_path / "out", **options)
+    original_batch = crashing.process_batch
+
+    def crash_on_third_batch(files):
+        if len(crashing.stats['batches']) == 2:
+            raise KeyboardInterrupt
+        return original_batch(files)
+
+    monkeypatch.setattr(crashing, 'process_batch', crash_on_third_batch)
+    with pytest.raises(KeyboardInterrupt):
+        crashing.process_all()
+    crashing.cache.close()
+
+    progress_file = tmp_path / "out" / "ericsson_data" / "progress.json"
+    assert len(json.loads(progress_file.read_text())['completed_files']) == 2
+    assert not list(progress_file.parent.glob(".progress*"))
+
+    resumed = EricssonFeatureProcessor(source, tmp_path / "out", **options)
+    extracted = []
+    original_extract = resumed.extract_feature
+    monkeypatch.setattr(resumed, 'extract_feature',
+                        lambda path, file_hash=None: extracted.append(path.name) or original_extract(path, file_hash))
+    resumed.process_all(resume=True)
+    resumed.cache.close()
+
+    assert extracted == ["feature_2.md", "feature_3.md"]
+    assert resumed.stats['resumed'] == 2
+    assert sorted(resumed.features) == ['121 0000', '121 0001', '121 0002', '121 0003']
+    assert [batch['batch_num'] for batch in resumed.stats['batches']] == [1, 2, 3, 4]
+
+
+def test_streaming_mode_saves_per_batch_and_keeps_slim_features(tmp_path):
+    source = tmp_path / "docs"
+    _write_feature_docs(source, 5)
+    options = dict(batch_size=2, parse_backend='markdown', sort_files=True)
+
+    full = EricssonFeatureProcessor(source, tmp_path / "full", **options)
+    full.process_all()
+    streaming = EricssonFeatureProcessor(source, tmp_path / "streaming", streaming=True, **options)
+    streaming.process_all()
+
+    for name in ["parameters", "counters", "cxc_codes", "names"]:
+        index_file = Path("ericsson_data") / "indices" / f"{name}_index.json"
+        assert (tmp_path / "streaming" / index_file).read_text() == (tmp_path / "full" / index_file).read_text()
+    completions_file = Path("ericsson_data") / COMPLETIONS_FILENAME
+    assert (tmp_path / "streaming" / completions_file).read_text() == (tmp_path / "full" / completions_file).read_text()
+
+    saved = sorted(p.name for p in (tmp_path / "streaming" / "ericsson_data" / "features").glob("*.json"))
+    assert saved == sorted(p.name for p in (tmp_path / "full" / "ericsson_data" / "features").glob("*.json"))
+    assert all(feature.description == "" and feature.processed_at == "" for feature in streaming.features.values())
+
+
+@pytest.mark.parametrize("codec", ["json", "msgpack"])
+def test_corpus_round_trip_and_single_feature_reads(tmp_path, codec):
+    if codec == "msgpack":
+        pytest.importorskip("msgpack")
+    features = [{'id': f'121 000{i}', 'name': f'Feature {i}', 'parameters': [{'name': 'A.b'}]} for i in range(3)]
+
+    with CorpusWriter(tmp_path / CORPUS_FILENAME, codec=codec) as writer:
+        for feature in features:
+            writer.add(feature)
+        writer.add({**features[1], 'name': 'Feature 1 (later document)'})
+
+    with CorpusReader(tmp_path / CORPUS_FILENAME) as reader:
+        assert reader.codec == codec and len(reader) == 3
+        assert reader.get('121 0001')['name'] == 'Feature 1 (later document)'
+        assert reader.get('121 9999') is None
+        assert [feature_id for feature_id, _ in reader.items()] == ['121 0000', '121 0001', '121 0002']
+
+    generator = EricssonSkillGenerator(str(tmp_path), str(tmp_path / "skill"))
+    generator.load_data()
+    assert generator.features['121 0002'] == features[2]
+    assert generator.get_feature('121 0000') == features[0]
+
+
+def test_failed_corpus_write_leaves_previous_file(tmp_path):
+    with CorpusWriter(tmp_path / CORPUS_FILENAME, codec="json") as writer:
+        writer.add({'id': '121 0001'})
+
+    with pytest.raises(RuntimeError):
+        with CorpusWriter(tmp_path / CORPUS_FILENAME, codec="json") as writer:
+            writer.add({'id': '121 0002'})
+            raise RuntimeError("interrupted")
+
+    with CorpusReader(tmp_path / CORPUS_FILENAME) as reader:
+        assert reader.ids() == ['121 0001']
+    assert [p.name for p in tmp_path.iterdir()] == [CORPUS_FILENAME]
+
+
+def test_corpus_append_compacts_once_dead_records_outweigh_live_ones(tmp_path):
+    path = tmp_path / CORPUS_FILENAME
+    with CorpusWriter(path, codec="json") as writer:
+        for i in range(4):
+            writer.add({'id': f'121 000{i}', 'description': 'x' * 100})
+
+    with CorpusWriter(path, append=True) as writer:
+        writer.add({'id': '121 0000', 'description': 'y' * 100})
+        writer.remove('121 0003')
+        assert 0 < writer.dead_bytes < writer.live_bytes
+    patched_size = path.stat().st_size
+
+    with CorpusWriter(path, append=True) as writer:
+        writer.add({'id': '121 0001', 'description': 'z' * 100})
+        writer.remove('121 0002')
+        assert writer.dead_bytes > writer.live_bytes
+    assert path.stat().st_size < patched_size
+    assert [p.name for p in tmp_path.iterdir()] == [CORPUS_FILENAME]
+
+    with CorpusReader(path) as reader:
+        assert reader.ids() == ['121 0000', '121 0001']
+        assert reader.get('121 0000')['description'] == 'y' * 100
+        assert reader.get('121 0001')['description'] == 'z' * 100
+        table = json.dumps(reader.offsets, separators=(',', ':'))
+    with CorpusWriter(path, append=True) as writer:
+        assert writer.dead_bytes == len(table)  # Only the offset table the next one supersedes
+
+
+def _search_builder(tmp_path, features):
+    features_dir = tmp_path / "ericsson_data" / "features"
+    features_dir.mkdir(parents=True, exist_ok=True)
+    for feature in features:
+        (features_dir / f"feature_{feature['id'].replace(' ', '_')}.json").write_text(json.dumps(feature))
+    builder = EricssonSearchIndexBuilder(str(features_dir), str(tmp_path))
+    builder.load_features()
+    return builder
+
+
+SEARCH_FEATURES = [
+    {'id': '121 3094', 'name': 'MIMO Sleep Mode', 'cxc_code': 'CXC4011808',
+     'description': 'Switches off MIMO branches at low traffic',
+     'parameters': [{'name': 'MimoSleepFunction.sleepMode'}], 'counters': [{'name': 'pmMimoSleepTime'}]},
+    {'id': '121 4425', 'name': 'Uplink Carrier Aggregation', 'cxc_code': 'CXC4011476',
+     'description': 'Aggregates uplink carriers', 'parameters': [], 'counters': []},
+    {'id': '121 0490', 'name': 'Data Forwarding at Handover', 'cxc_code': None,
+     'description': 'Forwards data during handover', 'parameters': [], 'counters': []},
+]
+
+
+def test_search_index_ranks_with_bm25_and_tolerates_typos(tmp_path):
+    builder = _search_builder(tmp_path, SEARCH_FEATURES)
+    builder.build_all_indices()
+
+    assert builder.search("mimo sleep")[0]['id'] == '121 3094'
+    assert builder.search("carier agregation")[0]['id'] == '121 4425'
+    assert builder.search("handvoer")[0]['id'] == '121 0490'
+    assert builder.find_by_parameter("mimosleepfunction.sleepmode") == ['121 3094']
+    assert builder.find_by_cxc("CXC4011476") == ['121 4425']
+    assert builder.get_index_statistics()['indices']['cxc_index'] == 2
+    assert not any(builder.check_index_consistency().values())
+
+
+def test_search_index_incremental_update_matches_full_rebuild(tmp_path):
+    builder = _search_builder(tmp_path, SEARCH_FEATURES)
+    builder.build_all_indices()
+    builder.save_indices()
+
+    changed = [{**SEARCH_FEATURES[0], 'name': 'MIMO Deep Sleep'}, SEARCH_FEATURES[1],
+               {'id': '121 5000', 'name': 'Handover Optimization', 'parameters': [], 'counters': []}]
+    updated = _search_builder(tmp_path / "updated", changed)
+    assert updated.load_indices() is False
+    updated.index_file = builder.index_file
+    assert updated.load_indices()
+    updated.incremental_update(['121 3094', '121 5000'], ['121 0490'])
+
+    rebuilt = _search_builder(tmp_path / "rebuilt", changed)
+    rebuilt.build_all_indices()
+
+    for query in ["deep sleep", "handover", "mimo", "carrier"]:
+        assert updated.search(query) == rebuilt.search(query)
+    assert updated.find_by_counter("pmmimosleeptime") == ['121 3094']
+    assert not any(updated.check_index_consistency().values())
+
+
+def test_search_index_rebuilds_once_tombstones_outnumber_live_features(tmp_path):
+    builder = _search_builder(tmp_path, SEARCH_FEATURES)
+    builder.build_all_indices()
+    builder.features = {'121 3094': builder.features['121 3094']}
+    builder.incremental_update(['121 3094'], [])
+    assert builder.tombstones == 1 and len(builder.doc_ids) == 4
+
+    (builder.features_dir / "feature_121_0490.json").unlink()
+    builder.features = {'121 3094': builder.features['121 3094']}
+    builder.incremental_update(['121 3094'], ['121 0490'])
+    assert builder.tombstones == 0 and builder.doc_ids == ['121 3094', '121 4425']
+    assert builder.search("carrier")[0]['id'] == '121 4425'
+    assert not any(builder.check_index_consistency().values())
+
+
+def test_posting_index_set_operations_and_single_feature_updates():
+    index = PostingIndex()
+    index.add(2, ["sleep", "mimo"])
+    index.add(0, ["sleep", "sleep", "cell"])
+    index.add(1, ["mimo"])
+
+    assert index.get("sleep") == [0, 2]
+    assert index.all_of(["sleep", "mimo"]) == [2]
+    assert index.any_of(["cell", "mimo"]) == [0, 1, 2]
+    assert intersect([1, 3, 5, 7], [3, 7, 9], [0, 3, 7]) == [3, 7]
+    assert union([1, 3], [2, 3], []) == [1, 2, 3]
+
+    index.replace(2, ["cell"])
+    assert index.get("cell") == [0, 2] and index.get("mimo") == [1]
+    index.remove(1)
+    assert "mimo" not in index
+
+
+def test_basic_indices_are_multi_valued_and_incrementally_updatable(tmp_path):
+    processor = EricssonFeatureProcessor("elex_features", tmp_path)
+    processor.features = {
+        '121 0001': EricssonFeature(id='121 0001', name='MIMO Sleep Mode', cxc_code='CXC1',
+                                    parameters=[{'name': 'Mimo.sleepMode'}, {'name': 'Mimo.sleepMode'}]),
+        '121 0002': EricssonFeature(id='121 0002', name='Cell Sleep Mode', cxc_code='CXC1'),
+    }
+    processor.build_indices()
+
+    assert processor.query_index('names', ['sleep']) == ['121 0001', '121 0002']
+    assert processor.query_index('names', ['sleep', 'mimo']) == ['121 0001']
+    assert processor.query_index('names', ['mimo', 'cell'], match_all=False) == ['121 0001', '121 0002']
+    assert processor.query_index('parameters', ['mimo.sleepmode']) == ['121 0001']
+    assert processor.query_index('cxc_codes', ['CXC1']) == ['121 0001', '121 0002']
+
+    processor.update_feature_index(EricssonFeature(id='121 0001', name='MIMO Deep Mode', cxc_code='CXC9'))
+    assert processor.query_index('names', ['sleep']) == ['121 0002']
+    assert processor.query_index('cxc_codes', ['CXC9']) == ['121 0001']
+    assert processor.query_index('parameters', ['mimo.sleepmode']) == []
+
+    processor.remove_feature_index('121 0002')
+    assert processor.query_index('names', ['mode']) == ['121 0001']
+
+
+def test_fuzzy_name_lookup_over_indices_and_parameter_spreadsheet(tmp_path):
+    spreadsheet = tmp_path / "Spreadsheets_Parameters.csv"
+    spreadsheet.write_text(
+        "Model,MO Class Name,Parameter Name,Parameter Description\n"
+        "Lrat,EUtranCellFDD,qRxLevMin,\"Minimum required RX level,\nin dBm\"\n"
+        "Lrat,EUtranCellTDD,qRxLevMin,Minimum required RX level\n"
+        "Lrat,EUtranCellFDD,highBasebandPriority,Baseband priority\n"
+    )
+    processor = EricssonFeatureProcessor("elex_features", tmp_path)
+    processor.features = {
+        '121 0001': EricssonFeature(id='121 0001', name='Baseband Prioritization',
+                                    parameters=[{'name': 'EUtranCellFDD.highBasebandPriority'}],
+                                    counters=[{'name': 'pmEbsHoExeAttOutEutran'}, {'name': 'pmHoExeAttOutEutran'}]),
+    }
+    processor.build_indices()
+    lookup = processor.build_name_lookup(spreadsheet)
+    assert len(lookup) == 5
+
+    matches = processor.find_names('pmEbsHoExeAtOutEutrn', top_k=2)
+    assert [match['name'] for match in matches] == ['pmEbsHoExeAttOutEutran', 'pmHoExeAttOutEutran']
+    assert matches[0]['kind'] == 'counter' and matches[0]['feature_ids'] == ['121 0001']
+
+    assert [match['name'] for match in processor.find_names('QRXLEVMIN')][:2] == \
+        ['EUtranCellFDD.qRxLevMin', 'EUtranCellTDD.qRxLevMin']
+    best = processor.find_names('eutrancellfdd.highbasbandpriority', kind='parameter')[0]
+    assert best['name'] == 'EUtranCellFDD.highBasebandPriority' and best['feature_ids'] == ['121 0001']
+    assert processor.find_names('pmHoExeAttOutEutran', kind='parameter') == []
+
+
+def test_prefix_completion_ranked_by_feature_count_and_loaded_from_file(tmp_path):
+    completer = PrefixCompleter.build({
+        'EUtranCellFDD.qRxLevMin': 3,
+        'EUtranCellFDD.qQualMin': 1,
+        'EUtranCellTDD.qRxLevMin': 5,
+        'eutrancellfdd.QRXLEVMIN': 0,
+        'NRCellDU.ssbFrequency': 2,
+    })
+    assert len(completer) == 4
+    assert [c['name'] for c in completer.complete('eu')] == [
+        'EUtranCellTDD.qRxLevMin', 'EUtranCellFDD.qRxLevMin', 'EUtranCellFDD.qQualMin']
+    assert completer.complete('EUtranCellFDD.q', n=1) == [{'name': 'EUtranCellFDD.qRxLevMin', 'features': 3}]
+    assert [c['name'] for c in completer.complete('qrx')] == ['EUtranCellTDD.qRxLevMin', 'EUtranCellFDD.qRxLevMin']
+    assert completer.complete('ssbfreq') == [{'name': 'NRCellDU.ssbFrequency', 'features': 2}]
+    assert completer.complete('zz') == []
+
+    path = tmp_path / COMPLETIONS_FILENAME
+    completer.save(path)
+    loaded = PrefixCompleter.load(path)
+    for prefix in ('', 'e', 'eutrancell', 'nrcelldu.s'):
+        assert loaded.complete(prefix, n=3) == completer.complete(prefix, n=3)
+
+
+def test_dependency_graph_closure_activation_order_and_conflicts(tmp_path):
+    def feature(feature_id, prerequisites=(), conflicts=()):
+        return EricssonFeature(id=feature_id, name=feature_id, dependencies={
+            'prerequisites': list(prerequisites), 'related': [], 'conflicts': list(conflicts)})
+
+    processor = EricssonFeatureProcessor("elex_features", tmp_path)
+    processor.features = {f.id: f for f in [
+        feature('A', prerequisites=['B', 'C']),
+        feature('B', prerequisites=['D']),
+        feature('C', prerequisites=['D', 'Z']),
+        feature('D', conflicts=['X']),
+        feature('X'),
+        feature('P', prerequisites=['Q']),
+        feature('Q', prerequisites=['P']),
+    ]}
+    graph = processor.build_dependency_graph()
+
+    assert graph.cycles == [['P', 'Q']]
+    assert graph.missing_features() == ['Z']
+    assert sorted(graph.all_prerequisites('A')) == ['B', 'C', 'D', 'Z']
+    assert graph.requires('A', 'D') and not graph.requires('D', 'A')
+    assert graph.activation_order(['A']) == ['D', 'Z', 'B', 'C', 'A']
+    assert graph.find_conflicts(['A', 'X']) == [('D', 'X')]
+    assert graph.find_conflicts(['A', 'X'], include_prerequisites=False) == []
+    with pytest.raises(ValueError, match="cycle"):
+        graph.activation_order(['P'])
+
+    graph.save(tmp_path / "graph.json")
+    loaded = FeatureDependencyGraph.load(tmp_path / "graph.json")
+    assert loaded.activation_order(['A', 'X']) == graph.activation_order(['A', 'X'])
+    assert loaded.conflicts_with('X', 'D') and loaded.cycles == graph.cycles
+
+
+def test_similarity_index_top_k_clusters_and_file_round_trip(tmp_path):
+    def feature(feature_id, name, description, parameters=()):
+        return EricssonFeature(id=feature_id, name=name, description=description,
+                               parameters=[{'name': name} for name in parameters])
+
+    processor = EricssonFeatureProcessor("elex_features", tmp_path)
+    processor.features = {f.id: f for f in [
+        feature('M1', 'MIMO Sleep Mode', 'Switches off antenna branches at low traffic to save energy',
+                ['MimoSleepFunction.sleepMode']),
+        feature('M2', 'Micro Sleep Tx', 'Switches off the transmitter in empty symbols to save energy',
+                ['MimoSleepFunction.sleepMode']),
+        feature('M3', 'Cell Sleep Mode', 'Switches off capacity cells at low traffic to save energy'),
+        feature('C1', 'Carrier Aggregation', 'Aggregates component carriers for higher uplink throughput',
+                ['CarrierAggregationFunction.caUsageLimit']),
+        feature('C2', 'Uplink Carrier Aggregation', 'Aggregates uplink component carriers for throughput',
+                ['CarrierAggregationFunction.caUsageLimit']),
+        feature('C3', 'Dynamic Carrier Aggregation', 'Selects component carriers for higher throughput'),
+    ]}
+
+    index = processor.build_similarity_index(n_clusters=2)
+    assert [match['id'] for match in processor.similar_features('M1', top_k=2)] == ['M2', 'M3']
+    assert processor.similar_features('C1', top_k=1)[0]['id'] in ('C2', 'C3')
+    assert index.similar_to_text('CarrierAggregationFunction throughput', top_k=1)[0]['id'].startswith('C')
+
+    categories = index.categories()
+    assert categories['M1'] == categories['M2'] == categories['M3'] != categories['C1']
+    assert categories['C1'] == categories['C2'] == categories['C3']
+    assert 'Aggregation' in categories['C1'] and 'Sleep' in categories['M1']
+    assert processor.categorize_features() == {categories['M1']: 3, categories['C1']: 3}
+
+    index.save(tmp_path / "similarity.bin")
+    for backend in ('python', 'numpy'):
+        if backend == 'numpy':
+            pytest.importorskip("numpy")
+        loaded = FeatureSimilarityIndex.load(tmp_path / "similarity.bin", backend=backend)
+        assert loaded.categories() == categories
+        assert loaded.similar('M3', top_k=5) == index.similar('M3', top_k=5)
+
+
+def test_release_diff_skips_unchanged_hashes_and_details_changed_fields(tmp_path):
+    def feature(feature_id, file_hash, cxc_code='CXC1', parameters=('A.x',), name=None):
+        return EricssonFeature(id=feature_id, name=name or f"Feature {feature_id}", cxc_code=cxc_code,
+                               parameters=[{'name': param} for param in parameters], file_hash=file_hash)
+
+    releases = {
+        'old': [feature('1', 'h1'), feature('2', 'h2'), feature('3', 'h3'), feature('4', 'h4')],
+        'new': [feature('1', 'h1'), feature('2', 'h2b', cxc_code='CXC9', parameters=('A.x', 'B.y')),
+                feature('3', 'h3b'), feature('5', 'h5')],
+    }
+    for release, features in releases.items():
+        processor = EricssonFeatureProcessor("elex_features", tmp_path / release)
+        processor.features = {f.id: f for f in features}
+        processor.save_all()
+        processor.cache.close()
+    # Identical file hashes never touch the feature records
+    (tmp_path / "new" / "ericsson_data" / "features" / "feature_1.json").unlink()
+
+    changelog = diff_snapshots(FeatureSnapshot.open(tmp_path / "old" / "ericsson_data"),
+                               FeatureSnapshot.open(tmp_path / "new" / "ericsson_data"))
+    assert changelog['summary'] == {'added': 1, 'removed': 1, 'changed': 1, 'unchanged': 2}
+    assert changelog['added'] == [{'id': '5', 'name': 'Feature 5'}]
+    assert changelog['removed'] == [{'id': '4', 'name': 'Feature 4'}]
+    [change] = changelog['changed']
+    assert change['fields'] == ['cxc_code', 'parameters']
+    assert change['values'] == {'cxc_code': {'old': 'CXC1', 'new': 'CXC9'}}
+    assert change['items']['parameters'] == {'added': ['B.y'], 'removed': [], 'changed': []}
+    assert "cxc_code: CXC1 → CXC9" in format_changelog(changelog)
+
+    # Same result from data without stored digests and from the extraction caches
+    (tmp_path / "old" / "ericsson_data" / DIGESTS_FILENAME).unlink()
+    (tmp_path / "old" / "ericsson_data" / CORPUS_FILENAME).unlink()
+    recomputed = diff_snapshots(FeatureSnapshot.open(tmp_path / "old" / "ericsson_data"),
+                                FeatureSnapshot.open(tmp_path / "new" / "ericsson_data"))
+    assert recomputed['changed'] == changelog['changed']
+    caches = {}
+    for release, features in releases.items():
+        cache = SQLiteFeatureCache(tmp_path / f"{release}.sqlite")
+        for f in features:
+            cache.put(f"/src/{release}/{f.id}.md", CacheEntry(0, 0, f.file_hash, asdict(f)))
+        cache.close()
+        caches[release] = FeatureSnapshot.open(tmp_path / f"{release}.sqlite")
+    assert diff_snapshots(caches['old'], caches['new'])['changed'] == changelog['changed']
+
+
+def test_profiler_reports_stage_percentiles_slowest_files_and_trace(tmp_path):
+    assert percentile([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 0.5) == 5
+    assert percentile([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 0.95) == 10
+
+    source = tmp_path / "docs"
+    _write_feature_docs(source, 3)
+    trace_file = tmp_path / "trace.json"
+    processor = EricssonFeatureProcessor(source, tmp_path / "out", parse_backend='markdown',
+                                         profile_memory=True, profile_trace=trace_file)
+    try:
+        processor.process_all()
+    finally:
+        tracemalloc.stop()
+        processor.cache.close()
+
+    profile = json.loads((tmp_path / "out" / "ericsson_data" / "summary.json").read_text())['profile']
+    stages = profile['stages']
+    assert {'read', 'hash', 'parse.tokenize', 'extract.identity', 'extract.parameters',
+            'cache.lookup', 'cache.put', 'save.feature'} <= stages.keys()
+    assert stages['extract.parameters']['count'] == 3
+    assert stages['parse.tokenize']['p50_ms'] <= stages['parse.tokenize']['p95_ms'] <= stages['parse.tokenize']['max_ms']
+    assert 'alloc_p95_kb' in stages['parse.tokenize']
+    assert len(profile['slowest_files']) == 3
+    assert 'extract.parameters' in profile['slowest_files'][0]['stages_ms']
+
+    events = json.loads(trace_file.read_text())['traceEvents']
+    assert {event['ph'] for event in events} == {'X'}
+    assert sum(event['cat'] == 'file' for event in events) == 3
+
+    # Worker measurements merge into the parent's report
+    parent, worker = StageProfiler(enabled=True, slowest=2), StageProfiler(enabled=True, slowest=2)
+    for profiler in (parent, worker):
+        with profiler.file("a.md"):
+            profiler.call('parse', sum, [1, 2])
+    parent.merge(json.loads(json.dumps(worker.drain())))
+    assert parent.report()['stages']['parse']['count'] == 2 and not worker.samples
+    assert len(parent.report()['slowest_files']) == 2
+
+    assert not StageProfiler().enabled and StageProfiler().call('x', len, "abc") == 3
+
+
+def test_synthetic_benchmark_corpus_is_extractable_and_reports_compare(tmp_path):
+    corpus = generate_corpus(tmp_path / "corpus", 30, seed=1)
+    assert corpus['files'] == 30 and corpus == generate_corpus(tmp_path / "again", 30, seed=1)
+
+    processor = EricssonFeatureProcessor(tmp_path / "corpus", tmp_path / "out", parse_backend='markdown')
+    features = [feature for path in sorted((tmp_path / "corpus").rglob("*.md"))
+                if (feature := processor.process_file(path)) is not None]
+    processor.cache.close()
+    assert 20 <= len(features) < 30
+    assert all(f.parameters and f.counters and f.cxc_code for f in features)
+    assert all('ACTIVATED' in f.activation_step and f.value_package for f in features)
+
+    assert edit_corpus(tmp_path / "corpus", 0.1) == 3
+
+    def report(files_per_second, rss):
+        return {'runs': {'cold': {'files_per_second': files_per_second, 'peak_rss_mb': rss}}}
+    assert compare_reports(report(100, 50), report(95, 54)) == []
+    assert len(compare_reports(report(100, 50), report(80, 60))) == 2
+
+
+def test_benchmark_incremental_run_passes_incremental_flag(tmp_path, monkeypatch):
+    calls = []
+    summary = {'total_features': 0, 'processing_stats': {'batches': []}}
+
+    def fake_run_processor(source, output, parser, workers, extra_args=None, log_file=None):
+        calls.append(extra_args)
+        return {'seconds': 1.0, 'peak_rss_kb': 1024, 'summary': summary}
+    monkeypatch.setattr(ericsson_benchmark, 'run_processor', fake_run_processor)
+
+    report = run_benchmark(tmp_path, 5, seed=1, keep=True)
+    assert list(report['runs']) == ['cold', 'warm', 'incremental']
+    assert calls == [None, None, ['--incremental']]
+
+
+def test_incremental_run_reprocesses_only_changed_sources_and_matches_full_build(tmp_path, monkeypatch):
+    source = tmp_path / "corpus"
+    generate_corpus(source, 20, seed=2)
+    options = dict(parse_backend='markdown', sort_files=True)
+    EricssonFeatureProcessor(source, tmp_path / "out", **options).process_all()
+
+    edit_corpus(source, 0.1, seed=3)
+    deleted = next(path for path in sorted(source.rglob("*.md")) if 'FAJ' in path.read_text())
+    deleted.unlink()
+    (source / "batch0" / "999_synthetic.md").write_text(feature_document(999, random.Random(9)))
+
+    incremental = EricssonFeatureProcessor(source, tmp_path / "out", incremental=True, **options)
+    extracted = []
+    original_extract = incremental.extract_feature
+    monkeypatch.setattr(incremental, 'extract_feature',
+                        lambda path, file_hash=None: extracted.append(path) or original_extract(path, file_hash))
+    incremental.process_all()
+    incremental.cache.close()
+    assert len(extracted) == 3 and source / "batch0" / "999_synthetic.md" in extracted
+
+    full = EricssonFeatureProcessor(source, tmp_path / "full", **options)
+    full.process_all()
+    full.cache.close()
+
+    out_data, full_data = tmp_path / "out" / "ericsson_data", tmp_path / "full" / "ericsson_data"
+    assert sorted(p.name for p in (out_data / "features").glob("*.json")) == \
+        sorted(p.name for p in (full_data / "features").glob("*.json"))
+    for name in ["parameters", "counters", "cxc_codes", "names"]:
+        index_file = Path("indices") / f"{name}_index.json"
+        patched, rebuilt = (json.loads((data / index_file).read_text()) for data in (out_data, full_data))
+        assert {key: sorted(ids) for key, ids in patched.items()} == {key: sorted(ids) for key, ids in rebuilt.items()}
+    assert json.loads((out_data / DIGESTS_FILENAME).read_text()) == json.loads((full_data / DIGESTS_FILENAME).read_text())
+
+    with CorpusReader(out_data / CORPUS_FILENAME) as patched, CorpusReader(full_data / CORPUS_FILENAME) as rebuilt:
+        assert sorted(patched.ids()) == sorted(rebuilt.ids())
+        for feature_id in rebuilt.ids():
+            assert {**patched.get(feature_id), 'processed_at': ''} == {**rebuilt.get(feature_id), 'processed_at': ''}
+
+    patched_index, rebuilt_index = (EricssonSearchIndexBuilder(str(data / "features"), str(data.parent))
+                                    for data in (out_data, full_data))
+    assert patched_index.load_indices() and rebuilt_index.load_indices()
+    assert patched_index.feature_hashes == rebuilt_index.feature_hashes
+    def ranked(index):
+        return sorted((hit['id'], hit['score']) for hit in index.search("uplink capacity", top_k=50))
+    assert ranked(patched_index) == ranked(rebuilt_index)
+    # The patched builder holds only the changed features; names of the others come from the corpus
+    hits = incremental.search_index_builder.search("uplink capacity", top_k=50)
+    assert len(hits) > 3 and {hit['id']: hit['name'] for hit in hits} == \
+        {hit['id']: hit['name'] for hit in full.search_index_builder.search("uplink capacity", top_k=50)}
+    assert all(hit['name'] for hit in hits)
+
+    unchanged = EricssonFeatureProcessor(source, tmp_path / "out", incremental=True, **options)
+    monkeypatch.setattr(unchanged, 'process_batch', lambda files: pytest.fail("nothing changed"))
+    unchanged.process_all()
+
+
+def test_incremental_run_rebuilds_search_index_that_disagrees_with_corpus(tmp_path, monkeypatch):
+    source = tmp_path / "corpus"
+    generate_corpus(source, 10, seed=4)
+    options = dict(parse_backend='markdown', sort_files=True)
+    EricssonFeatureProcessor(source, tmp_path / "out", **options).process_all()
+    (source / "batch0" / "999_synthetic.md").write_text(feature_document(999, random.Random(9)))
+
+    # A patch that loses the change leaves the index out of step with the corpus
+    monkeypatch.setattr(EricssonSearchIndexBuilder, 'incremental_update', lambda self, modified, deleted: None)
+    incremental = EricssonFeatureProcessor(source, tmp_path / "out", incremental=True, **options)
+    incremental.process_all()
+    incremental.cache.close()
+
+    builder = incremental.search_index_builder
+    assert not any(builder.check_index_consistency(builder.corpus_features()).values())
+    saved = EricssonSearchIndexBuilder(str(builder.features_dir), str(tmp_path / "out"))
+    assert saved.load_indices() and sorted(saved.ordinals) == sorted(incremental.features)
+
+
+def test_concurrent_reference_writers_match_sequential_and_cover_every_item(tmp_path):
+    generate_corpus(tmp_path / "corpus", 40, seed=4)
+    processor = EricssonFeatureProcessor(tmp_path / "corpus", tmp_path / "out", parse_backend='markdown')
+    processor.process_all()
+    processor.cache.close()
+
+    trees = {}
+    for workers in (1, 3):
+        generator = EricssonSkillGenerator(str(tmp_path / "out" / "ericsson_data"), str(tmp_path / f"skill{workers}"),
+                                           workers=workers)
+        generator.load_data()
+        generator.create_skill_structure()
+        generator.generate_references()
+        refs_dir = generator.skill_dir / "references"
+        trees[workers] = {str(path.relative_to(refs_dir)): path.read_text()
+                          for path in refs_dir.rglob("*.md")}
+    assert trees[1] == trees[3]
+
+    features = generator.features.values()
+    parameter_shards = "".join(text for name, text in trees[1].items() if name.startswith("parameters/by_mo/"))
+    assert all(f"## {param['mo_class']}.{param['name'].rsplit('.', 1)[-1]}\n" in parameter_shards
+               for feature in features for param in feature['parameters'])
+    counter_index = trees[1]["counters/index.md"]
+    assert all(f"## {name}\n" in counter_index for name in generator.indices['counters'])
+    feature_index = trees[1]["features/index.md"]
+    assert all(f"(FAJ {feature['id']}" in feature_index for feature in features)
+
+
+def test_all_feature_pages_regenerate_only_changed_features(tmp_path):
+    source = tmp_path / "corpus"
+    generate_corpus(source, 20, seed=5)
+    options = dict(parse_backend='markdown', sort_files=True)
+    EricssonFeatureProcessor(source, tmp_path / "out", **options).process_all()
+
+    def generate():
+        generator = EricssonSkillGenerator(str(tmp_path / "out" / "ericsson_data"), str(tmp_path / "skill"),
+                                           all_feature_pages=True)
+        generator.load_data()
+        generator.create_skill_structure()
+        return generator, generator.generate_feature_pages()
+
+    generator, counts = generate()
+    pages_dir = generator.skill_dir / "references" / "features"
+    assert counts == {'rendered': len(generator.features), 'unchanged': 0, 'removed': 0}
+    assert sorted(p.name for p in pages_dir.glob("FAJ_*.md")) == \
+        sorted(generator.feature_page_name(feature_id) for feature_id in generator.features)
+    assert generate()[1]['rendered'] == 0
+
+    edited = next(path for path in sorted(source.rglob("*.md")) if 'FAJ' in path.read_text())
+    text = edited.read_text()
+    parameter = re.search(r"^\| \w+\.(\w+) \|", text, re.MULTILINE).group(1)
+    edited.write_text(text.replace(f".{parameter} |", ".pageTestParameter |", 1))
+    EricssonFeatureProcessor(source, tmp_path / "out", incremental=True, **options).process_all()
+    generator, counts = generate()
+    assert counts == {'rendered': 1, 'unchanged': len(generator.features) - 1, 'removed': 0}
+    assert sum("pageTestParameter" in page.read_text() for page in pages_dir.glob("FAJ_*.md")) == 1
+
+    # Pages listing a deleted feature as related change too
+    next(path for path in sorted(source.rglob("*.md"), reverse=True) if 'FAJ' in path.read_text()).unlink()
+    EricssonFeatureProcessor(source, tmp_path / "out", incremental=True, **options).process_all()
+    generator, counts = generate()
+    assert counts['removed'] == 1
+    assert sorted(p.name for p in pages_dir.glob("FAJ_*.md")) == \
+        sorted(generator.feature_page_name(feature_id) for feature_id in generator.features)
+
+
+def test_incremental_packaging_reuses_unchanged_zip_entries(tmp_path):
+    generate_corpus(tmp_path / "corpus", 20, seed=6)
+    EricssonFeatureProcessor(tmp_path / "corpus", tmp_path / "out", parse_backend='markdown').process_all()
+    generator = EricssonSkillGenerator(str(tmp_path / "out" / "ericsson_data"), str(tmp_path / "skill"),
+                                       workers=2, all_feature_pages=True, compression_level=9)
+    generator.load_data()
+    generator.create_skill_structure()
+    generator.create_skill_md()
+    generator.generate_references()
+
+    first = generator.package_skill()
+    assert first['reused_count'] == 0 and first['compressed_count'] == first['file_count']
+    page = next((generator.skill_dir / "references" / "features").glob("FAJ_*.md"))
+    page.write_text(page.read_text() + "\nEdited.\n")
+    (generator.skill_dir / "references" / "notes.md").write_text("# Notes\n")
+
+    second = generator.package_skill()
+    assert second['file_count'] == first['file_count'] + 1
+    assert second['compressed_count'] == 2 and second['reused_count'] == first['file_count'] - 1
+    with zipfile.ZipFile(tmp_path / "skill" / second['zip_file_name']) as package:
+        assert package.testzip() is None
+        assert all(package.read(info) == (generator.skill_dir / info.filename).read_bytes()
+                   for info in package.infolist())
+        assert all(info.compress_type == zipfile.ZIP_DEFLATED for info in package.infolist())
+
+    # Regenerating rewrites every reference file with the same content: nothing is recompressed
+    generator.create_skill_md()
+    generator.generate_references()
+    for path in generator.skill_dir.rglob("*.md"):
+        os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+    third = generator.package_skill()
+    assert third['compressed_count'] == 0 and third['reused_count'] == third['file_count']
+    assert generator.package_skill()['compressed_count'] == 0
+
+
+def test_generator_loads_lazily_and_reuses_precomputed_statistics(tmp_path):
+    generate_corpus(tmp_path / "corpus", 20, seed=7)
+    EricssonFeatureProcessor(tmp_path / "corpus", tmp_path / "out", parse_backend='markdown').process_all()
+
+    generator = EricssonSkillGenerator(str(tmp_path / "out" / "ericsson_data"), str(tmp_path / "skill"))
+    generator.load_data()
+    assert isinstance(generator.features, LazyFeatureMap) and not generator.features._decoded
+    assert not generator.indices._loaded and 'similarity' not in generator._lazy
+    precomputed = dict(generator.stats)
+
+    generator.summary = {}
+    generator._calculate_statistics()  # Decodes every feature
+    assert generator.stats == precomputed
+    assert len(generator.features._decoded) == len(generator.features)
+    assert generator.indices['parameters'] and 'similarity' in generator._lazy
+
+
+def test_parameter_reference_merges_mo_classes_differing_only_in_case(tmp_path):
+    spreadsheet = tmp_path / "parameters.csv"
+    spreadsheet.write_text(
+        "Model,MO Class Name,Parameter Name,Parameter Description,Data Type,Range and Values,Default Value,Unit\n"
+        "Nr,NRCellDU,ssbPeriodicity,SSB period.,int32,5..160,20,ms\n")
+    generator = EricssonSkillGenerator(str(tmp_path), str(tmp_path / "skill"), parameter_spreadsheet=spreadsheet)
+    generator.features = {
+        '121 0001': {'id': '121 0001', 'name': 'First', 'parameters': [
+            {'name': 'NRCellDu.ssbPeriodicity', 'mo_class': 'NRCellDu'}, {'name': 'Drb.qci', 'mo_class': 'Drb'}]},
+        '121 0002': {'id': '121 0002', 'name': 'Second', 'parameters': [
+            {'name': 'NRCellDU.ssbPeriodicity', 'mo_class': 'NRCellDU'}, {'name': 'DRB.pdcpSn', 'mo_class': 'DRB'}]},
+    }
+    mo_params = generator.parameters_by_mo_class()
+    assert sorted(mo_params) == ['Drb', 'NRCellDU']
+    entry = mo_params['NRCellDU']['ssbperiodicity']
+    assert [f['id'] for f in entry['features']] == ['121 0001', '121 0002'] and entry['details']['default'] == '20'
+    assert sorted(mo_params['Drb']) == ['pdcpsn', 'qci']
+
+    generator.create_skill_structure()
+    shards_dir = generator.skill_dir / "references" / "parameters" / "by_mo"
+    (shards_dir / "NRCellDu.md").write_text("# NRCellDu Parameters\n")
+    generator.generate_parameter_index()
+    assert sorted(path.name for path in shards_dir.glob("*.md")) == ['Drb.md', 'NRCellDU.md']
+    shard = (shards_dir / "NRCellDU.md").read_text()
+    assert "**Default**: 20\n" in shard and "First (FAJ 121 0001), Second (FAJ 121 0002)" in shard
+
+
+def test_parameter_reference_is_sharded_by_mo_class_and_joined_with_spreadsheet(tmp_path):
+    generate_corpus(tmp_path / "corpus", 20, seed=8)
+    EricssonFeatureProcessor(tmp_path / "corpus", tmp_path / "out", parse_backend='markdown').process_all()
+    spreadsheet = tmp_path / "parameters.csv"
+    generator = EricssonSkillGenerator(str(tmp_path / "out" / "ericsson_data"), str(tmp_path / "skill"),
+                                       parameter_spreadsheet=spreadsheet)
+    generator.load_data()
+    param = next(param for feature in generator.features.values() for param in feature['parameters'])
+    mo_class, attribute = param['name'].rsplit('.', 1)
+    spreadsheet.write_text(
+        "Model,MO Class Name,Parameter Name,Parameter Description,Data Type,Range and Values,Default Value,Unit\n"
+        f"Lrat,{mo_class},{attribute},\"First line.\nMore.\",int32,0..15,3,ms\n"
+        f"Nr,{mo_class},{attribute},Other model.,int32,0..15,7,ms\n"
+        f"Lrat,{mo_class},spreadsheetOnly,Not in any feature.,boolean,,false,\n"
+        "Lrat,NewMoClass,enabled,Switch.,boolean,,true,\n")
+    generator.create_skill_structure()
+    shards_dir = generator.skill_dir / "references" / "parameters" / "by_mo"
+    (shards_dir / "Removed.md").write_text("# Removed Parameters\n")
+    generator.generate_parameter_index()
+
+    shard = (shards_dir / generator.mo_shard_name(mo_class)).read_text()
+    section = shard.split(f"## {mo_class}.{attribute}\n", 1)[1].split("\n## ", 1)[0]
+    assert "**Type**: int32" in section and "**Default**: 3\n" in section and "**Description**: First line.\n" in section
+    assert "**Used in**:" in section and f"## {mo_class}.spreadsheetOnly\n" in shard
+    assert "## NewMoClass.enabled\n" in (shards_dir / "NewMoClass.md").read_text()
+    assert not (shards_dir / "Removed.md").exists()
+
+    shards = {path.name: path.read_text() for path in shards_dir.glob("*.md")}
+    assert all(f"## {param.get('mo_class') or 'Unknown'}.{param['name'].rsplit('.', 1)[-1]}\n"
+               in shards[generator.mo_shard_name(param.get('mo_class') or 'Unknown')]
+               for feature in generator.features.values() for param in feature['parameters'])
+    index = (generator.skill_dir / "references" / "parameters" / "index.md").read_text()
+    assert all(f"(by_mo/{name})" in index for name in shards)